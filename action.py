@@ -2,6 +2,8 @@ class Action:
     """
     Represents an action that can be taken from a city to move to another city.
     """
+
+    __slots__ = ("destination", "cost")
     
     def __init__(self, destination : str, cost : int) -> None:
         self.destination = destination
@@ -1,5 +1,7 @@
 import math
-from city import City
+from haversine_table import HaversineTable
+from landmarks import Landmarks
+from map import Map
 from search import Search
 from search_result import SearchResult
 
@@ -10,24 +12,39 @@ class AstarSearch(Search):
 
     name = "astar"
 
+    def __init__(self, map : Map, landmarks : Landmarks = None, use_haversine : bool = True) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            landmarks (Landmarks): Landmark distances to estimate costs with, in addition to or instead of the haversine distance.
+            use_haversine (bool): Whether to estimate costs with the haversine distance.
+        """
+
+        super().__init__(map)
+        self.landmarks = landmarks
+        self.use_haversine = use_haversine
+        # The haversine distance from every city to the target of the current search, see perform.
+        self.target_distances = None
+        # How much the estimate is trusted over the path cost so far. Above 1, fewer cities are expanded
+        # but the path found may cost up to this many times the lowest cost (see WeightedAstarSearch).
+        self.weight = 1.0
+
     # Source: https://stackoverflow.com/questions/4913349/haversine-formula-in-python-bearing-and-distance-between-two-gps-points
-    def __calculate_distance__(self, current : City, target : City, in_miles : bool = False) -> float:
+    def __calculate_distance__(self, current : int, target : int, in_miles : bool = False) -> float:
         """
         Calculates the haversine distance between two cities.
 
         Args:
-            current (City): The current city to calculate distance from.
-            target (City): The target city to calculate distance to.
+            current (int): The ID of the current city to calculate distance from.
+            target (int): The ID of the target city to calculate distance to.
             in_mies (bool): Wether or not to calculate the distance in miles. False calculates the distance in kilometers.
 
         Returns:
             float: The distance in kilometers or miles between two cities.
         """
 
-        lat1 = math.radians(current.latitude.value)
-        long1 = math.radians(current.longitude.value)
-        lat2 = math.radians(target.latitude.value)
-        long2 = math.radians(target.longitude.value)
+        lat1, long1 = self.map.get_radians(current)
+        lat2, long2 = self.map.get_radians(target)
 
         deltaLat = lat1 - lat2
         deltaLong = long1 - long2
@@ -39,6 +56,31 @@ class AstarSearch(Search):
 
         return r * c
             
+    def __estimate__(self, current : int, target : int) -> float:
+        """
+        Estimates the cost of the cheapest path between two cities. When both the haversine distance
+        and landmarks are used, the larger of the two estimates is used.
+
+        Args:
+            current (int): The ID of the current city to estimate the cost from.
+            target (int): The ID of the target city to estimate the cost to.
+
+        Returns:
+            float: The estimated cost.
+        """
+
+        estimate = 0
+
+        if self.target_distances is not None:
+            estimate = self.target_distances[current]
+        elif self.use_haversine:
+            estimate = self.__calculate_distance__(current, target)
+
+        if self.landmarks is not None:
+            estimate = max(estimate, self.landmarks.lower_bound(current, target))
+
+        return estimate
+
     def perform(self, start : str, target : str) -> SearchResult:
         """
         Performs an A* search from the given start city until the given target city is found.
@@ -51,39 +93,63 @@ class AstarSearch(Search):
             SearchResult: The result of the A* search.
         """
 
-        start_city = self.map.get_city(start)
-        target_city = self.map.get_city(target)
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        # Calculate the distances to the target for every city at once if NumPy is installed, otherwise one at a time as cities are reached.
+        haversine_table = HaversineTable.for_map(self.map) if self.use_haversine else None
+        self.target_distances = haversine_table.get(target_id) if haversine_table is not None else None
+
+        frontier = self.frontier_type()
+        parents = { start_id: None }
+        costs = { start_id: 0 }
+        estimated_costs = { start_id: self.weight * self.__estimate__(start_id, target_id) }
 
-        frontier = [ start_city ]
-        parents = { start_city: None }
-        costs = { start_city: 0 }
-        estimated_costs = { start_city: self.__calculate_distance__(start_city, target_city) }
+        frontier.push(start_id, estimated_costs[start_id])
 
-        result = SearchResult(AstarSearch.name, start, target, explored=1)
+        result = SearchResult(self.name, start, target, explored=1)
 
         while frontier:
-            current = self.__pop_next_lowest_cost__(frontier, estimated_costs)
+            current = frontier.pop()
             result.expanded += 1
 
-            if current == target_city:
+            if current == target_id:
                 result.success = True
-                result.path = self.__build_path__(current, parents)
+                result.set_path_parents(self.map, parents, current)
                 result.cost = costs[current]
                 result.maintained = len(frontier)
 
                 break
 
-            for action in current.actions:
-                neighbor = self.map.get_city(action.destination)
-                cost = costs[current] + action.cost
+            for neighbor, action_cost in self.map.get_neighbors(current):
+                cost = costs[current] + action_cost
 
                 if cost < costs.get(neighbor, math.inf):
                     parents[neighbor] = current
                     costs[neighbor] = cost
-                    estimated_costs[neighbor] = cost + self.__calculate_distance__(neighbor, target_city)
+                    estimated_costs[neighbor] = cost + self.weight * self.__estimate__(neighbor, target_id)
 
                     if neighbor not in frontier:
-                        frontier.append(neighbor)
                         result.explored += 1
+
+                    # Adds the neighbor, or lowers its priority if it is already in the frontier.
+                    frontier.push(neighbor, estimated_costs[neighbor])
                         
         return result
+
+class AltSearch(AstarSearch):
+    """
+    Represents an A* search that estimates costs with landmarks only (ALT). The estimates never
+    overestimate, so the path found always has the lowest cost, even where the coordinates of the map are off.
+    """
+
+    name = "alt"
+
+    def __init__(self, map : Map, landmarks : Landmarks = None) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            landmarks (Landmarks): The landmarks to estimate costs with. Defaults to the landmarks registered for the map.
+        """
+
+        super().__init__(map, landmarks or Landmarks.for_map(map), use_haversine=False)
@@ -0,0 +1,336 @@
+# Annotations name numpy.ndarray, so they are left unevaluated for the module to import without NumPy.
+from __future__ import annotations
+import math
+from bfs import BreadthFirstSearch
+from csr_graph import CsrGraph
+from map import Map
+from map_cache import MapCache
+from search import follow_lowest_costs
+from search_result import SearchResult
+from typing import Iterable, Self
+from ucs import UniformCostSearch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The largest number of cells in the matrices of a single batch, which bounds how many starts are searched at once.
+DEFAULT_MAX_CELLS = 2**24
+
+# The batch engines of every map they have been created for, see BatchEngine.for_map.
+registered = MapCache()
+
+class BatchEngine:
+    """
+    Represents an engine that answers many breadth-first and uniform-cost queries at once with NumPy.
+
+    Every action of the map is stored in flat arrays, like a CSR graph. Queries are grouped by start
+    city, and the searches from a batch of starts run together in lockstep. The cities every search
+    is working on are kept as flat arrays of (city, search) pairs, and every step follows the actions
+    of all of them with a handful of whole-array operations, so there is no Python work per action or
+    per city, while doing no more work in total than searching from every start separately.
+
+    Breadth-first queries expand one layer of every search per step and find the same paths as
+    BreadthFirstSearch, with the same costs. Uniform-cost queries relax actions like the Bellman-Ford
+    algorithm until no cost that matters changes, and find the same lowest costs as UniformCostSearch,
+    although a different path may be chosen when several have the same cost. No city is explored one
+    at a time, so the explored, expanded, and maintained counts of the results are left at 0.
+    """
+
+    def __init__(self, map : Map | CsrGraph, max_cells : int = DEFAULT_MAX_CELLS) -> None:
+        """
+        Args:
+            map (Map | CsrGraph): The map to search.
+            max_cells (int): The largest number of cells in the matrices of a single batch, which hold a
+                value for every city in every search of the batch.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+
+        if numpy is None:
+            raise ImportError("Error: The batch engine requires NumPy to be installed.")
+
+        self.map = map
+        self.max_cells = max_cells
+
+        counts = []
+        targets = []
+        costs = []
+
+        for city_id in range(len(map)):
+            neighbors = map.get_neighbors(city_id)
+            counts.append(len(neighbors))
+
+            for neighbor, cost in neighbors:
+                targets.append(neighbor)
+                costs.append(cost)
+
+        # The actions of the city with ID i are actions offsets[i] to offsets[i + 1], in the order BFS
+        # follows them, so the index of an action also orders it like BFS does.
+        self.counts = numpy.array(counts, dtype=numpy.int64)
+        self.offsets = numpy.concatenate(([ 0 ], numpy.cumsum(self.counts))).astype(numpy.int64)
+        self.sources = numpy.repeat(numpy.arange(len(map), dtype=numpy.int64), self.counts)
+        self.targets = numpy.array(targets, dtype=numpy.int64)
+        self.costs = numpy.array(costs, dtype=numpy.float64)
+
+    @classmethod
+    def for_map(cls, map : Map | CsrGraph) -> Self:
+        """
+        Gets the batch engine of the given map, creating it first if the map has none yet or has
+        changed since it was created.
+
+        Args:
+            map (Map | CsrGraph): The map to get the engine of.
+
+        Returns:
+            BatchEngine: The engine of the map.
+        """
+
+        return registered.get_or_build(map, cls)
+
+    def __batches__(self, start_ids : list[int]) -> Iterable[list[int]]:
+        """
+        Splits the start cities into batches small enough that none of the matrices of a batch have more than max_cells cells.
+        """
+
+        size = max(1, self.max_cells // max(len(self.map), 1))
+
+        for i in range(0, len(start_ids), size):
+            yield start_ids[i:i + size]
+
+    def __expand__(self, city_ids : numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Lists the actions of every given city.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The index of the given city every action belongs to, and the index of the action.
+        """
+
+        counts = self.counts[city_ids]
+        owners = numpy.repeat(numpy.arange(len(city_ids)), counts)
+        firsts = numpy.cumsum(counts) - counts
+
+        return (owners, self.offsets[city_ids][owners] + numpy.arange(len(owners)) - firsts[owners])
+
+    def __first_of_groups__(self, groups : numpy.ndarray, keys : numpy.ndarray) -> numpy.ndarray:
+        """
+        Finds the entry with the lowest key in every group.
+
+        Returns:
+            numpy.ndarray: The indices of the chosen entries, in order of their groups.
+        """
+
+        order = numpy.lexsort((keys, groups))
+        sorted_groups = groups[order]
+
+        if len(order) == 0:
+            return order
+
+        return order[numpy.concatenate(([ True ], sorted_groups[1:] != sorted_groups[:-1]))]
+
+    def __pairs__(self, target_ids : list[list[int]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Flattens the targets of every start into the cities and searches of the pairs to wait for, or None to search the whole map.
+        """
+
+        if target_ids is None:
+            return None
+
+        cities = numpy.array([ target_id for targets in target_ids for target_id in targets ], dtype=numpy.int64)
+        searches = numpy.array([ search for search, targets in enumerate(target_ids) for _ in targets ], dtype=numpy.int64)
+
+        return (cities, searches)
+
+    def hop_counts(self, start_ids : list[int], target_ids : list[list[int]] = None) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Performs a breadth-first search from every given start city at once.
+
+        Args:
+            start_ids (list[int]): The IDs of the start cities, at most max_cells divided by the number of cities.
+            target_ids (list[list[int]]): The IDs of the targets of every start. The searches stop once every
+                target has been found. Defaults to searching the whole map.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The number of actions on the path from every start to
+            every city, or -1 for cities that weren't reached, and the parent BFS would give every city,
+            or -1 for the starts and cities that weren't reached. Both have a row for every city and a
+            column for every start.
+        """
+
+        hops = numpy.full((len(self.map), len(start_ids)), -1, dtype=numpy.int64)
+        parents = numpy.full((len(self.map), len(start_ids)), -1, dtype=numpy.int64)
+        pairs = self.__pairs__(target_ids)
+
+        # The current layer of every search as (city, search) pairs, with the position of every city in
+        # the order BFS adds the cities of the layer to its queue.
+        layer_cities = numpy.array(start_ids, dtype=numpy.int64)
+        layer_searches = numpy.arange(len(start_ids))
+        layer_ranks = numpy.zeros(len(start_ids), dtype=numpy.int64)
+
+        hops[layer_cities, layer_searches] = 0
+        depth = 0
+
+        while len(layer_cities) > 0:
+            if pairs is not None:
+                # Leave out the searches that have found all their targets.
+                unfinished = numpy.zeros(len(start_ids), dtype=bool)
+                unfinished[pairs[1][hops[pairs] < 0]] = True
+                layer = unfinished[layer_searches]
+                layer_cities, layer_searches, layer_ranks = layer_cities[layer], layer_searches[layer], layer_ranks[layer]
+
+            owners, actions = self.__expand__(layer_cities)
+            cities = self.targets[actions]
+            searches = layer_searches[owners]
+
+            unseen = hops[cities, searches] < 0
+            owners, actions, cities, searches = owners[unseen], actions[unseen], cities[unseen], searches[unseen]
+
+            # A city is added to the queue by the first city of the layer that reaches it, and cities reached
+            # by the same city are added in the order of its actions. Ordering keys that combine the two
+            # pick the same parent and give the next layer the same order as BFS.
+            keys = layer_ranks[owners] * len(self.targets) + actions
+            chosen = self.__first_of_groups__(cities * len(start_ids) + searches, keys)
+
+            layer_cities, layer_searches, keys = cities[chosen], searches[chosen], keys[chosen]
+            depth += 1
+
+            hops[layer_cities, layer_searches] = depth
+            parents[layer_cities, layer_searches] = self.sources[keys % len(self.targets)]
+
+            # Rank the new layer of every search by its ordering keys.
+            order = numpy.lexsort((keys, layer_searches))
+            layer_ranks = numpy.empty(len(order), dtype=numpy.int64)
+            layer_ranks[order] = numpy.arange(len(order)) - numpy.searchsorted(layer_searches[order], layer_searches[order])
+
+        return (hops, parents)
+
+    def path_costs(self, start_ids : list[int], target_ids : list[list[int]] = None) -> numpy.ndarray:
+        """
+        Calculates the lowest path costs from every given start city at once. Every step relaxes the
+        actions of the cities whose cost went down in the previous step until no cost goes down.
+
+        Args:
+            start_ids (list[int]): The IDs of the start cities, at most max_cells divided by the number of cities.
+            target_ids (list[list[int]]): The IDs of the targets of every start. Cities that cost at least as
+                much as every target of their search are left alone, since no target can get cheaper through
+                them. Defaults to searching the whole map.
+
+        Returns:
+            numpy.ndarray: The lowest path cost from every start to every city, or infinity for cities
+            that weren't reached, with a row for every city and a column for every start. Only the costs
+            of the targets are final, unless searching the whole map.
+        """
+
+        costs = numpy.full((len(self.map), len(start_ids)), numpy.inf)
+        pairs = self.__pairs__(target_ids)
+        bounds = numpy.full(len(start_ids), numpy.inf)
+
+        # The cities whose cost went down in the previous step as (city, search) pairs.
+        changed_cities = numpy.array(start_ids, dtype=numpy.int64)
+        changed_searches = numpy.arange(len(start_ids))
+
+        costs[changed_cities, changed_searches] = 0
+
+        while len(changed_cities) > 0:
+            owners, actions = self.__expand__(changed_cities)
+            cities = self.targets[actions]
+            searches = changed_searches[owners]
+            candidates = costs[changed_cities, changed_searches][owners] + self.costs[actions]
+
+            if pairs is not None:
+                # The cost of the most expensive target of every search.
+                bounds = numpy.zeros(len(start_ids))
+                numpy.maximum.at(bounds, pairs[1], costs[pairs])
+
+            lower = (candidates < costs[cities, searches]) & (candidates < bounds[searches])
+            cities, searches, candidates = cities[lower], searches[lower], candidates[lower]
+
+            chosen = self.__first_of_groups__(cities * len(start_ids) + searches, candidates)
+            changed_cities, changed_searches = cities[chosen], searches[chosen]
+
+            costs[changed_cities, changed_searches] = candidates[chosen]
+
+        return costs
+
+    def perform(self, queries : Iterable[tuple[str, str]], method : str = UniformCostSearch.name) -> list[SearchResult]:
+        """
+        Answers every query, searching from every distinct start city once, in batches.
+
+        Args:
+            queries (Iterable[tuple[str, str]]): The start and target of every query.
+            method (str): Either "bfs" for the paths with the fewest actions, or "ucs" for the lowest cost paths.
+
+        Returns:
+            list[SearchResult]: The result of every query, in the same order as the queries.
+
+        Raises:
+            ValueError: If the engine can't perform the given search method.
+        """
+
+        if method not in (BreadthFirstSearch.name, UniformCostSearch.name):
+            raise ValueError(f"Error: The batch engine can't perform '{method}' searches.")
+
+        queries = list(queries)
+        results = [ SearchResult(method, start, target) for start, target in queries ]
+
+        # The queries of every start city, skipping any with a city that isn't in the map.
+        by_start = {}
+
+        for index, (start, target) in enumerate(queries):
+            start_id = self.map.get_city_id(start)
+            target_id = self.map.get_city_id(target)
+
+            if start_id is not None and target_id is not None:
+                by_start.setdefault(start_id, []).append((index, target_id))
+
+        for start_ids in self.__batches__(list(by_start)):
+            target_ids = [ [ target_id for _, target_id in by_start[start_id] ] for start_id in start_ids ]
+
+            if method == BreadthFirstSearch.name:
+                hops, parents = self.hop_counts(start_ids, target_ids)
+            else:
+                costs = self.path_costs(start_ids, target_ids)
+
+            for search, start_id in enumerate(start_ids):
+                for index, target_id in by_start[start_id]:
+                    if method == BreadthFirstSearch.name:
+                        path = self.__follow_parents__(parents[:, search], start_id, target_id) if hops[target_id, search] >= 0 else None
+                    else:
+                        path = follow_lowest_costs(self.map, start_id, target_id, costs[:, search].__getitem__) if costs[target_id, search] < math.inf else None
+
+                    if path is not None:
+                        results[index].success = True
+                        results[index].set_path_ids(self.map, path)
+                        results[index].cost = self.__path_cost__(path, method == UniformCostSearch.name)
+
+        return results
+
+    def __follow_parents__(self, parents : numpy.ndarray, start_id : int, target_id : int) -> list[int]:
+        """
+        Builds the path from the start to the target by following the parents back from the target.
+        """
+
+        path = [ target_id ]
+
+        while path[-1] != start_id:
+            path.append(int(parents[path[-1]]))
+
+        path.reverse()
+
+        return path
+
+    def __path_cost__(self, path : list[int], cheapest : bool) -> int | float:
+        """
+        Adds up the costs of the actions between the cities of a path, either the cheapest action between
+        every two cities, or the first one like BFS follows.
+        """
+
+        cost = 0
+
+        for source, destination in zip(path, path[1:]):
+            costs = [ action_cost for neighbor, action_cost in self.map.get_neighbors(source) if neighbor == destination ]
+            cost += min(costs) if cheapest else costs[0]
+
+        return cost
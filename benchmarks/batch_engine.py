@@ -0,0 +1,55 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from batch_engine import BatchEngine
+from benchmarks.generate_map import write_map
+from bfs import BreadthFirstSearch
+from map import Map
+from ucs import UniformCostSearch
+
+def main(args):
+    file_name = args.map_file
+
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), f"batch_engine_benchmark_{args.count}.txt")
+        write_map(file_name, args.count)
+
+    map = Map.from_file(file_name)
+    print(f"Map: {file_name} ({len(map)} cities)")
+
+    start_time = time.perf_counter()
+    engine = BatchEngine.for_map(map)
+    print(f"Setup: {time.perf_counter() - start_time:.3f} s")
+
+    names = [ map.get_city_by_id(city_id).name for city_id in range(len(map)) ]
+    generator = random.Random(args.seed)
+    starts = [ generator.choice(names) for _ in range(args.starts) ]
+    queries = [ (generator.choice(starts), generator.choice(names)) for _ in range(args.queries) ]
+
+    for search_type in (BreadthFirstSearch, UniformCostSearch):
+        start_time = time.perf_counter()
+        results = engine.perform(queries, search_type.name)
+        engine_elapsed = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        expected = [ search_type(map).perform(start, target) for start, target in queries ]
+        loop_elapsed = time.perf_counter() - start_time
+
+        # Breadth-first paths have to match exactly, uniform-cost paths only in cost since ties may be broken differently.
+        mismatches = sum(result.cost != other.cost or result.success != other.success or (search_type is BreadthFirstSearch and result.path != other.path) for result, other in zip(results, expected))
+
+        print(f"{search_type.name:>4}: engine {engine_elapsed / len(queries) * 1000:8.3f} ms per query, one at a time {loop_elapsed / len(queries) * 1000:8.3f} ms per query, {loop_elapsed / engine_elapsed:5.1f}x, {mismatches} results differ")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the NumPy batch engine against performing breadth-first and uniform-cost queries one at a time.")
+    parser.add_argument("map_file", nargs="?", help="The map file to search. A synthetic map is generated when omitted.")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="The number of cities in the generated map.")
+    parser.add_argument("-q", "--queries", type=int, default=1000, help="The number of random queries to perform.")
+    parser.add_argument("--starts", type=int, default=100, help="The number of distinct start cities the queries are picked from.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for picking random queries.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,164 @@
+import argparse
+import math
+import random
+
+# Rough bounding box of mainland France, in degrees.
+MIN_LATITUDE, MAX_LATITUDE = 42.3, 51.1
+MIN_LONGITUDE, MAX_LONGITUDE = -4.8, 8.2
+
+def to_dms(value : float, positive : str, negative : str) -> str:
+    """
+    Formats a coordinate in decimal degrees the way map files store them.
+
+    Args:
+        value (float): The coordinate in decimal degrees.
+        positive (str): The hemisphere letter for positive values.
+        negative (str): The hemisphere letter for negative values.
+
+    Returns:
+        str: The coordinate as "degrees minutes seconds hemisphere".
+    """
+
+    hemisphere = positive if value >= 0 else negative
+    total_seconds = round(abs(value) * 3600)
+
+    return f"{total_seconds // 3600} {total_seconds // 60 % 60} {total_seconds % 60} {hemisphere}"
+
+def from_dms_seconds(total_seconds : int, negative : bool) -> float:
+    """
+    Converts a whole number of arc seconds back into decimal degrees, matching what the map loader will read.
+    """
+
+    value = total_seconds // 3600 + (total_seconds // 60 % 60) / 60 + (total_seconds % 60) / 3600
+
+    return -value if negative else value
+
+def haversine(lat1 : float, long1 : float, lat2 : float, long2 : float) -> float:
+    """
+    Calculates the haversine distance in kilometers between two points given in degrees.
+    """
+
+    lat1, long1, lat2, long2 = map(math.radians, (lat1, long1, lat2, long2))
+    a = math.sin((lat1 - lat2) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((long1 - long2) / 2)**2
+
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+def generate_cities(count : int, rng : random.Random) -> list[tuple[str, float, float]]:
+    """
+    Places the given number of cities at random inside the bounding box. Coordinates are rounded to
+    whole arc seconds so the generated costs agree with the coordinates the loader reads back.
+    """
+
+    cities = []
+
+    for i in range(count):
+        latitude = round(rng.uniform(MIN_LATITUDE, MAX_LATITUDE) * 3600)
+        longitude = round(rng.uniform(MIN_LONGITUDE, MAX_LONGITUDE) * 3600)
+
+        cities.append((f"city{i}", from_dms_seconds(latitude, False), from_dms_seconds(abs(longitude), longitude < 0)))
+
+    return cities
+
+def generate_roads(cities : list[tuple[str, float, float]], degree : int, rng : random.Random) -> list[dict[int, int]]:
+    """
+    Connects every city to its nearest neighbors, like a road network. Nearby cities are found with a
+    uniform grid so generation stays close to linear in the number of cities. A chain through the grid
+    cells keeps the whole map connected.
+
+    Every road costs at least the straight line distance between its cities, so the haversine heuristic stays
+    admissible. Roads are added in both directions, with a slightly different cost each way.
+    """
+
+    count = len(cities)
+    roads = [ {} for _ in range(count) ]
+
+    # Aim for about two cities per grid cell.
+    cells_per_side = max(1, int(math.sqrt(count / 2)))
+    cell_height = (MAX_LATITUDE - MIN_LATITUDE) / cells_per_side
+    cell_width = (MAX_LONGITUDE - MIN_LONGITUDE) / cells_per_side
+
+    def cell_of(city_id : int) -> tuple[int, int]:
+        _, latitude, longitude = cities[city_id]
+        row = min(cells_per_side - 1, int((latitude - MIN_LATITUDE) / cell_height))
+        column = min(cells_per_side - 1, int((longitude - MIN_LONGITUDE) / cell_width))
+
+        return (row, column)
+
+    grid = {}
+    for city_id in range(count):
+        grid.setdefault(cell_of(city_id), []).append(city_id)
+
+    def connect(a : int, b : int) -> None:
+        if a == b or b in roads[a]:
+            return
+
+        distance = haversine(cities[a][1], cities[a][2], cities[b][1], cities[b][2])
+        roads[a][b] = math.ceil(distance * rng.uniform(1.1, 1.4)) + 1
+        roads[b][a] = math.ceil(distance * rng.uniform(1.1, 1.4)) + 1
+
+    for city_id in range(count):
+        row, column = cell_of(city_id)
+        _, latitude, longitude = cities[city_id]
+
+        # Widen the search ring until there are enough candidates to choose from.
+        radius = 1
+        while True:
+            candidates = []
+            for r in range(row - radius, row + radius + 1):
+                for c in range(column - radius, column + radius + 1):
+                    candidates.extend(grid.get((r, c), ()))
+
+            if len(candidates) > degree or radius >= cells_per_side:
+                break
+
+            radius += 1
+
+        candidates.sort(key=lambda other: (cities[other][1] - latitude)**2 + (cities[other][2] - longitude)**2)
+
+        for other in candidates[1:degree + 1]:
+            connect(city_id, other)
+
+    # Snake through the grid cells and link consecutive cities so the map is connected.
+    chain = []
+    for row in range(cells_per_side):
+        columns = range(cells_per_side) if row % 2 == 0 else range(cells_per_side - 1, -1, -1)
+        for column in columns:
+            chain.extend(grid.get((row, column), ()))
+
+    for a, b in zip(chain, chain[1:]):
+        connect(a, b)
+
+    return roads
+
+def write_map(file_name : str, count : int, degree : int = 3, seed : int = 0) -> None:
+    """
+    Generates a random road-like map and writes it in the same format as france.txt. The same
+    count, degree, and seed always produce the same file.
+
+    Args:
+        file_name (str): The name of the file to write the map to.
+        count (int): The number of cities to generate.
+        degree (int): The number of nearest neighbors every city is connected to.
+        seed (int): The seed for the random number generator.
+    """
+
+    rng = random.Random(seed)
+    cities = generate_cities(count, rng)
+    roads = generate_roads(cities, degree, rng)
+
+    with open(file_name, "w") as file:
+        for city_id, (name, latitude, longitude) in enumerate(cities):
+            actions = " ".join(f"va-{cities[other][0]} {cost}" for other, cost in roads[city_id].items())
+
+            file.write(f"{name} {to_dms(latitude, 'N', 'S')} {to_dms(longitude, 'E', 'W')} --> {actions}\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a synthetic road-like map in the france.txt format.")
+    parser.add_argument("file_name", help="The name of the file to write the map to.")
+    parser.add_argument("count", type=int, help="The number of cities to generate.")
+    parser.add_argument("-d", "--degree", type=int, default=3, help="The number of nearest neighbors every city is connected to.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for the random number generator.")
+
+    args = parser.parse_args()
+
+    write_map(args.file_name, args.count, args.degree, args.seed)
@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from astar import AstarSearch
+from benchmarks.generate_map import write_map
+from contraction_hierarchy import DEFAULT_WITNESS_LIMIT, ContractionHierarchy, ContractionHierarchySearch
+from map import Map
+from ucs import UniformCostSearch
+
+def main(args):
+    file_name = args.map_file
+
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), f"hierarchy_benchmark_{args.count}.txt")
+        write_map(file_name, args.count)
+
+    map = Map.from_file(file_name)
+    print(f"Map: {file_name} ({len(map)} cities)")
+
+    start_time = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(map, args.witness_limit)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Preprocessing: {elapsed:.3f} s, {hierarchy.shortcut_count()} shortcuts")
+
+    names = [ map.get_city_by_id(city_id).name for city_id in range(len(map)) ]
+    generator = random.Random(args.seed)
+    queries = [ (generator.choice(names), generator.choice(names)) for _ in range(args.queries) ]
+
+    searches = {
+        UniformCostSearch.name: UniformCostSearch(map),
+        AstarSearch.name: AstarSearch(map),
+        ContractionHierarchySearch.name: ContractionHierarchySearch(map, hierarchy)
+    }
+
+    costs = {}
+
+    for name, search in searches.items():
+        expanded = 0
+        mismatches = 0
+        start_time = time.perf_counter()
+
+        for start, target in queries:
+            result = search.perform(start, target)
+            expanded += result.expanded
+
+            # Every method is compared against the costs found by uniform-cost search.
+            if costs.setdefault((start, target), result.cost) != result.cost:
+                mismatches += 1
+
+        elapsed = time.perf_counter() - start_time
+
+        print(f"{name:>6}: {elapsed / len(queries) * 1000:8.3f} ms per query, {expanded / len(queries):10.1f} expanded, {mismatches} costs differ from ucs")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares contraction hierarchy queries against uniform-cost and A* search.")
+    parser.add_argument("map_file", nargs="?", help="The map file to search. A synthetic map is generated when omitted.")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="The number of cities in the generated map.")
+    parser.add_argument("-q", "--queries", type=int, default=200, help="The number of random queries to perform.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for picking random queries.")
+    parser.add_argument("-w", "--witness-limit", type=int, default=DEFAULT_WITNESS_LIMIT, help="The number of cities a witness search may settle.")
+
+    args = parser.parse_args()
+
+    main(args)
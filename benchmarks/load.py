@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from main import load_map
+from server import DEFAULT_HOST, DEFAULT_PORT
+
+async def run_connection(reader : asyncio.StreamReader, writer : asyncio.StreamWriter, queries : list[dict], latencies : list[float], errors : dict[str, int]) -> None:
+    """
+    Sends queries on a connection one at a time, waiting for every response before sending the next query.
+
+    Args:
+        reader (asyncio.StreamReader): The stream responses are read from.
+        writer (asyncio.StreamWriter): The stream queries are written to.
+        queries (list[dict]): The requests to send.
+        latencies (list[float]): The list the time from sending every request to receiving its response is added to.
+        errors (dict[str, int]): The number of times every error was received.
+    """
+
+    for query in queries:
+        start_time = time.perf_counter()
+
+        writer.write(json.dumps(query).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+
+        latencies.append(time.perf_counter() - start_time)
+
+        if "error" in response:
+            errors[response["error"]] = errors.get(response["error"], 0) + 1
+
+    writer.close()
+    await writer.wait_closed()
+
+async def run(args) -> None:
+    map = load_map(args.map_file)
+    names = [ map.get_city_by_id(city_id).name for city_id in range(len(map)) ]
+    generator = random.Random(args.seed)
+
+    queries = [ { "id": i, "start": generator.choice(names), "target": generator.choice(names), "method": generator.choice(args.methods) } for i in range(args.requests) ]
+
+    connections = []
+
+    for _ in range(args.connections):
+        if args.unix:
+            connections.append(await asyncio.open_unix_connection(args.unix))
+        else:
+            connections.append(await asyncio.open_connection(args.host, args.port))
+
+    latencies = []
+    errors = {}
+    start_time = time.perf_counter()
+
+    # Every connection sends its share of the queries, so there are at most as many queries in flight as connections.
+    await asyncio.gather(*(run_connection(reader, writer, queries[i::args.connections], latencies, errors) for i, (reader, writer) in enumerate(connections)))
+
+    elapsed = time.perf_counter() - start_time
+    latencies.sort()
+
+    print(f"Requests: {len(latencies)} in {elapsed:.3f} s, {len(latencies) / elapsed:.1f} per second over {args.connections} connections")
+    print(f"Latency: mean {statistics.mean(latencies) * 1000:.3f} ms, p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000:.3f} ms")
+
+    for error, count in errors.items():
+        print(f"{count} x {error}")
+
+def main(args):
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sends random queries to a running search server and measures its throughput and latency.")
+    parser.add_argument("map_file", help="The map file the server was started with, to pick random cities from.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="The address of the server.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="The TCP port of the server.")
+    parser.add_argument("--unix", metavar="SOCKET_PATH", help="Connect to a Unix socket at the given path instead of TCP.")
+    parser.add_argument("-c", "--connections", type=int, default=8, help="The number of connections sending queries at the same time.")
+    parser.add_argument("-n", "--requests", type=int, default=1000, help="The total number of queries to send.")
+    parser.add_argument("-m", "--methods", nargs="+", default=["astar"], help="The search methods to pick from for every query.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for picking queries.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,91 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from action import Action
+from benchmarks.generate_map import write_map
+from city import City
+from coordinate import Coordinate
+from csr_graph import CsrGraph
+from map import Map
+
+def legacy_from_file(file_name : str) -> Map:
+    """
+    The map loader as it was before the streaming loader: reads every line up front and runs a
+    regular expression on every action. Kept here as the baseline to compare against.
+    """
+
+    cities = []
+
+    with open(file_name, "r") as file:
+        for line in file.readlines():
+            city_part, action_part = line.strip().split(" --> ")
+
+            city_name, lat_degrees, lat_minutes, lat_seconds, lat_heading, long_degrees, long_minutes, long_seconds, long_heading = city_part.split()
+            latitude = Coordinate.from_dms(lat_degrees, lat_minutes, lat_seconds, lat_heading)
+            longitude = Coordinate.from_dms(long_degrees, long_minutes, long_seconds, long_heading)
+            city = City(city_name.lower(), latitude, longitude)
+
+            parts = action_part.split()
+            for action in zip(parts[::2], parts[1::2]):
+                destination = re.sub("va-", "", action[0])
+                city.add_action(Action(destination.lower(), int(action[1])))
+
+            cities.append(city)
+
+    return Map(cities)
+
+loaders = {
+    "legacy": legacy_from_file,
+    "streaming": Map.from_file,
+    "streaming-csr": CsrGraph.from_file
+}
+
+def measure(loader, file_name : str) -> tuple[float, int]:
+    """
+    Loads the given map file with the given loader, tracking time and peak memory.
+
+    Returns:
+        tuple[float, int]: The time taken in seconds and the peak traced memory in bytes.
+    """
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+
+    loader(file_name)
+
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (elapsed, peak)
+
+def main(args):
+    file_name = args.map_file
+
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), f"loader_benchmark_{args.count}.txt")
+        write_map(file_name, args.count)
+
+    print(f"Map: {file_name} ({os.path.getsize(file_name) / 2**20:.1f} MiB)")
+
+    for name, loader in loaders.items():
+        # Untraced run first, tracemalloc slows allocation heavy code down considerably.
+        start_time = time.perf_counter()
+        loader(file_name)
+        elapsed = time.perf_counter() - start_time
+
+        _, peak = measure(loader, file_name)
+
+        print(f"{name:>14}: {elapsed:8.3f} s, peak memory {peak / 2**20:8.1f} MiB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the map loaders on a map file.")
+    parser.add_argument("map_file", nargs="?", help="The map file to load. A synthetic map is generated when omitted.")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="The number of cities in the generated map.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,87 @@
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from astar import AstarSearch
+from benchmarks.generate_map import write_map
+from lpastar import LpaStarSearch
+from map import Map
+
+def main(args):
+    file_name = args.map_file
+
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), f"replanning_benchmark_{args.count}.txt")
+        write_map(file_name, args.count)
+
+    map = Map.from_file(file_name)
+    print(f"Map: {file_name} ({len(map)} cities)")
+
+    names = [ map.get_city_by_id(city_id).name for city_id in range(len(map)) ]
+    generator = random.Random(args.seed)
+
+    totals = { "lpastar": [0, 0.0], "astar": [0, 0.0] }
+    first_expanded = 0
+    mismatches = 0
+
+    for _ in range(args.queries):
+        start, target = generator.choice(names), generator.choice(names)
+        planner = LpaStarSearch(map)
+        result = planner.perform(start, target)
+        first_expanded += result.expanded
+
+        for _ in range(args.rounds):
+            # Half of the edits slow down an action on the current path, which forces a new path, the rest
+            # hit random actions anywhere on the map. Costs only go up, so the haversine distance stays an
+            # admissible estimate.
+            for _ in range(args.edits):
+                if result.success and len(result.path) > 1 and generator.random() < 0.5:
+                    index = generator.randrange(len(result.path) - 1)
+                    source, destination = result.path[index], result.path[index + 1].name
+                else:
+                    source = map.get_city_by_id(generator.randrange(len(map)))
+
+                    if not source.actions:
+                        continue
+
+                    destination = generator.choice(source.actions).destination
+
+                action = next(action for action in source.actions if action.destination == destination)
+                map.update_edge_cost(source.name, destination, math.ceil(action.cost * generator.uniform(1, 3)))
+
+            start_time = time.perf_counter()
+            result = planner.perform(start, target)
+            totals["lpastar"][0] += result.expanded
+            totals["lpastar"][1] += time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            fresh = AstarSearch(map).perform(start, target)
+            totals["astar"][0] += fresh.expanded
+            totals["astar"][1] += time.perf_counter() - start_time
+
+            if fresh.cost != result.cost:
+                mismatches += 1
+
+    replans = args.queries * args.rounds
+
+    print(f"First search: {first_expanded / args.queries:10.1f} expanded")
+
+    for name, (expanded, elapsed) in totals.items():
+        print(f"{name:>8}: {elapsed / replans * 1000:8.3f} ms per replan, {expanded / replans:10.1f} expanded")
+
+    print(f"Work saved: {1 - totals['lpastar'][0] / max(totals['astar'][0], 1):.1%} fewer expansions, {mismatches} costs differ from astar")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares repairing an LPA* search after small changes to action costs against a new A* search.")
+    parser.add_argument("map_file", nargs="?", help="The map file to search. A synthetic map is generated when omitted.")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="The number of cities in the generated map.")
+    parser.add_argument("-q", "--queries", type=int, default=20, help="The number of random queries to replan.")
+    parser.add_argument("-r", "--rounds", type=int, default=10, help="The number of times every query is replanned.")
+    parser.add_argument("-e", "--edits", type=int, default=3, help="The number of action costs changed before every replan.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for picking queries and edits.")
+
+    args = parser.parse_args()
+
+    main(args)
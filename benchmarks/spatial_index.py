@@ -0,0 +1,70 @@
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from benchmarks.generate_map import write_map
+from haversine_table import EARTH_RADIUS
+from map import Map
+from spatial_index import SpatialIndex, to_unit_vector
+
+def scan(points : list[tuple[float, float, float]], latitude : float, longitude : float, k : int) -> list[float]:
+    """
+    Finds the distances in kilometers of the k cities nearest to a point by comparing it to every city.
+    """
+
+    point = to_unit_vector(math.radians(latitude), math.radians(longitude))
+    squared_distances = sorted((x - point[0])**2 + (y - point[1])**2 + (z - point[2])**2 for x, y, z in points)[:k]
+
+    return [ EARTH_RADIUS * 2 * math.asin(min(1.0, math.sqrt(squared) / 2)) for squared in squared_distances ]
+
+def main(args):
+    file_name = args.map_file
+
+    if file_name is None:
+        file_name = os.path.join(tempfile.gettempdir(), f"spatial_index_benchmark_{args.count}.txt")
+        write_map(file_name, args.count)
+
+    map = Map.from_file(file_name)
+    print(f"Map: {file_name} ({len(map)} cities)")
+
+    start_time = time.perf_counter()
+    index = SpatialIndex.for_map(map)
+    print(f"Setup: {time.perf_counter() - start_time:.3f} s")
+
+    points = [ to_unit_vector(*map.get_radians(city_id)) for city_id in range(len(map)) ]
+    generator = random.Random(args.seed)
+    queries = []
+
+    for _ in range(args.queries):
+        # Half of the points are close to a city, the rest anywhere on Earth.
+        if generator.random() < 0.5:
+            latitude, longitude = map.get_coordinates(generator.randrange(len(map)))
+            queries.append((max(-90, min(90, latitude + generator.uniform(-0.1, 0.1))), longitude))
+        else:
+            queries.append((generator.uniform(-90, 90), generator.uniform(-180, 180)))
+
+    start_time = time.perf_counter()
+    results = [ index.nearest(latitude, longitude, args.k) for latitude, longitude in queries ]
+    index_elapsed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    expected = [ scan(points, latitude, longitude, args.k) for latitude, longitude in queries ]
+    scan_elapsed = time.perf_counter() - start_time
+
+    mismatches = sum(not all(math.isclose(distance, other_distance, abs_tol=1e-6) for (_, distance), other_distance in zip(result, other)) for result, other in zip(results, expected))
+
+    print(f"index {index_elapsed / len(queries) * 1000:8.3f} ms per query, scan {scan_elapsed / len(queries) * 1000:8.3f} ms per query, {scan_elapsed / index_elapsed:7.1f}x, {mismatches} results differ")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares spatial index lookups against comparing a point to every city.")
+    parser.add_argument("map_file", nargs="?", help="The map file to index. A synthetic map is generated when omitted.")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="The number of cities in the generated map.")
+    parser.add_argument("-q", "--queries", type=int, default=200, help="The number of random points to look up.")
+    parser.add_argument("-k", type=int, default=1, help="The number of nearest cities to find for every point.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for picking random points.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from benchmarks.generate_map import write_map
+from csr_graph import CsrGraph
+from main import search_factory, search_methods
+from map import Map
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_SIZES = [ 10**2, 10**3, 10**4, 10**5, 10**6 ]
+
+# The largest map every method is run on by default. Iterative deepening searches take exponentially
+# longer as paths get longer, and building a contraction hierarchy in pure Python takes minutes on a
+# million cities.
+DEFAULT_SIZE_LIMITS = {
+    "dls": 10**2,
+    "idastar": 10**2,
+    "ch": 10**5
+}
+
+def prepare_map(count : int, seed : int, compact : bool) -> Map | CsrGraph:
+    """
+    Generates a synthetic map of the given size, reusing the file generated for an earlier run with the same size and seed.
+
+    Args:
+        count (int): The number of cities.
+        seed (int): The seed the map is generated with.
+        compact (bool): Whether to load the map into a compact CSR graph.
+
+    Returns:
+        Map | CsrGraph: The loaded map.
+    """
+
+    file_name = os.path.join(tempfile.gettempdir(), f"benchmark_suite_{count}_{seed}.txt")
+
+    if not os.path.isfile(file_name):
+        write_map(file_name, count, seed=seed)
+
+    return CsrGraph.from_file(file_name) if compact else Map.from_file(file_name)
+
+def measure(method : str, map : Map | CsrGraph, queries : list[tuple[str, str]], trace_memory : bool) -> dict:
+    """
+    Runs every query with the given method and records how long it took and what it counted.
+
+    Args:
+        method (str): The name of the search method.
+        map (Map | CsrGraph): The map to search.
+        queries (list[tuple[str, str]]): The start and target of every query.
+        trace_memory (bool): Whether to run the queries a second time with tracemalloc to record peak memory.
+
+    Returns:
+        dict: The measurements of the method.
+    """
+
+    # Creating the first search builds whatever the method precomputes for the map, which is timed separately.
+    start_time = time.perf_counter()
+    search_factory(method, map)
+    setup_seconds = time.perf_counter() - start_time
+
+    totals = { "explored": 0, "expanded": 0, "maintained": 0, "cost": 0, "successes": 0 }
+
+    start_time = time.perf_counter()
+
+    for start, target in queries:
+        result = search_factory(method, map).perform(start, target)
+
+        totals["explored"] += result.explored
+        totals["expanded"] += result.expanded
+        totals["maintained"] += result.maintained
+        totals["cost"] += result.cost
+        totals["successes"] += result.success
+
+    query_seconds = time.perf_counter() - start_time
+
+    measurement = {
+        "setup_seconds": setup_seconds,
+        "query_seconds": query_seconds,
+        "seconds_per_query": query_seconds / len(queries),
+        "peak_memory": None,
+        **totals
+    }
+
+    if trace_memory:
+        # Timed without tracing above, since tracemalloc slows allocation heavy code down considerably.
+        tracemalloc.start()
+
+        for start, target in queries:
+            search_factory(method, map).perform(start, target)
+
+        measurement["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return measurement
+
+def compare(results : dict, baseline : dict) -> None:
+    """
+    Prints how the time per query and the counts of every method changed since a baseline run.
+
+    Args:
+        results (dict): The results of this run.
+        baseline (dict): The results of an earlier run, as written by this script.
+    """
+
+    for size, methods in results["sizes"].items():
+        for method, measurement in methods.items():
+            old = baseline.get("sizes", {}).get(size, {}).get(method)
+
+            if old is None:
+                continue
+
+            change = measurement["seconds_per_query"] / old["seconds_per_query"] - 1 if old["seconds_per_query"] else 0
+            counts = [ key for key in ("explored", "expanded", "maintained", "cost", "successes") if measurement[key] != old[key] ]
+            note = f", counts changed: {', '.join(counts)}" if counts else ""
+
+            print(f"{size:>8} {method:>8}: {change:+7.1%} time per query{note}")
+
+def main(args):
+    methods = args.methods or list(search_methods)
+    size_limits = {} if args.no_limits else DEFAULT_SIZE_LIMITS
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "seed": args.seed,
+        "queries": args.queries,
+        "compact": args.compact,
+        "sizes": {}
+    }
+
+    for size in args.sizes:
+        start_time = time.perf_counter()
+        map = prepare_map(size, args.seed, args.compact)
+        print(f"Map: {size} cities, loaded in {time.perf_counter() - start_time:.2f} s")
+
+        names = [ map.get_city_by_id(city_id).name for city_id in range(len(map)) ]
+        generator = random.Random(args.seed)
+        queries = [ (generator.choice(names), generator.choice(names)) for _ in range(args.queries) ]
+
+        results["sizes"][str(size)] = {}
+
+        for method in methods:
+            if size > size_limits.get(method, size):
+                continue
+
+            measurement = measure(method, map, queries, not args.no_memory)
+            results["sizes"][str(size)][method] = measurement
+
+            peak = f"{measurement['peak_memory'] / 2**20:8.1f} MiB" if measurement["peak_memory"] is not None else "       -"
+            print(f"{method:>8}: {measurement['seconds_per_query'] * 1000:10.3f} ms per query, setup {measurement['setup_seconds']:8.3f} s, peak {peak}, {measurement['expanded'] / len(queries):10.1f} expanded")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    print(f"Saved the results to '{args.output}'.")
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            compare(results, json.load(file))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs every search method on synthetic maps of increasing size and saves the measurements as JSON.")
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="The numbers of cities of the generated maps.")
+    parser.add_argument("-m", "--methods", nargs="+", choices=list(search_methods), help="The search methods to run. Defaults to every method.")
+    parser.add_argument("-q", "--queries", type=int, default=20, help="The number of random queries on every map.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="The seed for generating the maps and picking queries.")
+    parser.add_argument("-C", "--compact", action="store_true", help="Load the maps into compact CSR graphs.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="The file to write the results to.")
+    parser.add_argument("-b", "--baseline", help="The results of an earlier run to compare against.")
+    parser.add_argument("--no-limits", action="store_true", help="Run every method on every map, even where it is too slow to be practical.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the second run of every method that records peak memory.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -4,10 +4,15 @@ from search_result import SearchResult
 class BreadthFirstSearch(Search):
     """
     Represent a breadth-first search.
+
+    The frontier is a queue and every city is marked as seen when it is added to it, so each city and
+    action is handled at most once and the search takes time linear in the size of the map. The target
+    is checked for when a city is added to the frontier rather than when it is expanded, which finds
+    the same path without expanding the rest of the layer before it.
     """
 
     name = "bfs"
-    
+
     def perform(self, start : str, target : str) -> SearchResult:
         """
         Performs a breadth-first search from the given start city until the given target city is found.
@@ -20,38 +25,91 @@ class BreadthFirstSearch(Search):
             SearchResult: The result of the BFS search.
         """
 
-        start_city = self.map.get_city(start)
-        
-        visited = []
-        frontier = [ start_city ]
-        parents = { start_city: None }
-        costs = { start_city: 0 }
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(BreadthFirstSearch.name, start, target)
+        found = self.__search__(start_id, target_id, result)
+
+        if found is not None:
+            path, result.cost = found
+            result.success = True
+            result.set_path_ids(self.map, path)
+
+        return result
+
+    def perform_ids(self, start_id : int, target_id : int) -> tuple[list[int], int]:
+        """
+        Performs a breadth-first search between two cities given by ID, without looking up names,
+        creating city objects, or counting, for hop count queries on large maps.
+
+        Args:
+            start_id (int): The ID of the city to start at.
+            target_id (int): The ID of the target city to be found.
+
+        Returns:
+            tuple[list[int], int]: The IDs of the cities on the path with the fewest actions and the cost
+            of the path, or None if the target can't be reached.
+        """
+
+        return self.__search__(start_id, target_id)
 
-        # explored=1 because the start_city starts in the frontier.
-        result = SearchResult(BreadthFirstSearch.name, start, target, explored=1)
+    def __search__(self, start_id : int, target_id : int, result : SearchResult = None) -> tuple[list[int], int]:
+        """
+        Performs a breadth-first search over city IDs.
+
+        Args:
+            start_id (int): The ID of the city to start at.
+            target_id (int): The ID of the target city to be found.
+            result (SearchResult): The result to store the explored, expanded, and maintained counts in, if any.
+
+        Returns:
+            tuple[list[int], int]: The IDs of the cities on the path and the cost of the path, or None if the target can't be reached.
+        """
+
+        frontier = self.queue_type([ start_id ])
+        # Every city that has been added to the frontier, along with its parent and path cost.
+        parents = { start_id: None }
+        costs = { start_id: 0 }
 
-        while frontier:
-            current = frontier.pop(0)
-            result.expanded += 1
+        # explored=1 because the start city starts in the frontier.
+        explored = 1
+        expanded = 0
+        found = start_id == target_id
 
-            if current.name == target:
-                result.success = True
-                result.path = self.__build_path__(current, parents)
-                result.cost = costs[current]
-                result.maintained = len(frontier)
+        if found:
+            # Finding the start counts as expanding it, like the other searches.
+            expanded = 1
+            frontier.clear()
 
-                break
-            
-            for action in current.actions:
-                neighbor = self.map.get_city(action.destination)
+        while frontier and not found:
+            current = frontier.popleft()
+            expanded += 1
 
-                if neighbor not in frontier and neighbor not in visited:
+            for neighbor, action_cost in self.map.get_neighbors(current):
+                if neighbor not in parents:
                     parents[neighbor] = current
-                    costs[neighbor] = costs[current] + action.cost
+                    costs[neighbor] = costs[current] + action_cost
+                    explored += 1
+
+                    if neighbor == target_id:
+                        found = True
+
+                        break
 
                     frontier.append(neighbor)
-                    result.explored += 1
-            
-            visited.append(current)
-        
-        return result
+
+        if result is not None:
+            result.explored = explored
+            result.expanded = expanded
+            result.maintained = len(frontier) if found else 0
+
+        if not found:
+            return None
+
+        path = [ target_id ]
+        while (parent := parents[path[-1]]) is not None:
+            path.append(parent)
+        path.reverse()
+
+        return (path, costs[target_id])
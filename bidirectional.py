@@ -0,0 +1,255 @@
+import math
+from astar import AstarSearch
+from haversine_table import HaversineTable
+from map import Map
+from search import Search
+from search_result import SearchResult
+
+class BidirectionalSearch(Search):
+    """
+    Represents a search that runs forward from the start city and backward from the target city at the
+    same time, until the two searches meet. The backward search follows actions in reverse, using the
+    reverse actions the map builds on demand, since actions aren't guaranteed to go both ways.
+
+    Explored counts the cities added to either frontier, including the start and target, expanded counts
+    the cities popped from either frontier, and maintained is the size of both frontiers when the search ends.
+    """
+
+    def __build_bidirectional_path__(self, meeting : int, forward_parents : dict[int, int], backward_parents : dict[int, int]) -> list:
+        """
+        Joins the forward path from the start to the meeting city with the backward path from the meeting city to the target.
+
+        Args:
+            meeting (int): The ID of the city where both searches met.
+            forward_parents (dict[int, int]): The parent of every city reached by the forward search.
+            backward_parents (dict[int, int]): The next city towards the target for every city reached by the backward search.
+
+        Returns:
+            list: The list of cities in the path from the start to the target.
+        """
+
+        path = self.__build_path__(meeting, forward_parents)
+
+        current = meeting
+        while (current := backward_parents[current]) is not None:
+            path.append(self.map.get_city_by_id(current))
+
+        return path
+
+class BidirectionalBreadthFirstSearch(BidirectionalSearch):
+    """
+    Represents a bidirectional breadth-first search. Each step expands a whole layer of whichever
+    side has the smaller frontier, and the search stops after the layer in which the two sides first
+    meet, so the path found has the fewest actions possible.
+    """
+
+    name = "bibfs"
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs a bidirectional breadth-first search between the given start and target cities.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(BidirectionalBreadthFirstSearch.name, start, target, explored=1)
+
+        if start_id == target_id:
+            result.success = True
+            result.path = [ self.map.get_city_by_id(start_id) ]
+            result.expanded = 1
+
+            return result
+
+        result.explored += 1
+
+        # Each side keeps the parent, number of actions, and cost of every city it has reached.
+        forward = ({ start_id: None }, { start_id: 0 }, { start_id: 0 }, [ start_id ], self.map.get_neighbors)
+        backward = ({ target_id: None }, { target_id: 0 }, { target_id: 0 }, [ target_id ], self.map.get_reverse_neighbors)
+
+        while forward[3] and backward[3]:
+            side, other = (forward, backward) if len(forward[3]) <= len(backward[3]) else (backward, forward)
+            parents, depths, costs, frontier, get_neighbors = side
+            other_depths = other[1]
+
+            meeting = None
+            next_layer = self.list_type()
+
+            for current in frontier:
+                result.expanded += 1
+
+                for neighbor, action_cost in get_neighbors(current):
+                    if neighbor in parents:
+                        continue
+
+                    parents[neighbor] = current
+                    depths[neighbor] = depths[current] + 1
+                    costs[neighbor] = costs[current] + action_cost
+                    next_layer.append(neighbor)
+                    result.explored += 1
+
+                    # Keep the meeting point with the fewest actions left to the other side.
+                    if neighbor in other_depths and (meeting is None or other_depths[neighbor] < other_depths[meeting]):
+                        meeting = neighbor
+
+            frontier[:] = next_layer
+
+            if meeting is not None:
+                result.success = True
+                result.path = self.__build_bidirectional_path__(meeting, forward[0], backward[0])
+                result.cost = forward[2][meeting] + backward[2][meeting]
+                result.maintained = len(forward[3]) + len(backward[3])
+
+                break
+
+        return result
+
+class BidirectionalUniformCostSearch(BidirectionalSearch):
+    """
+    Represents a bidirectional uniform-cost search (bidirectional Dijkstra). The side with the lower
+    priority at the top of its frontier is expanded next. Every time one side reaches a city the other
+    side has reached, the joined path is considered, and the search stops once the top priorities of
+    both frontiers add up to at least the cost of the best joined path.
+    """
+
+    name = "biucs"
+
+    def __potential__(self, city_id : int, start_id : int, target_id : int) -> float:
+        """
+        Gets the amount added to the forward priority of a city, and subtracted from its backward priority.
+
+        Args:
+            city_id (int): The ID of the city.
+            start_id (int): The ID of the start city.
+            target_id (int): The ID of the target city.
+
+        Returns:
+            float: The potential of the city, always 0 for uniform-cost search.
+        """
+
+        return 0
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs a bidirectional search between the given start and target cities.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(self.name, start, target, explored=1)
+
+        if start_id == target_id:
+            result.success = True
+            result.path = [ self.map.get_city_by_id(start_id) ]
+            result.expanded = 1
+
+            return result
+
+        result.explored += 1
+
+        potentials = {}
+        def potential(city_id : int) -> float:
+            if city_id not in potentials:
+                potentials[city_id] = self.__potential__(city_id, start_id, target_id)
+
+            return potentials[city_id]
+
+        # Each side keeps its frontier, parents, path costs, how to follow actions, and the sign of the potential.
+        forward = (self.frontier_type(), { start_id: None }, { start_id: 0 }, self.map.get_neighbors, 1)
+        backward = (self.frontier_type(), { target_id: None }, { target_id: 0 }, self.map.get_reverse_neighbors, -1)
+
+        forward[0].push(start_id, potential(start_id))
+        backward[0].push(target_id, -potential(target_id))
+
+        best_cost = math.inf
+        meeting = None
+
+        while forward[0] and backward[0]:
+            _, forward_top = forward[0].peek()
+            _, backward_top = backward[0].peek()
+
+            # No path through a city that hasn't been expanded yet can beat the best joined path.
+            if forward_top + backward_top >= best_cost:
+                break
+
+            side, other = (forward, backward) if forward_top <= backward_top else (backward, forward)
+            frontier, parents, costs, get_neighbors, sign = side
+            other_costs = other[2]
+
+            current = frontier.pop()
+            result.expanded += 1
+
+            for neighbor, action_cost in get_neighbors(current):
+                cost = costs[current] + action_cost
+
+                if cost < costs.get(neighbor, math.inf):
+                    parents[neighbor] = current
+                    costs[neighbor] = cost
+
+                    if neighbor not in frontier:
+                        result.explored += 1
+
+                    frontier.push(neighbor, cost + sign * potential(neighbor))
+
+                    if neighbor in other_costs and cost + other_costs[neighbor] < best_cost:
+                        best_cost = cost + other_costs[neighbor]
+                        meeting = neighbor
+
+        if meeting is not None:
+            result.success = True
+            result.path = self.__build_bidirectional_path__(meeting, forward[1], backward[1])
+            result.cost = best_cost
+            result.maintained = len(forward[0]) + len(backward[0])
+
+        return result
+
+class BidirectionalAstarSearch(BidirectionalUniformCostSearch):
+    """
+    Represents a bidirectional A* search. Both sides use the average of the haversine distance to the
+    target and from the start as a potential, so the forward and backward searches agree on the reduced
+    cost of every action and the bidirectional stopping rule still holds. Like A*, it is only guaranteed
+    to find the lowest cost path when the haversine distance never overestimates the cost of an action.
+    """
+
+    name = "biastar"
+
+    def __init__(self, map : Map) -> None:
+        super().__init__(map)
+        # Reuse the haversine distance of the unidirectional A* search, or the distances of every city to the
+        # start and target calculated at once if NumPy is installed.
+        self.astar = AstarSearch(map)
+        self.haversine_table = HaversineTable.for_map(map)
+
+    def __potential__(self, city_id : int, start_id : int, target_id : int) -> float:
+        """
+        Gets the average potential of a city, half of its distance to the target minus its distance to the start.
+
+        Args:
+            city_id (int): The ID of the city.
+            start_id (int): The ID of the start city.
+            target_id (int): The ID of the target city.
+
+        Returns:
+            float: The potential of the city.
+        """
+
+        if self.haversine_table is not None:
+            return (self.haversine_table.get(target_id)[city_id] - self.haversine_table.get(start_id)[city_id]) / 2
+
+        return (self.astar.__calculate_distance__(city_id, target_id) - self.astar.__calculate_distance__(city_id, start_id)) / 2
@@ -1,16 +1,26 @@
+import math
 from action import Action
 from coordinate import Coordinate
 
 class City:
     """
     Represents a city with a name, latitude and longitude, and actions that can be taken to move to other cities.
+
+    The latitude and longitude are stored as plain floats in degrees, along with their values in radians so
+    distance calculations don't have to convert them every time.
     """
 
-    def __init__(self, name : str, latitude : Coordinate, longitude : Coordinate) -> None:
+    __slots__ = ("name", "latitude", "longitude", "latitude_radians", "longitude_radians", "actions", "id")
+
+    def __init__(self, name : str, latitude : float | Coordinate, longitude : float | Coordinate) -> None:
         self.name = name
-        self.latitude = latitude
-        self.longitude = longitude
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.latitude_radians = math.radians(self.latitude)
+        self.longitude_radians = math.radians(self.longitude)
         self.actions = []
+        # Dense integer ID assigned by the map the city belongs to.
+        self.id = None
 
     def add_action(self, action : Action):
         """
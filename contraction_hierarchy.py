@@ -0,0 +1,419 @@
+import math
+from array import array
+from csr_graph import CsrGraph
+from distance_table import map_fingerprint
+from map import Map
+from map_cache import MapCache
+from pathlib import Path
+from priority_queue import PriorityQueue
+from search import Search
+from search_result import SearchResult
+from snapshot import FileFormat
+from typing import Self
+
+# City count, edge count, and fingerprint of the map the hierarchy was built for.
+FORMAT = FileFormat(b"CONTRHY\0", 1, "qqI", "contraction hierarchy")
+
+# The middle city stored for edges that are actions of the map rather than shortcuts.
+NO_MIDDLE = -1
+
+# The number of cities a witness search may settle before giving up, see ContractionHierarchy.build.
+DEFAULT_WITNESS_LIMIT = 500
+
+# The hierarchies of every map they have been built or loaded for, see ContractionHierarchy.for_map.
+registered = MapCache()
+
+class ContractionHierarchy:
+    """
+    Represents a contraction hierarchy of a map. Every city is given a rank, and cities are contracted
+    (removed) from the map from the lowest rank up. Whenever removing a city would make the lowest
+    path cost between two of its remaining neighbors go up, a shortcut action with the cost of the
+    path through it is added between them.
+
+    Any lowest cost path of the map then has a counterpart in the hierarchy that only goes up in rank
+    and then only down, so a query only has to search upwards from the start and upwards against the
+    direction of actions from the target, which touches a tiny part of the map.
+    """
+
+    def __init__(self, map : Map | CsrGraph, ranks : array, edges : dict[tuple[int, int], tuple[int, int]]) -> None:
+        self.map = map
+        self.ranks = ranks
+        # The cost of every action and shortcut, keyed by its source and destination, along with the
+        # city a shortcut goes past, or NO_MIDDLE for actions.
+        self.edges = edges
+
+        # The actions and shortcuts leading up in rank from every city, and leading down in rank to every city.
+        self.upward = [ [] for _ in range(len(ranks)) ]
+        self.downward = [ [] for _ in range(len(ranks)) ]
+
+        for (source, destination), (cost, _) in edges.items():
+            if ranks[destination] > ranks[source]:
+                self.upward[source].append((destination, cost))
+            else:
+                self.downward[destination].append((source, cost))
+
+    @classmethod
+    def build(cls, map : Map | CsrGraph, witness_limit : int = DEFAULT_WITNESS_LIMIT) -> Self:
+        """
+        Builds the hierarchy for the given map.
+
+        Cities are contracted in order of their edge difference, the number of shortcuts contracting
+        them adds minus the number of actions it removes, plus the number of their neighbors already
+        contracted so contraction spreads evenly across the map. Priorities go stale as neighbors are
+        contracted, so they are recomputed when a city reaches the top of the queue, and it is put back
+        if it no longer has the lowest priority.
+
+        Args:
+            map (Map | CsrGraph): The map to build the hierarchy for.
+            witness_limit (int): The number of cities a witness search may settle while looking for a path
+                that makes a shortcut unnecessary. Lower limits build faster but add more shortcuts.
+
+        Returns:
+            ContractionHierarchy: The hierarchy of the map.
+        """
+
+        count = len(map)
+
+        # The actions and shortcuts between the cities that haven't been contracted yet, both ways.
+        outgoing = [ {} for _ in range(count) ]
+        incoming = [ {} for _ in range(count) ]
+        edges = {}
+
+        for source in range(count):
+            for destination, cost in map.get_neighbors(source):
+                # Only the cheapest of several actions between the same cities can be on a lowest cost path.
+                if destination != source and cost < outgoing[source].get(destination, math.inf):
+                    outgoing[source][destination] = cost
+                    incoming[destination][source] = cost
+                    edges[(source, destination)] = (cost, NO_MIDDLE)
+
+        def find_shortcuts(city_id : int) -> list[tuple[int, int, int]]:
+            shortcuts = []
+
+            for source, in_cost in incoming[city_id].items():
+                candidates = { destination: in_cost + out_cost for destination, out_cost in outgoing[city_id].items() if destination != source }
+
+                if not candidates:
+                    continue
+
+                witness_costs = cls.__witness_search__(outgoing, source, city_id, max(candidates.values()), witness_limit)
+
+                for destination, cost in candidates.items():
+                    if witness_costs.get(destination, math.inf) > cost:
+                        shortcuts.append((source, destination, cost))
+
+            return shortcuts
+
+        contracted_neighbors = [ 0 ] * count
+
+        def priority(city_id : int) -> tuple[int, list[tuple[int, int, int]]]:
+            shortcuts = find_shortcuts(city_id)
+            edge_difference = len(shortcuts) - len(incoming[city_id]) - len(outgoing[city_id])
+
+            return (edge_difference + contracted_neighbors[city_id], shortcuts)
+
+        queue = PriorityQueue()
+        for city_id in range(count):
+            queue.push(city_id, priority(city_id)[0])
+
+        ranks = array("i", [ 0 ]) * count
+        rank = 0
+
+        while queue:
+            city_id = queue.pop()
+            city_priority, shortcuts = priority(city_id)
+
+            if queue and city_priority > queue.peek()[1]:
+                queue.push(city_id, city_priority)
+                continue
+
+            for source, destination, cost in shortcuts:
+                if cost < outgoing[source].get(destination, math.inf):
+                    outgoing[source][destination] = cost
+                    incoming[destination][source] = cost
+                    edges[(source, destination)] = (cost, city_id)
+
+            for source in incoming[city_id]:
+                del outgoing[source][city_id]
+                contracted_neighbors[source] += 1
+
+            for destination in outgoing[city_id]:
+                del incoming[destination][city_id]
+                contracted_neighbors[destination] += 1
+
+            incoming[city_id] = {}
+            outgoing[city_id] = {}
+
+            ranks[city_id] = rank
+            rank += 1
+
+        return cls(map, ranks, edges)
+
+    @staticmethod
+    def __witness_search__(outgoing : list[dict[int, int]], source : int, excluded : int, max_cost : int, witness_limit : int) -> dict[int, int]:
+        """
+        Performs a uniform-cost search from a city that avoids the city being contracted, to find paths
+        at least as cheap as the ones through it. Stops once the path costs go over the highest cost of
+        a path through the contracted city, or too many cities have been settled.
+
+        Args:
+            outgoing (list[dict[int, int]]): The actions and shortcuts between the cities that haven't been contracted yet.
+            source (int): The ID of the city to search from.
+            excluded (int): The ID of the city being contracted.
+            max_cost (int): The highest cost of a path through the contracted city.
+            witness_limit (int): The number of cities the search may settle.
+
+        Returns:
+            dict[int, int]: The cost of a path to every city reached. Costs of cities that weren't settled may be too high,
+            but they are still the costs of real paths, so they are safe to use as witnesses.
+        """
+
+        frontier = PriorityQueue()
+        costs = { source: 0 }
+        frontier.push(source, 0)
+        settled = 0
+
+        while frontier and settled < witness_limit:
+            current, current_cost = frontier.peek()
+
+            if current_cost > max_cost:
+                break
+
+            frontier.pop()
+            settled += 1
+
+            for neighbor, action_cost in outgoing[current].items():
+                cost = current_cost + action_cost
+
+                if neighbor != excluded and cost < costs.get(neighbor, math.inf):
+                    costs[neighbor] = cost
+                    frontier.push(neighbor, cost)
+
+        return costs
+
+    @classmethod
+    def load(cls, file_name : str, map : Map | CsrGraph) -> Self:
+        """
+        Loads a hierarchy saved with save for the given map.
+
+        Args:
+            file_name (str): The name of the file to load the hierarchy from.
+            map (Map | CsrGraph): The map the hierarchy was built for.
+
+        Returns:
+            ContractionHierarchy: The loaded hierarchy.
+
+        Raises:
+            FileNotFoundError: If the hierarchy file does not exist.
+            ValueError: If the file is not a hierarchy, or was built for a different map.
+        """
+
+        hierarchy_path = Path(file_name)
+        if not hierarchy_path.is_file():
+            raise FileNotFoundError(f"Error: The contraction hierarchy file '{file_name}' does not exist.")
+
+        count = len(map)
+
+        with open(hierarchy_path, "rb") as file:
+            city_count, edge_count, fingerprint = FORMAT.read_header(file, file_name)
+            if city_count != count or fingerprint != map_fingerprint(map):
+                raise ValueError(f"Error: The contraction hierarchy '{file_name}' was built for a different map.")
+
+            ranks = array("i")
+            ranks.fromfile(file, count)
+
+            sections = [ array("i"), array("i"), array("q"), array("i") ]
+            for section in sections:
+                section.fromfile(file, edge_count)
+
+        sources, destinations, costs, middles = sections
+        edges = { (source, destination): (cost, middle) for source, destination, cost, middle in zip(sources, destinations, costs, middles) }
+
+        return cls(map, ranks, edges)
+
+    def save(self, file_name : str) -> None:
+        """
+        Saves the hierarchy to the given file so it can be loaded again with load.
+
+        Args:
+            file_name (str): The name of the file to save the hierarchy to.
+        """
+
+        sources = array("i", (source for source, _ in self.edges))
+        destinations = array("i", (destination for _, destination in self.edges))
+        costs = array("q", (cost for cost, _ in self.edges.values()))
+        middles = array("i", (middle for _, middle in self.edges.values()))
+
+        with open(file_name, "wb") as file:
+            file.write(FORMAT.pack_header(len(self.map), len(self.edges), map_fingerprint(self.map)))
+            self.ranks.tofile(file)
+
+            for section in (sources, destinations, costs, middles):
+                section.tofile(file)
+
+    @classmethod
+    def for_map(cls, map : Map | CsrGraph) -> Self:
+        """
+        Gets the hierarchy registered for the given map, building and registering it first if the map
+        has none yet or has changed since it was built.
+
+        Args:
+            map (Map | CsrGraph): The map to get the hierarchy of.
+
+        Returns:
+            ContractionHierarchy: The hierarchy of the map.
+        """
+
+        return registered.get_or_build(map, cls.build)
+
+    def register(self) -> None:
+        """
+        Registers the hierarchy as the one to use for its map, see for_map.
+        """
+
+        registered.put(self.map, self)
+
+    def shortcut_count(self) -> int:
+        """
+        Counts the shortcuts added while building the hierarchy.
+
+        Returns:
+            int: The number of shortcuts.
+        """
+
+        return sum(1 for _, middle in self.edges.values() if middle != NO_MIDDLE)
+
+    def unpack(self, path : list[int]) -> list[int]:
+        """
+        Replaces every shortcut on a path through the hierarchy with the actions it stands for.
+
+        Args:
+            path (list[int]): The IDs of the cities on a path of actions and shortcuts.
+
+        Returns:
+            list[int]: The IDs of the cities on the same path using only actions of the map.
+        """
+
+        unpacked = [ path[0] ]
+
+        for source, destination in zip(path, path[1:]):
+            # Shortcuts can go past other shortcuts, so unpack with a stack instead of recursion.
+            stack = [ (source, destination) ]
+
+            while stack:
+                source, destination = stack.pop()
+                middle = self.edges[(source, destination)][1]
+
+                if middle == NO_MIDDLE:
+                    unpacked.append(destination)
+                else:
+                    # The first half is pushed last so it is unpacked first.
+                    stack.append((middle, destination))
+                    stack.append((source, middle))
+
+        return unpacked
+
+class ContractionHierarchySearch(Search):
+    """
+    Represents a query on the contraction hierarchy of the map. A uniform-cost search runs upward from
+    the start and another runs upward against the direction of actions from the target, and the lowest
+    combined cost of a city reached by both is the lowest path cost. The hierarchy is built the first
+    time the map is searched, see ContractionHierarchy.for_map.
+
+    Explored counts the cities added to either frontier, including the start and target, expanded counts
+    the cities popped from either frontier, and maintained is the size of both frontiers when the search ends.
+    """
+
+    name = "ch"
+
+    def __init__(self, map : Map, hierarchy : ContractionHierarchy = None) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            hierarchy (ContractionHierarchy): The hierarchy to query. Defaults to the hierarchy registered for the map.
+        """
+
+        super().__init__(map)
+        self.hierarchy = hierarchy or ContractionHierarchy.for_map(map)
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs a query between the given start and target cities.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the query, with every shortcut on the path unpacked.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(self.name, start, target, explored=1)
+
+        if start_id == target_id:
+            result.success = True
+            result.path = [ self.map.get_city_by_id(start_id) ]
+            result.expanded = 1
+
+            return result
+
+        result.explored += 1
+
+        # Each side keeps its frontier, parents, path costs, and the edges it follows.
+        forward = (self.frontier_type(), { start_id: None }, { start_id: 0 }, self.hierarchy.upward)
+        backward = (self.frontier_type(), { target_id: None }, { target_id: 0 }, self.hierarchy.downward)
+
+        forward[0].push(start_id, 0)
+        backward[0].push(target_id, 0)
+
+        best_cost = math.inf
+        meeting = None
+
+        while True:
+            # A side is done once nothing left in its frontier can lead to a cheaper path.
+            sides = [ side for side in (forward, backward) if side[0] and side[0].peek()[1] < best_cost ]
+
+            if not sides:
+                break
+
+            side = min(sides, key=lambda side: side[0].peek()[1])
+            frontier, parents, costs, edges = side
+            other_costs = (backward if side is forward else forward)[2]
+
+            current = frontier.pop()
+            result.expanded += 1
+
+            for neighbor, edge_cost in edges[current]:
+                cost = costs[current] + edge_cost
+
+                if cost < costs.get(neighbor, math.inf):
+                    parents[neighbor] = current
+                    costs[neighbor] = cost
+
+                    if neighbor not in frontier:
+                        result.explored += 1
+
+                    frontier.push(neighbor, cost)
+
+                    if neighbor in other_costs and cost + other_costs[neighbor] < best_cost:
+                        best_cost = cost + other_costs[neighbor]
+                        meeting = neighbor
+
+        if meeting is not None:
+            path = [ meeting ]
+            while (current := forward[1][path[-1]]) is not None:
+                path.append(current)
+            path.reverse()
+
+            while (current := backward[1][path[-1]]) is not None:
+                path.append(current)
+
+            result.success = True
+            result.set_path_ids(self.map, self.hierarchy.unpack(path))
+            result.cost = best_cost
+            result.maintained = len(forward[0]) + len(backward[0])
+
+        return result
@@ -5,6 +5,8 @@ class Coordinate:
     Represents either a latitude or longitude coordinate.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value : float) -> None:
         self.value = value
         
@@ -23,17 +25,37 @@ class Coordinate:
             Coordinate: An initialized instance of Coordinate.
         """
 
+        return cls(Coordinate.dms_to_decimal(degrees, minutes, seconds, hemisphere))
+
+    @staticmethod
+    def dms_to_decimal(degrees : int, minutes : int, seconds : int, hemisphere : str) -> float:
+        """
+        Converts the provided degrees, minutes, seconds, and heading into decimal degrees.
+
+        Args:
+            degrees (int): The degrees.
+            minutes (int): The minutes.
+            seconds (int): The seconds.
+            hemisphere (str): The hemisphere.
+
+        Returns:
+            float: The coordinate in decimal degrees, negative in the western and southern hemispheres.
+        """
+
         value = int(degrees)
         value += int(minutes) / 60
         value += int(seconds) / 3600
 
         if hemisphere.lower() == "w" or hemisphere.lower() == "s":
             value *= -1
-            
-        return cls(value)
+
+        return value
     
     def __repr__(self) -> str:
         return f"Coordinate(value={self.value})"
     
     def __str__(self) -> str:
         return self.value.__str__()
+
+    def __float__(self) -> float:
+        return float(self.value)
@@ -0,0 +1,273 @@
+import math
+from array import array
+from city import City
+from map import Map, versions
+from typing import Self
+
+class CsrGraph:
+    """
+    Represents a map of cities stored as a compressed sparse row (CSR) graph.
+
+    The actions of every city are packed into flat typed arrays instead of lists of Action objects.
+    The neighbors of the city with ID i are stored in targets[offsets[i]:offsets[i + 1]], and the
+    cost of moving to each of them in the same slice of costs. The graph offers the same lookup
+    methods as Map so the searches can run on either. The arrays can be array.array objects or
+    memoryviews over a memory-mapped snapshot (see snapshot.py).
+    """
+
+    def __init__(self, names : list[str], latitudes : array, longitudes : array, offsets : array, targets : array, costs : array, city_ids : dict[str, int] = None) -> None:
+        self.names = names
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        # Built the first time a search follows actions backwards, see get_reverse_neighbors.
+        self.reverse_offsets = None
+        self.reverse_targets = None
+        self.reverse_costs = None
+        # The graph can't be changed, so it keeps the version it was created with and never has edge changes.
+        self.version = next(versions)
+        self.edge_changes = ()
+        # Anything with a dictionary-like get method can be used to look up city IDs by name.
+        self.city_ids = city_ids
+
+        if city_ids is None:
+            self.city_ids = {}
+
+            for city_id, name in enumerate(names):
+                self.city_ids.setdefault(name, city_id)
+
+    @classmethod
+    def from_map(cls, map : Map) -> Self:
+        """
+        Packs the cities and actions of the given map into a CSR graph. City IDs are the same as in the map.
+
+        Args:
+            map (Map): The map to convert.
+
+        Returns:
+            CsrGraph: The packed graph.
+        """
+
+        names = [ city.name for city in map.cities ]
+        latitudes = array("d", (city.latitude for city in map.cities))
+        longitudes = array("d", (city.longitude for city in map.cities))
+
+        offsets = array("q", [ 0 ])
+        targets = array("i")
+        costs = array("i")
+
+        for city_id in range(len(map.cities)):
+            for neighbor, cost in map.get_neighbors(city_id):
+                targets.append(neighbor)
+                costs.append(cost)
+
+            offsets.append(len(targets))
+
+        return cls(names, latitudes, longitudes, offsets, targets, costs)
+
+    @classmethod
+    def from_file(cls, file_name : str) -> Self:
+        """
+        Streams the given map file straight into a CSR graph without creating City or Action objects,
+        so maps far larger than a Map could hold in memory can be loaded. City IDs follow the order the
+        cities are defined in the file, the same as Map.from_file.
+
+        Args:
+            file_name (str): The name of the file to load the map from.
+
+        Returns:
+            CsrGraph: The packed graph.
+
+        Raises:
+            FileNotFoundError: If the map file does not exist.
+            MapFormatError: If the map file is malformed or defines a city more than once.
+        """
+
+        names = []
+        latitudes = array("d")
+        longitudes = array("d")
+        offsets = array("q", [ 0 ])
+        targets = array("i")
+        costs = array("i")
+
+        # Destinations can be referenced before they are defined, so every name gets a provisional
+        # ID when it is first seen and the targets are renumbered once the whole file has been read.
+        provisional_ids = {}
+        definition_order = array("i")
+
+        for _, name, latitude, longitude, actions in Map.read_records(file_name):
+            provisional_id = provisional_ids.setdefault(name, len(provisional_ids))
+
+            names.append(name)
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            definition_order.append(provisional_id)
+
+            for destination, cost in actions:
+                targets.append(provisional_ids.setdefault(destination, len(provisional_ids)))
+                costs.append(cost)
+
+            offsets.append(len(targets))
+
+        city_ids = array("i", [ 0 ]) * len(provisional_ids)
+        for city_id, provisional_id in enumerate(definition_order):
+            city_ids[provisional_id] = city_id
+
+        for i, provisional_id in enumerate(targets):
+            targets[i] = city_ids[provisional_id]
+
+        return cls(names, latitudes, longitudes, offsets, targets, costs)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get_city(self, name : str) -> City:
+        """
+        Finds the given city in the graph.
+
+        Args:
+            name (str): The name of the city to search for.
+
+        Returns:
+            City: The city if it is found, otherwise None.
+        """
+
+        city_id = self.city_ids.get(name)
+
+        return None if city_id is None else self.get_city_by_id(city_id)
+
+    def get_city_id(self, name : str) -> int:
+        """
+        Finds the ID of the given city in the graph.
+
+        Args:
+            name (str): The name of the city to search for.
+
+        Returns:
+            int: The ID of the city if it is found, otherwise None.
+        """
+
+        return self.city_ids.get(name)
+
+    def get_city_by_id(self, city_id : int) -> City:
+        """
+        Creates a city object for the given ID. The city does not carry any actions, use get_neighbors instead.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            City: The city with the given ID.
+        """
+
+        city = City(self.names[city_id], self.latitudes[city_id], self.longitudes[city_id])
+        city.id = city_id
+
+        return city
+
+    def get_coordinates(self, city_id : int) -> tuple[float, float]:
+        """
+        Gets the latitude and longitude of the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            tuple[float, float]: The latitude and longitude of the city in degrees.
+        """
+
+        return (self.latitudes[city_id], self.longitudes[city_id])
+
+    def get_radians(self, city_id : int) -> tuple[float, float]:
+        """
+        Gets the latitude and longitude of the city with the given ID in radians. Radians are
+        converted on demand rather than stored to keep the graph compact.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            tuple[float, float]: The latitude and longitude of the city in radians.
+        """
+
+        return (math.radians(self.latitudes[city_id]), math.radians(self.longitudes[city_id]))
+
+    def get_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        """
+        Gets the cities that can be reached from the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city to get the neighbors of.
+
+        Returns:
+            list[tuple[int, int]]: The ID of every neighboring city paired with the cost of moving to it.
+        """
+
+        start = self.offsets[city_id]
+        end = self.offsets[city_id + 1]
+
+        return list(zip(self.targets[start:end], self.costs[start:end]))
+
+    def get_reverse_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        """
+        Gets the cities that have an action leading to the city with the given ID. Actions aren't
+        guaranteed to go both ways, so the reverse CSR arrays are built the first time they are needed.
+
+        Args:
+            city_id (int): The ID of the city to get the reverse neighbors of.
+
+        Returns:
+            list[tuple[int, int]]: The ID of every city with an action to the given city paired with the cost of that action.
+        """
+
+        if self.reverse_offsets is None:
+            self.__build_reverse__()
+
+        start = self.reverse_offsets[city_id]
+        end = self.reverse_offsets[city_id + 1]
+
+        return list(zip(self.reverse_targets[start:end], self.reverse_costs[start:end]))
+
+    def __build_reverse__(self) -> None:
+        """
+        Builds the transpose of the graph with a counting sort over the action destinations.
+        """
+
+        count = len(self.names)
+
+        # Count the actions leading to every city, then turn the counts into offsets.
+        reverse_offsets = array("q", [ 0 ]) * (count + 1)
+        for target in self.targets:
+            reverse_offsets[target + 1] += 1
+        for city_id in range(count):
+            reverse_offsets[city_id + 1] += reverse_offsets[city_id]
+
+        reverse_targets = array("i", [ 0 ]) * len(self.targets)
+        reverse_costs = array("i", [ 0 ]) * len(self.targets)
+        positions = array("q", reverse_offsets[:count])
+
+        for source_id in range(count):
+            for i in range(self.offsets[source_id], self.offsets[source_id + 1]):
+                target = self.targets[i]
+
+                reverse_targets[positions[target]] = source_id
+                reverse_costs[positions[target]] = self.costs[i]
+                positions[target] += 1
+
+        self.reverse_offsets = reverse_offsets
+        self.reverse_targets = reverse_targets
+        self.reverse_costs = reverse_costs
+
+    def memory_usage(self) -> int:
+        """
+        Estimates the number of bytes used by the packed arrays of the graph.
+
+        Returns:
+            int: The combined size of the coordinate, offset, target, and cost arrays in bytes.
+        """
+
+        arrays = (self.latitudes, self.longitudes, self.offsets, self.targets, self.costs)
+
+        return sum(len(a) * a.itemsize for a in arrays)
@@ -0,0 +1,279 @@
+import math
+import struct
+import zlib
+from array import array
+from csr_graph import CsrGraph
+from map import Map
+from pathlib import Path
+from search_result import SearchResult
+from snapshot import FileFormat
+from typing import Self
+from ucs import UniformCostSearch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# City count and fingerprint of the map the table was built for.
+FORMAT = FileFormat(b"DISTTAB\0", 1, "qI", "distance table")
+
+# The cost stored for cities that can't be reached.
+UNREACHABLE = -1
+
+def map_fingerprint(map : Map | CsrGraph) -> int:
+    """
+    Computes a checksum over the cities and actions of a map, so a table saved for one map isn't used with another.
+
+    Args:
+        map (Map | CsrGraph): The map to compute the fingerprint of.
+
+    Returns:
+        int: A 32-bit checksum of the city names and every action's destination and cost.
+    """
+
+    fingerprint = 0
+
+    for city_id in range(len(map)):
+        fingerprint = zlib.crc32(map.get_city_by_id(city_id).name.encode("utf-8"), fingerprint)
+
+        for neighbor, cost in map.get_neighbors(city_id):
+            fingerprint = zlib.crc32(struct.pack("=qq", neighbor, cost), fingerprint)
+
+    return fingerprint
+
+class DistanceTable:
+    """
+    Represents the lowest path costs between every pair of cities in a map, along with the next city
+    to move to on each of those paths. Once built, a query is answered by following next hops, which
+    takes time proportional to the length of the path instead of a search.
+
+    The table takes 12 bytes per pair of cities, so it is meant for small and medium sized maps.
+    """
+
+    name = "table"
+
+    def __init__(self, map : Map | CsrGraph, costs : array, next_hops : array) -> None:
+        self.map = map
+        # Both are indexed by start ID * city count + target ID.
+        self.costs = costs
+        self.next_hops = next_hops
+
+    @classmethod
+    def build(cls, map : Map | CsrGraph, algorithm : str = "dijkstra") -> Self:
+        """
+        Precomputes the table for the given map.
+
+        Args:
+            map (Map | CsrGraph): The map to build the table for.
+            algorithm (str): Either "dijkstra" to perform a uniform-cost search from every city, or
+                "floyd-warshall" for the vectorized Floyd-Warshall algorithm, which requires NumPy.
+
+        Returns:
+            DistanceTable: The table for the map.
+        """
+
+        if algorithm == "dijkstra":
+            return cls.__build_dijkstra__(map)
+        elif algorithm == "floyd-warshall":
+            if numpy is None:
+                raise ImportError("Error: The floyd-warshall algorithm requires NumPy to be installed.")
+
+            return cls.__build_floyd_warshall__(map)
+
+        raise ValueError(f"Error: Unknown distance table algorithm '{algorithm}'.")
+
+    @classmethod
+    def __build_dijkstra__(cls, map : Map | CsrGraph) -> Self:
+        """
+        Builds the table by performing a uniform-cost search from every city.
+        """
+
+        count = len(map)
+        search = UniformCostSearch(map)
+
+        costs = array("q")
+        next_hops = array("i")
+
+        for start_id in range(count):
+            search_costs, parents = search.search_tree(start_id)
+
+            # The next hop to a city is the next hop to its parent, unless its parent is the start.
+            row = [ UNREACHABLE ] * count
+            row[start_id] = start_id
+
+            for city_id in range(count):
+                # Walk up the tree until a city with a known next hop is found, then fill in the way back down.
+                chain = []
+                current = city_id
+
+                while row[current] == UNREACHABLE and parents[current] is not None:
+                    chain.append(current)
+                    current = parents[current]
+
+                for link in reversed(chain):
+                    row[link] = link if parents[link] == start_id else row[parents[link]]
+
+            costs.extend(UNREACHABLE if cost == math.inf else cost for cost in search_costs)
+            next_hops.extend(row)
+
+        return cls(map, costs, next_hops)
+
+    @classmethod
+    def __build_floyd_warshall__(cls, map : Map | CsrGraph) -> Self:
+        """
+        Builds the table with the Floyd-Warshall algorithm, relaxing every pair of cities through one
+        intermediate city at a time as a single NumPy operation.
+        """
+
+        count = len(map)
+
+        distances = numpy.full((count, count), numpy.inf)
+        next_hops = numpy.full((count, count), UNREACHABLE, dtype=numpy.int32)
+
+        for city_id in range(count):
+            for neighbor, cost in map.get_neighbors(city_id):
+                if cost < distances[city_id, neighbor]:
+                    distances[city_id, neighbor] = cost
+                    next_hops[city_id, neighbor] = neighbor
+
+        numpy.fill_diagonal(distances, 0)
+        numpy.fill_diagonal(next_hops, numpy.arange(count, dtype=numpy.int32))
+
+        for via in range(count):
+            through = distances[:, via, None] + distances[None, via, :]
+            shorter = through < distances
+
+            distances = numpy.where(shorter, through, distances)
+            next_hops = numpy.where(shorter, next_hops[:, via, None], next_hops)
+
+        costs = numpy.where(numpy.isinf(distances), UNREACHABLE, distances).astype(numpy.int64)
+
+        return cls(map, array("q", costs.tobytes()), array("i", next_hops.tobytes()))
+
+    @classmethod
+    def load(cls, file_name : str, map : Map | CsrGraph) -> Self:
+        """
+        Loads a table saved with save for the given map.
+
+        Args:
+            file_name (str): The name of the file to load the table from.
+            map (Map | CsrGraph): The map the table was built for.
+
+        Returns:
+            DistanceTable: The loaded table.
+
+        Raises:
+            FileNotFoundError: If the table file does not exist.
+            ValueError: If the file is not a table, or was built for a different map.
+        """
+
+        table_path = Path(file_name)
+        if not table_path.is_file():
+            raise FileNotFoundError(f"Error: The distance table file '{file_name}' does not exist.")
+
+        count = len(map)
+
+        with open(table_path, "rb") as file:
+            table_count, fingerprint = FORMAT.read_header(file, file_name)
+            if table_count != count or fingerprint != map_fingerprint(map):
+                raise ValueError(f"Error: The distance table '{file_name}' was built for a different map.")
+
+            costs = array("q")
+            costs.fromfile(file, count * count)
+            next_hops = array("i")
+            next_hops.fromfile(file, count * count)
+
+        return cls(map, costs, next_hops)
+
+    def save(self, file_name : str) -> None:
+        """
+        Saves the table to the given file so it can be loaded again with load.
+
+        Args:
+            file_name (str): The name of the file to save the table to.
+        """
+
+        with open(file_name, "wb") as file:
+            file.write(FORMAT.pack_header(len(self.map), map_fingerprint(self.map)))
+            self.costs.tofile(file)
+            self.next_hops.tofile(file)
+
+    def get_cost(self, start_id : int, target_id : int) -> int:
+        """
+        Looks up the lowest path cost between two cities.
+
+        Args:
+            start_id (int): The ID of the city to start at.
+            target_id (int): The ID of the target city.
+
+        Returns:
+            int: The lowest path cost, or None if the target can't be reached.
+        """
+
+        cost = self.costs[start_id * len(self.map) + target_id]
+
+        return None if cost == UNREACHABLE else cost
+
+    def get_path(self, start_id : int, target_id : int) -> list[int]:
+        """
+        Follows the next hops from one city to another.
+
+        Args:
+            start_id (int): The ID of the city to start at.
+            target_id (int): The ID of the target city.
+
+        Returns:
+            list[int]: The IDs of the cities on the lowest cost path, or None if the target can't be reached.
+        """
+
+        count = len(self.map)
+
+        if self.next_hops[start_id * count + target_id] == UNREACHABLE:
+            return None
+
+        path = [ start_id ]
+        while path[-1] != target_id:
+            path.append(self.next_hops[path[-1] * count + target_id])
+
+        return path
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Answers a query from the table. No cities are explored, every city on the path is counted as expanded.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city.
+
+        Returns:
+            SearchResult: The result of the query.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(DistanceTable.name, start, target)
+
+        if start_id is None or target_id is None:
+            return result
+
+        path = self.get_path(start_id, target_id)
+
+        if path is not None:
+            result.success = True
+            result.set_path_ids(self.map, path)
+            result.cost = self.get_cost(start_id, target_id)
+            result.expanded = len(path)
+
+        return result
+
+    def memory_usage(self) -> int:
+        """
+        Gets the number of bytes used by the cost and next hop arrays of the table.
+
+        Returns:
+            int: The size of the table in bytes.
+        """
+
+        return len(self.costs) * self.costs.itemsize + len(self.next_hops) * self.next_hops.itemsize
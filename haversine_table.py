@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from csr_graph import CsrGraph
+from map import Map
+from map_cache import MapCache
+from typing import Self
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Radius of earth in kilometers, the same as AstarSearch uses.
+EARTH_RADIUS = 6371
+
+# The number of targets whose distances are kept for every map.
+DEFAULT_MAX_TARGETS = 16
+
+# The largest number of distances kept for every map, which keeps fewer targets on large maps.
+DEFAULT_MAX_DISTANCES = 2**22
+
+# The haversine tables of every map they have been created for, see HaversineTable.for_map.
+registered = MapCache(follows_changes=False)
+
+class HaversineTable:
+    """
+    Represents the haversine distances from every city of a map to the targets it was recently
+    searched for. The distances to a target are computed for every city at once with NumPy when a
+    search for it starts, instead of one at a time every time a city is reached, and are kept for
+    repeated searches for the same target with least recently used eviction. Every target takes 8
+    bytes per city, and large maps keep fewer targets so the table never holds more than max_distances
+    distances.
+
+    The vectorized formula is the same as AstarSearch.__calculate_distance__, so the distances match
+    the ones calculated one at a time.
+    """
+
+    def __init__(self, map : Map | CsrGraph, max_targets : int = DEFAULT_MAX_TARGETS, max_distances : int = DEFAULT_MAX_DISTANCES) -> None:
+        """
+        Args:
+            map (Map | CsrGraph): The map to calculate distances on.
+            max_targets (int): The maximum number of targets whose distances are kept.
+            max_distances (int): The maximum number of distances kept over all targets, at least one target is always kept.
+        """
+
+        self.map = map
+        self.max_targets = max(1, min(max_targets, max_distances // max(len(map), 1)))
+
+        radians = numpy.array([ map.get_radians(city_id) for city_id in range(len(map)) ], dtype=numpy.float64).reshape(-1, 2)
+        self.latitudes = radians[:, 0]
+        self.longitudes = radians[:, 1]
+        self.cos_latitudes = numpy.cos(self.latitudes)
+
+        # Maps target IDs to the distance from every city, ordered from least to most recently used.
+        self.distances = OrderedDict()
+
+    @classmethod
+    def for_map(cls, map : Map | CsrGraph) -> Self:
+        """
+        Gets the haversine table of the given map, creating it first if the map has none yet. The
+        coordinates of a map never change, so the table and its distances are kept even when its actions change.
+
+        Args:
+            map (Map | CsrGraph): The map to get the table of.
+
+        Returns:
+            HaversineTable: The table of the map, or None if NumPy is not installed.
+        """
+
+        if numpy is None:
+            return None
+
+        return registered.get_or_build(map, cls)
+
+    def get(self, target_id : int) -> memoryview:
+        """
+        Gets the haversine distance from every city to the given target, calculating them if they aren't kept yet.
+
+        Args:
+            target_id (int): The ID of the target city.
+
+        Returns:
+            memoryview: The distance in kilometers from every city to the target, indexed by city ID. The
+                distances are read-only, and are read as floats.
+        """
+
+        distances = self.distances.get(target_id)
+
+        if distances is not None:
+            self.distances.move_to_end(target_id)
+
+            return distances
+
+        delta_latitudes = self.latitudes - self.latitudes[target_id]
+        delta_longitudes = self.longitudes - self.longitudes[target_id]
+
+        a = numpy.sin(delta_latitudes / 2)**2 + self.cos_latitudes * self.cos_latitudes[target_id] * numpy.sin(delta_longitudes / 2)**2
+        c = 2 * numpy.arcsin(numpy.sqrt(a))
+
+        # Searches look distances up one city at a time, which is faster through a memoryview than on the array
+        # itself, and reads them as floats without copying them into a list of 4 times the size.
+        distances = EARTH_RADIUS * c
+        distances.flags.writeable = False
+        distances = memoryview(distances)
+
+        self.distances[target_id] = distances
+        if len(self.distances) > self.max_targets:
+            self.distances.popitem(last=False)
+
+        return distances
@@ -1,5 +1,8 @@
-from city import City
+import math
+from astar import AstarSearch
 from enum import Enum
+from haversine_table import HaversineTable
+from map import Map
 from search import Search
 from search_result import SearchResult
 
@@ -11,74 +14,160 @@ class DlsResult(Enum):
     FAILURE = 1
     CUTOFF = 2
 
+class DlsFrame:
+    """
+    Represents a city on the explicit stack of a depth-limited search, along with the actions left to take from it.
+    """
+
+    __slots__ = ("city", "depth", "actions", "index", "cutoff_occured", "neighbor_count")
+
+    def __init__(self, city : int, depth : int, actions : list[tuple[int, int]], neighbor_count : int) -> None:
+        self.city = city
+        self.depth = depth
+        self.actions = actions
+        # The index of the next action to take.
+        self.index = 0
+        self.cutoff_occured = False
+        self.neighbor_count = neighbor_count
+
 class IterativeDeepeningSearch(Search):
     """
     Represents an iterative deepening depth-limited search.
+
+    Every depth-limited search is performed with an explicit stack instead of recursion, so deep maps
+    don't run into Python's recursion limit. By default, cities are never reached twice within one
+    depth-limited search, which gives the same explored, expanded, and maintained counts as the
+    original recursive search.
+
+    With transpositions, the depth every city has been reached at is kept instead. Within one depth-
+    limited search a city is only searched again if it is reached at a lower depth, and across
+    iterations a city is never searched from a depth greater than the lowest depth it has been
+    reached at in any earlier iteration. This prunes far more of the repeated work on maps with many
+    ways to reach each city, but changes the counts.
     """
 
     name = "dls"
 
-    def __dls__(self, current : City, target : str, limit : int, visited : list[City], search_result : SearchResult):
+    def __init__(self, map : Map, transpositions : bool = False) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            transpositions (bool): Whether to prune with a transposition table of the depths cities have been reached at.
+        """
+
+        super().__init__(map)
+        self.transpositions = transpositions
+
+    def __dls__(self, start : int, target : int, limit : int, visited : set[int], search_result : SearchResult, lowest_depths : dict[int, int] = None) -> DlsResult:
         """
-        Recursively performs a depth-limited search from the given city for the given target.
+        Performs a depth-limited search from the given city for the given target.
 
         Args:
-            current (City): The current city to perform the search from.
-            target (str): The name of the target city to be found.
-            limit (int): The current depth limit. The method will return if the limit is 0.
-            visited (list[City]): The list of cities visited so far so that cycles can be avoided.
-            search_result (SearchResult): The accumulative results of the search through all recursions.
-        
+            start (int): The ID of the city to perform the search from.
+            target (int): The ID of the target city to be found.
+            limit (int): The depth limit. Cities at the limit are cut off instead of expanded.
+            visited (set[int]): The IDs of the cities visited so far so that cycles can be avoided.
+            search_result (SearchResult): The accumulative results of the search through all iterations.
+            lowest_depths (dict[int, int]): The lowest depth every city has been reached at in earlier iterations,
+                only used with transpositions.
+
         Returns:
             (DlsResult): An enum value indiciating the result of the depth-limited search.
         """
 
-        if limit == 0:
+        # The depth each city was reached at in this iteration, only used with transpositions.
+        depths = { start: 0 }
+
+        stack = self.list_type()
+        result = self.__reach__(start, 0, limit, target, visited, search_result, stack)
+
+        while stack:
+            frame = stack[-1]
+
+            if result == DlsResult.SUCCESS:
+                # If our last action found the target, add the current city to the path as well as the
+                # cost of the last action. Consider all other remaining actions from the current city as
+                # maintained and return.
+                i = frame.index - 1
+                search_result.path.append(self.map.get_city_by_id(frame.city))
+                search_result.cost += frame.actions[i][1]
+                search_result.maintained += frame.neighbor_count - i
+                stack.pop()
+
+                continue
+            elif result == DlsResult.CUTOFF:
+                # A cutoff occured deeper down, so keep track of that.
+                frame.cutoff_occured = True
+
+            if frame.index == len(frame.actions):
+                # If a cutoff occured, indicate so. Otherwise this path and been fully explored without finding the target.
+                result = DlsResult.CUTOFF if frame.cutoff_occured else DlsResult.FAILURE
+                stack.pop()
+
+                continue
+
+            neighbor = frame.actions[frame.index][0]
+            frame.index += 1
+            result = None
+
+            if self.transpositions:
+                depth = frame.depth + 1
+
+                # Skip cities already searched from this depth or lower, or that will be searched from a lower depth.
+                if depths.get(neighbor, math.inf) <= depth or lowest_depths.get(neighbor, math.inf) < depth:
+                    continue
+
+                depths[neighbor] = depth
+                lowest_depths[neighbor] = min(lowest_depths.get(neighbor, math.inf), depth)
+
+            visited.add(neighbor)
+            search_result.explored += 1
+
+            result = self.__reach__(neighbor, frame.depth + 1, limit, target, visited, search_result, stack)
+
+        if result == DlsResult.SUCCESS:
+            # The path was built from the target back to the start.
+            search_result.path.reverse()
+
+        return result
+
+    def __reach__(self, current : int, depth : int, limit : int, target : int, visited : set[int], search_result : SearchResult, stack : list[DlsFrame]) -> DlsResult:
+        """
+        Reaches a city in a depth-limited search. The city is either cut off, found to be the target, or
+        expanded by pushing it onto the stack along with the actions to take from it.
+
+        Returns:
+            (DlsResult): The result for the city, or None if it was pushed onto the stack.
+        """
+
+        if depth == limit:
             # If we hit our limit, consider this action maintained and return.
             search_result.maintained += 1
-            
+
             return DlsResult.CUTOFF
-        
-        # A call into this method is synonymous with a city being popped from a frontier.
+
+        # Reaching a city below the limit is synonymous with a city being popped from a frontier.
         search_result.expanded += 1
 
-        if current.name == target:
+        if current == target:
             # If we found our target, start building the path and return.
             search_result.success = True
-            search_result.path = [ current ]
+            search_result.path = [ self.map.get_city_by_id(current) ]
 
             return DlsResult.SUCCESS
-        
 
+        neighbors = self.map.get_neighbors(current)
+        # Transpositions check the depth of every neighbor as it is reached instead.
+        actions = neighbors if self.transpositions else [ n for n in neighbors if n[0] not in visited ]
 
-        cutoff_occured = False
-        for i, action in enumerate([a for a in current.actions if a.destination not in [v.name for v in visited]]):
-            neighbor = self.map.get_city(action.destination)
+        stack.append(DlsFrame(current, depth, actions, len(neighbors)))
 
-            visited.append(neighbor)
-            search_result.explored += 1
-            
-            result = self.__dls__(neighbor, target, limit - 1, visited, search_result)
-            if result == DlsResult.SUCCESS:
-                # If our last action found the target, add the current city to the beginning
-                # of the path as well as the cost of the last action. Consider all other remaining
-                # actions from the current city as maintained and return.
-                search_result.path.insert(0, current)
-                search_result.cost += action.cost
-                search_result.maintained += len(current.actions) - i
-                
-                return result
-            elif result == DlsResult.CUTOFF:
-                # A cutoff occured deeper down in the recursion, so keep track of that.
-                cutoff_occured = True
-        
-        # If a cutoff occured, indicate so. Otherwise this path and been fully explored without finding the target.
-        return DlsResult.CUTOFF if cutoff_occured else DlsResult.FAILURE
+        return None
 
     def perform(self, start : str, target : str) -> SearchResult:
         """
         Performs an iterative deepening depth-limited search from the given start city until the given target city is found.
-        
+
         Args:
             start (str): The name of the city to start at.
             target (str): The name of the target city to be found.
@@ -86,14 +175,144 @@ class IterativeDeepeningSearch(Search):
         Returns:
             SearchResult: The result of the search.
         """
-        
-        start_city = self.map.get_city(start)
 
-        search_result = SearchResult(IterativeDeepeningSearch.name, start, target)
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        search_result = SearchResult(self.name, start, target)
+        lowest_depths = { start_id: 0 }
 
         max_depth = 0
-        while self.__dls__(start_city, target, max_depth, [], search_result) == DlsResult.CUTOFF:
+        while self.__dls__(start_id, target_id, max_depth, set(), search_result, lowest_depths) == DlsResult.CUTOFF:
             # Increase depth until either a success or failure occurs.
             max_depth += 1
-        
+
+        return search_result
+
+class IdaStarSearch(Search):
+    """
+    Represents an iterative deepening A* search (IDA*). Like iterative deepening, every iteration is a
+    depth-first search with an explicit stack, but the limit is on the path cost plus the haversine
+    distance to the target instead of the depth, starting at the estimate for the start city. Each
+    iteration raises the limit to the lowest estimate that went over it in the last one.
+
+    Within an iteration, a city is only searched again if it is reached with a lower path cost than
+    before, which also avoids cycles. Without this transposition table, the number of paths searched
+    grows exponentially on maps with many ways to reach each city.
+
+    Explored counts the cities reached, expanded counts the cities within the limit, and maintained
+    counts the cities over the limit, plus the actions left untaken along the path when the target is found.
+    """
+
+    name = "idastar"
+
+    def __init__(self, map : Map) -> None:
+        super().__init__(map)
+        # Reuse the haversine distance of the A* search, or the distances of every city to the target
+        # calculated at once if NumPy is installed.
+        self.astar = AstarSearch(map)
+        self.haversine_table = HaversineTable.for_map(map)
+        # The distances of every city to the target of the current search, if NumPy is installed.
+        self.target_distances = None
+
+    def __estimate__(self, current : int, target : int) -> float:
+        """
+        Estimates the cost of the cheapest path between two cities with the haversine distance.
+
+        Args:
+            current (int): The ID of the current city to estimate the cost from.
+            target (int): The ID of the target city to estimate the cost to.
+
+        Returns:
+            float: The estimated cost.
+        """
+
+        if self.target_distances is not None:
+            return self.target_distances[current]
+
+        return self.astar.__calculate_distance__(current, target)
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs an IDA* search from the given start city until the given target city is found.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        if start_id is None or target_id is None:
+            return SearchResult(self.name, start, target)
+
+        self.target_distances = self.haversine_table.get(target_id) if self.haversine_table is not None else None
+
+        search_result = SearchResult(self.name, start, target, explored=1)
+        limit = self.__estimate__(start_id, target_id)
+
+        while limit < math.inf:
+            next_limit = math.inf
+            # The cities on the current path, and the lowest cost every city has been reached with in this iteration.
+            path = [ start_id ]
+            costs = { start_id: 0 }
+            stack = self.list_type([ DlsFrame(start_id, 0, self.map.get_neighbors(start_id), 0) ])
+            search_result.expanded += 1
+
+            if start_id == target_id:
+                search_result.success = True
+                search_result.path = [ self.map.get_city_by_id(start_id) ]
+
+                return search_result
+
+            while stack:
+                frame = stack[-1]
+
+                if frame.index == len(frame.actions):
+                    stack.pop()
+                    path.pop()
+
+                    continue
+
+                neighbor, action_cost = frame.actions[frame.index]
+                frame.index += 1
+
+                cost = frame.depth + action_cost
+
+                if costs.get(neighbor, math.inf) <= cost:
+                    continue
+
+                costs[neighbor] = cost
+                search_result.explored += 1
+                estimated_cost = cost + self.__estimate__(neighbor, target_id)
+
+                if estimated_cost > limit:
+                    # Over the limit, consider this action maintained and remember the lowest limit that would reach it.
+                    search_result.maintained += 1
+                    next_limit = min(next_limit, estimated_cost)
+
+                    continue
+
+                search_result.expanded += 1
+
+                if neighbor == target_id:
+                    path.append(neighbor)
+
+                    search_result.success = True
+                    search_result.set_path_ids(self.map, path)
+                    search_result.cost = cost
+                    search_result.maintained += sum(len(frame.actions) - frame.index for frame in stack)
+
+                    return search_result
+
+                path.append(neighbor)
+                # The depth of an IDA* frame is the path cost to its city.
+                stack.append(DlsFrame(neighbor, cost, self.map.get_neighbors(neighbor), 0))
+
+            limit = next_limit
+
         return search_result
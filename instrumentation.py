@@ -0,0 +1,328 @@
+import time
+from collections import deque
+from map_cache import underlying_map
+from priority_queue import PriorityQueue
+from search import Search
+from search_result import SearchResult
+from typing import Any, Callable, Iterable
+
+# The phases the time of a search is split into. Time spent in a search outside of the other phases is counted as "other".
+PHASES = ("lookup", "heuristic", "frontier", "path", "other")
+
+# The methods of a search timed as each phase, when the search has them. Paths most searches leave to be
+# built when they are first read are timed as the path phase too, see Instrumentation.attach.
+SEARCH_PHASES = {
+    "__estimate__": "heuristic",
+    "__potential__": "heuristic",
+    "__build_path__": "path",
+    "__build_bidirectional_path__": "path"
+}
+
+class Instrumentation:
+    """
+    Represents timing and counts collected from every search created while it is enabled, grouped by
+    search method. Searches report to it through wrappers installed when they are created (see
+    Search.__init__), so searches created while instrumentation is disabled run exactly as before.
+
+    Only what happens while a search is being performed is counted. Searches work on the map itself
+    outside of perform, so what they precompute when they are created, like landmarks or haversine
+    tables, is neither timed nor counted as expanded cities of any method.
+
+    Most searches only build the path of their result when it is first read, after perform returns.
+    Instrumented searches read the path before returning, so building it is timed as the path phase.
+
+    Every phase is timed exclusively, time spent in a phase nested inside another phase, like looking
+    up cities while building a path, only counts towards the inner phase.
+    """
+
+    def __init__(self, on_expand : Callable[[str, int], None] = None) -> None:
+        """
+        Args:
+            on_expand (Callable[[str, int], None]): Called with the search method and the ID of every city
+                a search looks up the actions of.
+        """
+
+        self.on_expand = on_expand
+        self.methods = {}
+        # The method of the search being performed, and the time spent in nested phases of every phase in progress.
+        self.current_method = None
+        self.nested_seconds = []
+
+    def enable(self) -> None:
+        """
+        Makes every search created from now on report to this instrumentation.
+        """
+
+        Search.instrumentation = self
+
+    def disable(self) -> None:
+        """
+        Stops new searches from reporting to this instrumentation.
+        """
+
+        if Search.instrumentation is self:
+            Search.instrumentation = None
+
+    def attach(self, search : Search) -> None:
+        """
+        Installs the timing wrappers on a search.
+
+        Args:
+            search (Search): The search to instrument.
+        """
+
+        search.frontier_type = lambda: InstrumentedPriorityQueue(self)
+        search.queue_type = lambda items=(): InstrumentedQueue(self, items)
+        search.list_type = lambda items=(): InstrumentedList(self, items)
+
+        for name, phase in SEARCH_PHASES.items():
+            if hasattr(search, name):
+                setattr(search, name, self.__wrap__(phase, getattr(search, name)))
+
+        perform = search.perform
+
+        def instrumented_perform(start : str, target : str) -> Any:
+            # Searches may be performed by other searches, so restore whatever was being performed before.
+            previous_method = self.current_method
+            map = search.map
+            # Contraction hierarchy queries look up the edges of the hierarchy instead of the actions of the map.
+            hierarchy = getattr(search, "hierarchy", None)
+
+            self.current_method = search.name
+            self.__stats__()["searches"] += 1
+            search.map = InstrumentedMap(map, self)
+
+            if hierarchy is not None:
+                search.hierarchy = InstrumentedHierarchy(hierarchy, self)
+
+            try:
+                result = self.measure("other", perform, start, target)
+
+                if isinstance(result, SearchResult):
+                    self.measure("path", lambda: result.path)
+
+                return result
+            finally:
+                search.map = map
+                self.current_method = previous_method
+
+                if hierarchy is not None:
+                    search.hierarchy = hierarchy
+
+        search.perform = instrumented_perform
+
+    def __wrap__(self, phase : str, function : Callable) -> Callable:
+        """
+        Wraps a function so every call to it is timed as the given phase.
+        """
+
+        return lambda *args: self.measure(phase, function, *args)
+
+    def __stats__(self) -> dict:
+        """
+        Gets the stats of the method of the search being performed, creating them on first use.
+        """
+
+        stats = self.methods.get(self.current_method)
+
+        if stats is None:
+            stats = {
+                "searches": 0,
+                "seconds": { phase: 0.0 for phase in PHASES },
+                "calls": { phase: 0 for phase in PHASES },
+                "expanded": 0,
+                "peak_frontier": 0
+            }
+            self.methods[self.current_method] = stats
+
+        return stats
+
+    def measure(self, phase : str, function : Callable, *args) -> Any:
+        """
+        Calls a function and times it as the given phase.
+
+        Args:
+            phase (str): The phase to count the time towards.
+            function (Callable): The function to call.
+
+        Returns:
+            Any: What the function returned.
+        """
+
+        if self.current_method is None:
+            return function(*args)
+
+        self.nested_seconds.append(0.0)
+        start_time = time.perf_counter()
+
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            nested = self.nested_seconds.pop()
+
+            stats = self.__stats__()
+            stats["seconds"][phase] += elapsed - nested
+            stats["calls"][phase] += 1
+
+            if self.nested_seconds:
+                self.nested_seconds[-1] += elapsed
+
+    def expand(self, city_id : int) -> None:
+        """
+        Counts a city whose actions were looked up and calls the expansion callback.
+
+        Args:
+            city_id (int): The ID of the city.
+        """
+
+        if self.current_method is None:
+            return
+
+        self.__stats__()["expanded"] += 1
+
+        if self.on_expand is not None:
+            self.on_expand(self.current_method, city_id)
+
+    def frontier_size(self, size : int) -> None:
+        """
+        Records the size of a frontier after something was added to it.
+
+        Args:
+            size (int): The number of cities in the frontier.
+        """
+
+        if self.current_method is None:
+            return
+
+        stats = self.__stats__()
+        stats["peak_frontier"] = max(stats["peak_frontier"], size)
+
+    def to_dict(self) -> dict:
+        """
+        Gets everything collected so far in a form that can be saved as JSON.
+
+        Returns:
+            dict: The stats of every search method, keyed by method name.
+        """
+
+        return { method: stats for method, stats in self.methods.items() if method is not None }
+
+class InstrumentedMap:
+    """
+    Represents a map that times the lookups made on it as the lookup phase, and reports every city
+    whose actions are looked up as expanded. Everything else is passed through to the wrapped map.
+    """
+
+    def __init__(self, map : Any, instrumentation : Instrumentation) -> None:
+        self.map = map
+        # Structures kept per map, like haversine tables, are shared with the wrapped map, see map_cache.underlying_map.
+        self.underlying_map = underlying_map(map)
+        self.instrumentation = instrumentation
+
+    def get_city_id(self, name : str) -> int:
+        return self.instrumentation.measure("lookup", self.map.get_city_id, name)
+
+    def get_city_by_id(self, city_id : int) -> Any:
+        return self.instrumentation.measure("lookup", self.map.get_city_by_id, city_id)
+
+    def get_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        self.instrumentation.expand(city_id)
+
+        return self.instrumentation.measure("lookup", self.map.get_neighbors, city_id)
+
+    def get_reverse_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        self.instrumentation.expand(city_id)
+
+        return self.instrumentation.measure("lookup", self.map.get_reverse_neighbors, city_id)
+
+    def __getattr__(self, name : str) -> Any:
+        return getattr(self.map, name)
+
+    def __len__(self) -> int:
+        return len(self.map)
+
+class InstrumentedHierarchy:
+    """
+    Represents a contraction hierarchy whose edges are looked up like the actions of an InstrumentedMap.
+    Everything else is passed through to the wrapped hierarchy.
+    """
+
+    def __init__(self, hierarchy : Any, instrumentation : Instrumentation) -> None:
+        self.hierarchy = hierarchy
+        self.upward = InstrumentedEdges(hierarchy.upward, instrumentation)
+        self.downward = InstrumentedEdges(hierarchy.downward, instrumentation)
+
+    def __getattr__(self, name : str) -> Any:
+        return getattr(self.hierarchy, name)
+
+class InstrumentedEdges:
+    """
+    Represents the edges of every city in a contraction hierarchy, which times every lookup as the lookup
+    phase and reports every city whose edges are looked up as expanded.
+    """
+
+    def __init__(self, edges : list[list[tuple[int, int]]], instrumentation : Instrumentation) -> None:
+        self.edges = edges
+        self.instrumentation = instrumentation
+
+    def __getitem__(self, city_id : int) -> list[tuple[int, int]]:
+        self.instrumentation.expand(city_id)
+
+        return self.instrumentation.measure("lookup", self.edges.__getitem__, city_id)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+class InstrumentedPriorityQueue(PriorityQueue):
+    """
+    Represents a priority queue that times every operation as the frontier phase and records its peak size.
+    """
+
+    def __init__(self, instrumentation : Instrumentation) -> None:
+        super().__init__()
+        self.instrumentation = instrumentation
+
+    def push(self, item : Any, priority : float) -> None:
+        self.instrumentation.measure("frontier", super().push, item, priority)
+        self.instrumentation.frontier_size(len(self))
+
+    def pop(self) -> Any:
+        return self.instrumentation.measure("frontier", super().pop)
+
+    def peek(self) -> tuple[Any, float]:
+        return self.instrumentation.measure("frontier", super().peek)
+
+class InstrumentedQueue(deque):
+    """
+    Represents a first in, first out frontier that times every operation as the frontier phase and records its peak size.
+    """
+
+    def __init__(self, instrumentation : Instrumentation, items : Iterable = ()) -> None:
+        super().__init__(items)
+        self.instrumentation = instrumentation
+        self.instrumentation.frontier_size(len(self))
+
+    def append(self, item : Any) -> None:
+        self.instrumentation.measure("frontier", super().append, item)
+        self.instrumentation.frontier_size(len(self))
+
+    def popleft(self) -> Any:
+        return self.instrumentation.measure("frontier", super().popleft)
+
+class InstrumentedList(list):
+    """
+    Represents a frontier kept as a list, like a stack, that times every operation as the frontier phase and records its peak size.
+    """
+
+    def __init__(self, instrumentation : Instrumentation, items : Iterable = ()) -> None:
+        super().__init__(items)
+        self.instrumentation = instrumentation
+        self.instrumentation.frontier_size(len(self))
+
+    def append(self, item : Any) -> None:
+        self.instrumentation.measure("frontier", super().append, item)
+        self.instrumentation.frontier_size(len(self))
+
+    def pop(self, *args) -> Any:
+        return self.instrumentation.measure("frontier", super().pop, *args)
@@ -0,0 +1,223 @@
+import math
+from array import array
+from csr_graph import CsrGraph
+from distance_table import map_fingerprint
+from map import Map
+from map_cache import MapCache
+from pathlib import Path
+from snapshot import FileFormat
+from typing import Self
+from ucs import UniformCostSearch
+
+# City count, landmark count, and fingerprint of the map the landmarks were selected for.
+FORMAT = FileFormat(b"LANDMRK\0", 1, "qqI", "landmark file")
+
+# The number of landmarks selected when none are given.
+DEFAULT_COUNT = 8
+
+# The landmarks of every map they have been selected or loaded for, see Landmarks.for_map.
+registered = MapCache()
+
+class Landmarks:
+    """
+    Represents a small set of landmark cities along with the lowest path costs from every landmark to
+    every city and from every city to every landmark, used for the ALT (A*, landmarks, triangle
+    inequality) heuristic.
+
+    For a landmark L, the triangle inequality gives cost(v, t) >= cost(L, t) - cost(L, v) and
+    cost(v, t) >= cost(v, L) - cost(t, L). The largest of these over every landmark is a lower bound
+    on the cost from v to t that only depends on the actions of the map, so unlike the haversine
+    distance it never overestimates, however accurate the coordinates are.
+    """
+
+    def __init__(self, map : Map | CsrGraph, landmark_ids : array, from_costs : list[array], to_costs : list[array]) -> None:
+        self.map = map
+        self.landmark_ids = landmark_ids
+        # Indexed by landmark, then by city ID. Cities that can't be reached have an infinite cost.
+        self.from_costs = from_costs
+        self.to_costs = to_costs
+
+    @classmethod
+    def build(cls, map : Map | CsrGraph, count : int = DEFAULT_COUNT) -> Self:
+        """
+        Selects landmarks for the given map and precomputes the costs to and from them.
+
+        Landmarks are selected one at a time with the farthest-point method: every new landmark is the
+        city farthest from the landmarks selected so far, counting the costs both ways, which spreads them
+        around the edges of the map where they give the tightest bounds. The first landmark is the city
+        farthest from the first city of the map.
+
+        Args:
+            map (Map | CsrGraph): The map to select landmarks for.
+            count (int): The number of landmarks to select, at most the number of cities in the map.
+
+        Returns:
+            Landmarks: The landmarks of the map.
+        """
+
+        search = UniformCostSearch(map)
+        count = min(count, len(map))
+
+        landmark_ids = array("i")
+        from_costs = []
+        to_costs = []
+
+        if count == 0:
+            return cls(map, landmark_ids, from_costs, to_costs)
+
+        # How far every city is from the closest landmark so far, cities already selected are never selected again.
+        closest = [ math.inf ] * len(map)
+        costs, _ = search.search_tree(0)
+        candidate = cls.__farthest__([ cost if cost < math.inf else -1 for cost in costs ], set())
+
+        while len(landmark_ids) < count:
+            landmark_ids.append(candidate)
+            from_costs.append(array("d", search.search_tree(candidate)[0]))
+            to_costs.append(array("d", search.search_tree(candidate, reverse=True)[0]))
+
+            for city_id in range(len(map)):
+                round_trip = from_costs[-1][city_id] + to_costs[-1][city_id]
+                # Cities that can't reach or be reached from any landmark yet are the best candidates.
+                closest[city_id] = min(closest[city_id], round_trip)
+
+            candidate = cls.__farthest__(closest, set(landmark_ids))
+
+        return cls(map, landmark_ids, from_costs, to_costs)
+
+    @staticmethod
+    def __farthest__(distances : list[float], excluded : set[int]) -> int:
+        """
+        Finds the city with the largest distance, ties are broken by the lowest city ID.
+
+        Args:
+            distances (list[float]): The distance of every city, indexed by city ID.
+            excluded (set[int]): The IDs of the cities that can't be picked.
+
+        Returns:
+            int: The ID of the farthest city.
+        """
+
+        farthest = None
+
+        for city_id, distance in enumerate(distances):
+            if city_id not in excluded and (farthest is None or distance > distances[farthest]):
+                farthest = city_id
+
+        return farthest
+
+    @classmethod
+    def load(cls, file_name : str, map : Map | CsrGraph) -> Self:
+        """
+        Loads landmarks saved with save for the given map.
+
+        Args:
+            file_name (str): The name of the file to load the landmarks from.
+            map (Map | CsrGraph): The map the landmarks were selected for.
+
+        Returns:
+            Landmarks: The loaded landmarks.
+
+        Raises:
+            FileNotFoundError: If the landmark file does not exist.
+            ValueError: If the file is not a landmark file, or was saved for a different map.
+        """
+
+        landmark_path = Path(file_name)
+        if not landmark_path.is_file():
+            raise FileNotFoundError(f"Error: The landmark file '{file_name}' does not exist.")
+
+        city_count = len(map)
+
+        with open(landmark_path, "rb") as file:
+            file_city_count, count, fingerprint = FORMAT.read_header(file, file_name)
+            if file_city_count != city_count or fingerprint != map_fingerprint(map):
+                raise ValueError(f"Error: The landmark file '{file_name}' was saved for a different map.")
+
+            landmark_ids = array("i")
+            landmark_ids.fromfile(file, count)
+
+            from_costs = []
+            to_costs = []
+
+            for _ in range(count):
+                from_costs.append(array("d"))
+                from_costs[-1].fromfile(file, city_count)
+                to_costs.append(array("d"))
+                to_costs[-1].fromfile(file, city_count)
+
+        return cls(map, landmark_ids, from_costs, to_costs)
+
+    def save(self, file_name : str) -> None:
+        """
+        Saves the landmarks to the given file so they can be loaded again with load.
+
+        Args:
+            file_name (str): The name of the file to save the landmarks to.
+        """
+
+        with open(file_name, "wb") as file:
+            file.write(FORMAT.pack_header(len(self.map), len(self.landmark_ids), map_fingerprint(self.map)))
+            self.landmark_ids.tofile(file)
+
+            for from_costs, to_costs in zip(self.from_costs, self.to_costs):
+                from_costs.tofile(file)
+                to_costs.tofile(file)
+
+    @classmethod
+    def for_map(cls, map : Map | CsrGraph, count : int = DEFAULT_COUNT) -> Self:
+        """
+        Gets the landmarks registered for the given map, selecting and registering them first if the map
+        has none yet or has changed since they were selected.
+
+        Args:
+            map (Map | CsrGraph): The map to get the landmarks of.
+            count (int): The number of landmarks to select if they have to be selected.
+
+        Returns:
+            Landmarks: The landmarks of the map.
+        """
+
+        return registered.get_or_build(map, lambda map: cls.build(map, count))
+
+    def register(self) -> None:
+        """
+        Registers the landmarks as the ones to use for their map, see for_map.
+        """
+
+        registered.put(self.map, self)
+
+    def lower_bound(self, current : int, target : int) -> float:
+        """
+        Computes a lower bound on the cost of the cheapest path between two cities.
+
+        Args:
+            current (int): The ID of the city to estimate the cost from.
+            target (int): The ID of the city to estimate the cost to.
+
+        Returns:
+            float: The largest bound given by any landmark, or 0 if none give one.
+        """
+
+        bound = 0
+
+        for from_costs, to_costs in zip(self.from_costs, self.to_costs):
+            # Costs to or from cities a landmark can't reach don't bound anything.
+            forward = from_costs[target] - from_costs[current]
+            if forward > bound and from_costs[target] < math.inf:
+                bound = forward
+
+            backward = to_costs[current] - to_costs[target]
+            if backward > bound and to_costs[current] < math.inf:
+                bound = backward
+
+        return bound
+
+    def memory_usage(self) -> int:
+        """
+        Gets the number of bytes used by the cost arrays of the landmarks.
+
+        Returns:
+            int: The size of the cost arrays in bytes.
+        """
+
+        return sum(len(costs) * costs.itemsize for costs in self.from_costs + self.to_costs)
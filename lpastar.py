@@ -0,0 +1,238 @@
+import math
+from astar import AstarSearch
+from haversine_table import HaversineTable
+from map import Map
+from map_cache import MapCache, underlying_map
+from search import Search, follow_lowest_costs
+from search_result import SearchResult
+
+# The heuristic scale of every map it has been calculated for, and the number of edge changes it includes, see heuristic_scale.
+scales = MapCache(follows_changes=False)
+
+def heuristic_scale(map : Map) -> float:
+    """
+    Calculates how much the haversine distance has to be scaled down so it never overestimates the cost
+    of an action, which makes it a consistent estimate. The scale is kept for every map, and only the
+    actions that changed since it was last calculated are checked again.
+
+    Args:
+        map (Map): The map to calculate the scale for.
+
+    Returns:
+        float: The scale, at most 1.
+    """
+
+    map = underlying_map(map)
+    astar = AstarSearch(map)
+    change_count, scale = scales.get(map) or (None, 1.0)
+
+    if change_count is None:
+        actions = ((city_id, neighbor, cost) for city_id in range(len(map)) for neighbor, cost in map.get_neighbors(city_id))
+    else:
+        # Costs that went up can only leave the scale lower than needed, which is still consistent.
+        actions = ((source, destination, cost) for source, destination in map.edge_changes[change_count:] for neighbor, cost in map.get_neighbors(source) if neighbor == destination)
+
+    for source, destination, cost in actions:
+        distance = astar.__calculate_distance__(source, destination)
+
+        if distance > cost:
+            # Slightly lower than the exact ratio so rounding can't make the estimate overestimate.
+            scale = min(scale, cost / distance * (1 - 1e-9))
+
+    scales.put(map, (len(map.edge_changes), scale))
+
+    return scale
+
+class LpaStarSearch(Search):
+    """
+    Represents a lifelong planning A* search (LPA*), an A* search that can be repeated after action
+    costs change without starting over.
+
+    Every city has a path cost g from the last time it was expanded, and a one-step lookahead rhs, the
+    lowest cost of reaching it through any of the cities with an action to it. A city whose two costs
+    disagree is inconsistent and waits in the frontier. When the map changes (see Map.update_edge_cost),
+    only the destinations of the changed actions are checked again, and the search only expands the
+    cities whose costs actually changed, repairing the previous search tree instead of rebuilding it.
+
+    The same search object has to be performed again with the same start and target to reuse its work,
+    any other query starts over. The counts of each result only cover the work done by that call.
+    Repairing the search tree needs a consistent estimate, so unlike A* the haversine distance is scaled
+    down on maps where it overestimates the cost of some action (see heuristic_scale), and the lowest cost
+    path is always found. A change that lowers the scale further starts the search over.
+    """
+
+    name = "lpastar"
+
+    def __init__(self, map : Map) -> None:
+        super().__init__(map)
+        # Reuse the haversine distance of the A* search, or the distances of every city to the target
+        # calculated at once if NumPy is installed.
+        self.astar = AstarSearch(map)
+        self.start_id = None
+        self.target_id = None
+        self.estimates = None
+        self.scale = 1.0
+        self.path_costs = {}
+        self.lookaheads = {}
+        self.frontier = None
+        # The number of changes to the map already repaired.
+        self.change_count = 0
+
+    def __estimate__(self, city_id : int) -> float:
+        """
+        Estimates the cost from a city to the target.
+        """
+
+        if self.estimates is not None:
+            return self.estimates[city_id] * self.scale
+
+        return self.astar.__calculate_distance__(city_id, self.target_id) * self.scale
+
+    def __key__(self, city_id : int) -> tuple[float, float]:
+        """
+        Calculates the priority of a city in the frontier, its lowest known cost plus its estimate, with ties broken by the lowest known cost.
+        """
+
+        cost = min(self.path_costs.get(city_id, math.inf), self.lookaheads.get(city_id, math.inf))
+
+        return (cost + self.__estimate__(city_id), cost)
+
+    def __update_city__(self, city_id : int, result : SearchResult) -> None:
+        """
+        Recalculates the lookahead cost of a city from the cities with an action to it, and updates it in the frontier.
+        """
+
+        if city_id != self.start_id:
+            self.lookaheads[city_id] = min((self.path_costs.get(source, math.inf) + cost for source, cost in self.map.get_reverse_neighbors(city_id)), default=math.inf)
+
+        self.__queue_city__(city_id, result)
+
+    def __queue_city__(self, city_id : int, result : SearchResult) -> None:
+        """
+        Adds a city to the frontier if it is inconsistent, or removes it if it isn't.
+        """
+
+        if self.path_costs.get(city_id, math.inf) != self.lookaheads.get(city_id, math.inf):
+            if city_id not in self.frontier:
+                result.explored += 1
+
+            self.frontier.push(city_id, self.__key__(city_id))
+        else:
+            self.frontier.remove(city_id)
+
+    def __reset__(self, start_id : int, target_id : int, result : SearchResult) -> None:
+        """
+        Throws away the previous search and starts a new one between the given cities.
+        """
+
+        self.start_id = start_id
+        self.target_id = target_id
+        haversine_table = HaversineTable.for_map(self.map)
+        self.estimates = haversine_table.get(target_id) if haversine_table is not None else None
+        self.scale = heuristic_scale(self.map)
+
+        self.path_costs = {}
+        self.lookaheads = { start_id: 0 }
+        self.frontier = self.frontier_type()
+        self.frontier.push(start_id, self.__key__(start_id))
+        self.change_count = len(self.map.edge_changes)
+
+        result.explored += 1
+
+    def __repair__(self, result : SearchResult) -> None:
+        """
+        Checks the destinations of every action that changed since the last search again.
+        """
+
+        changes = self.map.edge_changes[self.change_count:]
+        self.change_count = len(self.map.edge_changes)
+
+        for destination_id in { destination_id for _, destination_id in changes }:
+            self.__update_city__(destination_id, result)
+
+    def __expand__(self, result : SearchResult) -> None:
+        """
+        Expands cities until no city in the frontier could change the cost of the target and the target is consistent.
+
+        Cities whose key ties the key of the target are expanded too. With actions that cost nothing, a city
+        on the path to the target can have the same key as the target, and a cost increase left in the
+        frontier would leave the target with a stale cost.
+        """
+
+        while self.frontier and (self.frontier.peek()[1] <= self.__key__(self.target_id) or self.lookaheads.get(self.target_id, math.inf) != self.path_costs.get(self.target_id, math.inf)):
+            current = self.frontier.pop()
+            result.expanded += 1
+
+            if self.path_costs.get(current, math.inf) > self.lookaheads.get(current, math.inf):
+                # The city got cheaper, settle its new cost. Its neighbors can only get cheaper through it,
+                # so their lookaheads are lowered without checking their other sources again.
+                path_cost = self.path_costs[current] = self.lookaheads[current]
+
+                for neighbor, action_cost in self.map.get_neighbors(current):
+                    if neighbor != self.start_id and path_cost + action_cost < self.lookaheads.get(neighbor, math.inf):
+                        self.lookaheads[neighbor] = path_cost + action_cost
+                        self.__queue_city__(neighbor, result)
+            else:
+                # The city got more expensive, forget its cost and check it again along with everything reached through it.
+                self.path_costs[current] = math.inf
+                self.__update_city__(current, result)
+
+                for neighbor, _ in self.map.get_neighbors(current):
+                    self.__update_city__(neighbor, result)
+
+    def __follow_path__(self) -> list[int]:
+        """
+        Follows the path costs back from the target to the start.
+
+        Returns:
+            list[int]: The IDs of the cities on the path, or None if the target can't be reached.
+        """
+
+        if self.path_costs.get(self.target_id, math.inf) == math.inf:
+            return None
+
+        return follow_lowest_costs(self.map, self.start_id, self.target_id, lambda city_id: self.path_costs.get(city_id, math.inf))
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs an LPA* search from the given start city until the given target city is found, reusing the
+        previous search if it had the same start and target.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search.
+        """
+
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        result = SearchResult(self.name, start, target)
+
+        if start_id is None or target_id is None:
+            return result
+
+        if (start_id, target_id) != (self.start_id, self.target_id) or heuristic_scale(self.map) < self.scale:
+            self.__reset__(start_id, target_id, result)
+        else:
+            self.__repair__(result)
+
+        self.__expand__(result)
+        path_ids = self.__follow_path__()
+
+        if path_ids is None and self.path_costs.get(target_id, math.inf) < math.inf:
+            # The repaired costs should always explain a path, but never report one that doesn't exist. Start over instead.
+            self.__reset__(start_id, target_id, result)
+            self.__expand__(result)
+            path_ids = self.__follow_path__()
+
+        result.maintained = len(self.frontier)
+
+        if path_ids is not None:
+            result.success = True
+            result.set_path_ids(self.map, path_ids)
+            result.cost = self.path_costs[target_id]
+
+        return result
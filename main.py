@@ -1,16 +1,43 @@
 import argparse
+import cProfile
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
 from map import Map
-from astar import AstarSearch
+from csr_graph import CsrGraph
+from distance_table import DistanceTable
+from astar import AltSearch, AstarSearch
 from bfs import BreadthFirstSearch
-from ids import IterativeDeepeningSearch
+from contraction_hierarchy import ContractionHierarchy, ContractionHierarchySearch
+from bidirectional import BidirectionalAstarSearch, BidirectionalBreadthFirstSearch, BidirectionalUniformCostSearch
+from ids import IdaStarSearch, IterativeDeepeningSearch
+from instrumentation import Instrumentation
+from landmarks import DEFAULT_COUNT, Landmarks
 from ucs import UniformCostSearch
+from result_cache import ResultCache
+from result_sink import FORMATS, ResultSink, ResultStats
 from search_result import SearchResult
+from snapshot import is_snapshot, load_snapshot, write_snapshot
+from spatial_index import SpatialIndex
+from weighted_astar import AraStarSearch, WeightedAstarSearch
 
 search_methods = {
     BreadthFirstSearch.name: BreadthFirstSearch,
     IterativeDeepeningSearch.name: IterativeDeepeningSearch,
     UniformCostSearch.name: UniformCostSearch,
-    AstarSearch.name: AstarSearch
+    AstarSearch.name: AstarSearch,
+    AltSearch.name: AltSearch,
+    IdaStarSearch.name: IdaStarSearch,
+    BidirectionalBreadthFirstSearch.name: BidirectionalBreadthFirstSearch,
+    BidirectionalUniformCostSearch.name: BidirectionalUniformCostSearch,
+    BidirectionalAstarSearch.name: BidirectionalAstarSearch,
+    ContractionHierarchySearch.name: ContractionHierarchySearch,
+    WeightedAstarSearch.name: WeightedAstarSearch,
+    AraStarSearch.name: AraStarSearch
 }
 
 default_queries = [
@@ -24,6 +51,116 @@ default_queries = [
     ("caen", "strasbourg")
 ]
 
+def load_map(file_name : str, compact : bool = False) -> Map | CsrGraph:
+    """
+    Loads a map from either a map file or a binary snapshot.
+
+    Args:
+        file_name (str): The name of the map file or snapshot to load.
+        compact (bool): Whether to load a map file into a compact CSR graph instead of a Map.
+
+    Returns:
+        Map | CsrGraph: The loaded map. Snapshots are always loaded as a CSR graph.
+    """
+
+    if is_snapshot(file_name):
+        # Snapshots are memory-mapped, so nothing has to be parsed.
+        return load_snapshot(file_name)
+    elif compact:
+        # Stream the map straight into flat arrays and let the searches run on those instead.
+        return CsrGraph.from_file(file_name)
+    else:
+        return Map.from_file(file_name)
+
+def load_distance_table(file_name : str, map : Map | CsrGraph, algorithm : str = "dijkstra") -> DistanceTable:
+    """
+    Loads the distance table for the given map, or builds and saves it if the file doesn't exist yet.
+    Prints how much memory the table uses.
+
+    Args:
+        file_name (str): The name of the file the table is saved in.
+        map (Map | CsrGraph): The map the table is for.
+        algorithm (str): The algorithm used to build the table, see DistanceTable.build.
+
+    Returns:
+        DistanceTable: The distance table for the map.
+    """
+
+    if Path(file_name).is_file():
+        table = DistanceTable.load(file_name, map)
+    else:
+        table = DistanceTable.build(map, algorithm)
+        table.save(file_name)
+
+    print(f"Distance table: {len(map)} cities, {len(map)**2} pairs, {table.memory_usage() / 2**10:.1f} KiB", file=sys.stderr)
+
+    return table
+
+def load_landmarks(file_name : str, map : Map | CsrGraph, count : int = DEFAULT_COUNT) -> Landmarks:
+    """
+    Loads the landmarks for the given map, or selects and saves them if the file doesn't exist yet.
+    The landmarks are registered for the map, so the ALT search uses them instead of selecting its own.
+
+    Args:
+        file_name (str): The name of the file the landmarks are saved in.
+        map (Map | CsrGraph): The map the landmarks are for.
+        count (int): The number of landmarks to select if the file doesn't exist yet.
+
+    Returns:
+        Landmarks: The landmarks of the map.
+    """
+
+    if Path(file_name).is_file():
+        landmarks = Landmarks.load(file_name, map)
+    else:
+        landmarks = Landmarks.build(map, count)
+        landmarks.save(file_name)
+
+    landmarks.register()
+    print(f"Landmarks: {len(landmarks.landmark_ids)} landmarks, {landmarks.memory_usage() / 2**10:.1f} KiB", file=sys.stderr)
+
+    return landmarks
+
+def load_hierarchy(file_name : str, map : Map | CsrGraph) -> ContractionHierarchy:
+    """
+    Loads the contraction hierarchy for the given map, or builds and saves it if the file doesn't exist yet.
+    The hierarchy is registered for the map, so the ch search uses it instead of building its own.
+
+    Args:
+        file_name (str): The name of the file the hierarchy is saved in.
+        map (Map | CsrGraph): The map the hierarchy is for.
+
+    Returns:
+        ContractionHierarchy: The hierarchy of the map.
+    """
+
+    if Path(file_name).is_file():
+        hierarchy = ContractionHierarchy.load(file_name, map)
+    else:
+        hierarchy = ContractionHierarchy.build(map)
+        hierarchy.save(file_name)
+
+    hierarchy.register()
+    print(f"Contraction hierarchy: {len(map)} cities, {hierarchy.shortcut_count()} shortcuts", file=sys.stderr)
+
+    return hierarchy
+
+def configure_bounded_searches(epsilon : float = None, deadline : float = None) -> None:
+    """
+    Sets how much new weighted and anytime A* searches inflate their estimates, and how long anytime
+    searches keep improving their path. Either is left at its default when None.
+
+    Args:
+        epsilon (float): The inflation factor, so paths cost at most 1 + epsilon times the lowest cost.
+        deadline (float): The number of seconds anytime searches keep improving their path for.
+    """
+
+    if epsilon is not None:
+        WeightedAstarSearch.epsilon = epsilon
+        AraStarSearch.epsilon = epsilon
+    if deadline is not None:
+        AraStarSearch.deadline = deadline
+
 def search_factory(search_method : str, map : Map):
     """
     Creates an instance of a search class based on the given name.
@@ -38,7 +175,7 @@ def search_factory(search_method : str, map : Map):
 
     return search_methods[search_method](map)
 
-def perform_search(search_method : str, start : str, target : str, map : Map) -> SearchResult:
+def perform_search(search_method : str, start : str, target : str, map : Map, cache : ResultCache = None) -> SearchResult:
     """
     Perform a given search for a given start city and target city.
 
@@ -47,14 +184,25 @@ def perform_search(search_method : str, start : str, target : str, map : Map) ->
         start (str): The name of the city to start the search at.
         target (str): The name of the target city to search for.
         map (Map): The map containing all cities to search through.
+        cache (ResultCache): A cache to look the result up in before searching, and to add new results to.
     
     Returns:
         SearchResult: The result of the search that was performed.
     """
 
+    if cache is not None:
+        key = (map.version, search_method, start, target)
+
+        if (result := cache.get(key)) is not None:
+            return result
+
     search = search_factory(search_method, map)
-    
-    return search.perform(start, target)
+    result = search.perform(start, target)
+
+    if cache is not None:
+        cache.put(key, result)
+
+    return result
 
 def perform_all_searches(map : Map) -> list[SearchResult]:
     """
@@ -77,142 +225,425 @@ def perform_all_searches(map : Map) -> list[SearchResult]:
         
     return results
 
-def compute_averages(results : list[SearchResult]) -> tuple[int, int, int]:
+def read_queries(file : TextIO, default_method : str) -> list[tuple[str, str, str]]:
     """
-    Computes the average explored, expanded, and maintained values of a given search result.
+    Reads batch queries from the given file. Every line holds a start city, a target city, and
+    optionally a search method, separated by whitespace. Blank lines and lines starting with # are skipped.
 
     Args:
-        results (list[SearchResult]): The search result to compute averages for.
-    
+        file (TextIO): The file to read queries from.
+        default_method (str): The search method to use for lines that don't name one.
+
     Returns:
-        tuple[int, int, int]: A tuple of the average explored, expanded, and maintained values in that order.
+        list[tuple[str, str, str]]: The (start, target, method) of every query, in the order they were read.
+
+    Raises:
+        ValueError: If a line is malformed or names an unknown search method.
     """
 
-    explored = 0
-    expanded = 0
-    maintained = 0
-    count = len(results)
+    queries = []
 
-    for result in results:
-        explored += result.explored
-        expanded += result.expanded
-        maintained += result.maintained
-    
-    explored /= count
-    expanded /= count
-    maintained /= count
+    for line_number, line in enumerate(file, start=1):
+        parts = line.lower().split()
+
+        if not parts or parts[0].startswith("#"):
+            continue
+
+        if len(parts) not in (2, 3):
+            raise ValueError(f"Error: Query line {line_number} should be '<start> <target> [<method>]'.")
+
+        start, target, method = parts if len(parts) == 3 else (*parts, default_method)
+
+        if method not in search_methods:
+            raise ValueError(f"Error: Query line {line_number} uses unknown search method '{method}'.")
+
+        queries.append((start, target, method))
+
+    return queries
 
-    return (explored, expanded, maintained)
+# The map, distance table, and result cache of each worker process of a batch, see init_batch_worker.
+worker_map = None
+worker_table = None
+worker_cache = None
 
-def compute_optimals(results : list[SearchResult]) -> dict[str, int]:
+def init_batch_worker(map_file : str, compact : bool, table_file : str = None, cache_size : int = 0, cache_ttl : float = None, landmark_file : str = None, hierarchy_file : str = None, epsilon : float = None, deadline : float = None) -> None:
     """
-    Computes the number of times each search method found the best result. If multiple
-    search methods find the best result, then they both get counted.
+    Loads the map once in a batch worker process so it can be reused for every query the worker performs.
 
     Args:
-        results (list[SearchResult]): The list of search results to find optimal results in.
-    
+        map_file (str): The name of the map file or snapshot to load.
+        compact (bool): Whether to load a map file into a compact CSR graph.
+        table_file (str): The name of a saved distance table to answer every query from, if any.
+        cache_size (int): The number of results the worker caches, 0 disables the cache.
+        cache_ttl (float): The number of seconds cached results stay valid for, or None for no limit.
+        landmark_file (str): The name of saved landmarks for the ALT search to use, if any.
+        hierarchy_file (str): The name of a saved contraction hierarchy for the ch search to use, if any.
+        epsilon (float): The inflation factor of weighted and anytime A* searches, see configure_bounded_searches.
+        deadline (float): The number of seconds anytime A* searches keep improving their path for.
+    """
+
+    configure_bounded_searches(epsilon, deadline)
+
+    global worker_map, worker_table, worker_cache
+    worker_map = load_map(map_file, compact)
+    worker_table = DistanceTable.load(table_file, worker_map) if table_file else None
+    worker_cache = ResultCache(cache_size, cache_ttl) if cache_size > 0 else None
+
+    if landmark_file:
+        Landmarks.load(landmark_file, worker_map).register()
+    if hierarchy_file:
+        ContractionHierarchy.load(hierarchy_file, worker_map).register()
+
+def group_batch_queries(queries : Iterable[tuple[str, str, str]]) -> tuple[list[tuple[str, list[str], str]], list[int]]:
+    """
+    Groups batch queries into tasks. Uniform-cost queries that share a start city are grouped into a
+    single one-to-many task, every other query becomes a task of its own.
+
+    Args:
+        queries (Iterable[tuple[str, str, str]]): The start, target, and search method of every query.
+
+    Returns:
+        tuple[list[tuple[str, list[str], str]], list[int]]: The (start, targets, method) of every task in
+        order of first appearance, and the index of the task that answers each query.
+    """
+
+    tasks = []
+    task_indices = []
+    ucs_tasks = {}
+
+    for start, target, method in queries:
+        if method == UniformCostSearch.name:
+            if start not in ucs_tasks:
+                ucs_tasks[start] = len(tasks)
+                tasks.append((start, [], method))
+
+            task_index = ucs_tasks[start]
+            tasks[task_index][1].append(target)
+        else:
+            task_index = len(tasks)
+            tasks.append((start, [ target ], method))
+
+        task_indices.append(task_index)
+
+    return (tasks, task_indices)
+
+def perform_batch_task(task : tuple[str, list[str], str]) -> list[SearchResult]:
+    """
+    Performs a single batch task on the map loaded by the current worker process.
+
+    Args:
+        task (tuple[str, list[str], str]): The start, targets, and search method of the task.
+
     Returns:
-        dict[str, int]: A dictionary of the results for each method keyed of their name.
-    """
-
-    bfs_optimal = 0
-    dls_optimal = 0
-    ucs_optimal = 0
-    astar_optimal = 0
-
-    for start, target in default_queries:
-        # Get all search results for the current query.
-        query_results = [ r for r in results if r.start == start and r.target == target ]
-        # Find the minimum cost found in all the searches.
-        min_cost = min([ r.cost for r in query_results ])
-        # Get all results that had that cost in case there are ties.
-        optimal_results = [ r for r in query_results if r.cost == min_cost ]
-
-        for optimal_result in optimal_results:
-            if optimal_result.method == BreadthFirstSearch.name:
-                bfs_optimal += 1
-            elif optimal_result.method == IterativeDeepeningSearch.name:
-                dls_optimal += 1
-            elif optimal_result.method == UniformCostSearch.name:
-                ucs_optimal += 1
+        list[SearchResult]: The result for every target of the task, in the same order as the targets.
+    """
+
+    start, targets, method = task
+
+    if worker_table is not None:
+        return [ worker_table.perform(start, target) for target in targets ]
+
+    if method == UniformCostSearch.name:
+        results = {}
+        uncached = []
+
+        for target in targets:
+            result = worker_cache.get((worker_map.version, method, start, target)) if worker_cache is not None else None
+
+            if result is not None:
+                results[target] = result
             else:
-                astar_optimal += 1
-    
-    return {
-        BreadthFirstSearch.name: bfs_optimal,
-        IterativeDeepeningSearch.name: dls_optimal,
-        UniformCostSearch.name: ucs_optimal,
-        AstarSearch.name: astar_optimal
-    }
+                uncached.append(target)
+
+        if uncached:
+            # One search from the start city answers every target that wasn't cached.
+            for target, result in UniformCostSearch(worker_map).perform_many(start, uncached).items():
+                results[target] = result
+
+                if worker_cache is not None:
+                    worker_cache.put((worker_map.version, method, start, target), result)
+
+        return [ results[target] for target in targets ]
+
+    return [ perform_search(method, start, target, worker_map, worker_cache) for target in targets ]
+
+def perform_batch(queries : Iterable[tuple[str, str, str]], map_file : str, compact : bool = False, workers : int = None, chunk_size : int = 64, table_file : str = None, cache_size : int = 0, cache_ttl : float = None, landmark_file : str = None, hierarchy_file : str = None, epsilon : float = None, deadline : float = None) -> Iterator[SearchResult]:
+    """
+    Performs every query of a batch, spread across a pool of worker processes that each load the
+    map once. Results are yielded in the same order as the queries as soon as they are ready.
+    Uniform-cost queries that share a start city are answered by a single one-to-many search.
+
+    Args:
+        queries (Iterable[tuple[str, str, str]]): The start, target, and search method of every query.
+        map_file (str): The name of the map file or snapshot every worker loads.
+        compact (bool): Whether workers load a map file into a compact CSR graph.
+        workers (int): The number of worker processes. Defaults to the number of CPUs, 1 performs every query in this process.
+        chunk_size (int): The number of tasks sent to a worker at a time.
+        table_file (str): The name of a saved distance table to answer every query from instead of searching.
+        cache_size (int): The number of results each worker caches for repeated queries, 0 disables caching.
+        cache_ttl (float): The number of seconds cached results stay valid for, or None for no limit.
+        landmark_file (str): The name of saved landmarks for the ALT search to use instead of selecting them in every worker.
+        hierarchy_file (str): The name of a saved contraction hierarchy for the ch search to use instead of building it in every worker.
+        epsilon (float): The inflation factor of weighted and anytime A* searches, see configure_bounded_searches.
+        deadline (float): The number of seconds anytime A* searches keep improving their path for.
+
+    Returns:
+        Iterator[SearchResult]: The result of every query.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    tasks, task_indices = group_batch_queries(queries)
 
-def print_stats(results : list[SearchResult]) -> None:
+    if workers == 1:
+        init_batch_worker(map_file, compact, table_file, cache_size, cache_ttl, landmark_file, hierarchy_file, epsilon, deadline)
+        yield from reorder_batch_results((perform_batch_task(task) for task in tasks), task_indices)
+
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(map_file, compact, table_file, cache_size, cache_ttl, landmark_file, hierarchy_file, epsilon, deadline)) as executor:
+        yield from reorder_batch_results(executor.map(perform_batch_task, tasks, chunksize=chunk_size), task_indices)
+
+def perform_vectorized_batch(queries : list[tuple[str, str, str]], map : Map | CsrGraph) -> Iterator[SearchResult]:
     """
-    For each search method, prints the averages of the results, as well as the number
-    of times that method found the optimal result. If multiple methods found the optimal result,
-    then they both get counted as having found the optimal result.
+    Performs every breadth-first and uniform-cost query of a batch together with the NumPy batch
+    engine, and every other query one at a time, all in this process.
 
     Args:
-        results (list[SearchResult]): The list of results to print stats for.
+        queries (list[tuple[str, str, str]]): The start, target, and search method of every query.
+        map (Map | CsrGraph): The map to search.
+
+    Returns:
+        Iterator[SearchResult]: The result of every query, in query order.
     """
 
-    filtered_results = {
-        BreadthFirstSearch.name: [r for r in results if r.method == BreadthFirstSearch.name],
-        IterativeDeepeningSearch.name: [r for r in results if r.method == IterativeDeepeningSearch.name],
-        UniformCostSearch.name: [r for r in results if r.method == UniformCostSearch.name],
-        AstarSearch.name: [r for r in results if r.method == AstarSearch.name]
-    }
+    # Only imported here, since the batch engine needs NumPy and every other mode runs without it.
+    from batch_engine import BatchEngine
+
+    engine = BatchEngine.for_map(map)
+    results = [ None ] * len(queries)
 
-    optimal_results = compute_optimals(results)
+    for method in (BreadthFirstSearch.name, UniformCostSearch.name):
+        indices = [ i for i, query in enumerate(queries) if query[2] == method ]
 
-    for method in filtered_results:
-        method_results = filtered_results[method]
-        optimal_count = optimal_results[method]
-        average_explored, average_expanded, average_maintained = compute_averages(method_results)
+        for i, result in zip(indices, engine.perform([ queries[i][:2] for i in indices ], method)):
+            results[i] = result
 
-        print(f"Method: {method}")
-        print(f"Average Explored: {average_explored:.1f}")
-        print(f"Average Expanded: {average_expanded:.1f}")
-        print(f"Average Maintained: {average_maintained:.1f}")
-        print(f"Optimal Solutions: {optimal_count}")
-        print()
+    for result, (start, target, method) in zip(results, queries):
+        yield result if result is not None else perform_search(method, start, target, map)
 
-def save_results(file_name : str, results : list[SearchResult]) -> None:
+def reorder_batch_results(task_results : Iterator[list[SearchResult]], task_indices : list[int]) -> Iterator[SearchResult]:
     """
-    Saves the given results to the given file name.
+    Turns the results of batch tasks, which arrive in task order, back into results in query order.
 
     Args:
-        file_name (str): The name of the file to save the results in.
-        results (list[SearchResult]): The list of search results to save.
+        task_results (Iterator[list[SearchResult]]): The results of every task, in task order.
+        task_indices (list[int]): The index of the task that answers each query.
+
+    Returns:
+        Iterator[SearchResult]: The result of every query, in query order.
     """
 
-    with open(file_name, "w") as file:
-        for i, result in enumerate(results):
-            print(result, file=file)
-            if i < len(results) - 1:
-                print(file=file)
-            
+    received = []
+    positions = []
+
+    for task_index in task_indices:
+        # Tasks are ordered by the first query they answer, so the task is at most the next one to arrive.
+        while len(received) <= task_index:
+            received.append(next(task_results))
+            positions.append(0)
+
+        results = received[task_index]
+        yield results[positions[task_index]]
+
+        positions[task_index] += 1
+        if positions[task_index] == len(results):
+            # Let go of results that have all been handed out.
+            received[task_index] = None
+
+@contextmanager
+def instrumented(file_name : str) -> Iterator[Instrumentation]:
+    """
+    Instruments every search performed inside the context and saves what was collected as JSON when it exits.
+    Searches performed by batch worker processes aren't instrumented, use a single worker to include them.
+
+    Args:
+        file_name (str): The name of the file to save the instrumentation to.
+
+    Returns:
+        Iterator[Instrumentation]: The instrumentation collecting from the searches.
+    """
+
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.disable()
+
+        with open(file_name, "w") as file:
+            json.dump(instrumentation.to_dict(), file, indent=2)
+
+@contextmanager
+def profiled(file_name : str) -> Iterator[cProfile.Profile]:
+    """
+    Profiles everything run inside the context with cProfile and saves the stats when it exits. The
+    stats can be read with the pstats module or tools like snakeviz.
+
+    Args:
+        file_name (str): The name of the file to save the profile stats to.
+
+    Returns:
+        Iterator[cProfile.Profile]: The profiler.
+    """
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(file_name)
+
+def snap_to_city(map : Map | CsrGraph, coordinates : list[float]) -> str:
+    """
+    Finds the city nearest to a latitude and longitude, so searches can start or end at any point.
+
+    Args:
+        map (Map | CsrGraph): The map to find the city in.
+        coordinates (list[float]): The latitude and longitude of the point in degrees.
+
+    Returns:
+        str: The name of the nearest city.
+    """
+
+    city_id, distance = SpatialIndex.for_map(map).nearest(*coordinates)[0]
+    name = map.get_city_by_id(city_id).name
+
+    print(f"Snapped ({coordinates[0]}, {coordinates[1]}) to '{name}', {distance:.3f} km away.", file=sys.stderr)
+
+    return name
+
 def main(args):
-    map = Map.from_file(args.map_file)
+    configure_bounded_searches(args.epsilon, args.deadline)
+
+    if args.batch:
+        if args.vectorized or args.table or args.landmarks or args.hierarchy:
+            # Make sure the table, landmarks, and hierarchy have been built and saved before the workers load them.
+            map = load_map(args.map_file, args.compact)
+
+            if args.table:
+                load_distance_table(args.table, map, args.table_algorithm)
+            if args.landmarks:
+                load_landmarks(args.landmarks, map, args.landmark_count)
+            if args.hierarchy:
+                load_hierarchy(args.hierarchy, map)
+
+        with open(args.batch, "r") if args.batch != "-" else nullcontext(sys.stdin) as query_file:
+            queries = read_queries(query_file, args.search)
+
+        if args.vectorized:
+            results = perform_vectorized_batch(queries, map)
+        else:
+            results = perform_batch(queries, args.map_file, args.compact, args.workers, table_file=args.table, cache_size=args.cache_size, cache_ttl=args.cache_ttl, landmark_file=args.landmarks, hierarchy_file=args.hierarchy, epsilon=args.epsilon, deadline=args.deadline)
+
+        stats = ResultStats() if args.stats else None
+
+        with open(args.output, "w") if args.output else nullcontext(sys.stdout) as output_file, ResultSink(output_file, args.format) as sink:
+            for result in results:
+                sink.add(result)
+
+                if stats is not None:
+                    stats.add(result)
+
+        if stats is not None:
+            stats.write(sys.stderr)
+
+        if worker_cache is not None:
+            # Only available when the batch ran in this process.
+            print(f"Result cache: {worker_cache.stats()}", file=sys.stderr)
+
+        return
+
+    map = load_map(args.map_file, args.compact or args.compile is not None)
+
+    if args.compile:
+        write_snapshot(map, args.compile)
+        print(f"Saved a snapshot of {len(map)} cities to '{args.compile}'.")
+
+        return
+
+    table = load_distance_table(args.table, map, args.table_algorithm) if args.table else None
+
+    if args.landmarks:
+        load_landmarks(args.landmarks, map, args.landmark_count)
+    if args.hierarchy:
+        load_hierarchy(args.hierarchy, map)
+
+    if args.start_at:
+        args.start = snap_to_city(map, args.start_at)
+    if args.target_at:
+        args.target = snap_to_city(map, args.target_at)
 
     if args.start and args.target:
-        result = perform_search(args.search, args.start, args.target, map)
+        if table is not None:
+            result = table.perform(args.start, args.target)
+        else:
+            result = perform_search(args.search, args.start, args.target, map)
+
         print(result)
-    else:
-        results = perform_all_searches(map)
-        print_stats(results)
-        save_results("solutions.txt", results)
+    elif table is None:
+        stats = ResultStats(search_methods)
+
+        with open("solutions.txt", "w") as file, ResultSink(file) as sink:
+            for result in perform_all_searches(map):
+                sink.add(result)
+                stats.add(result)
+
+        stats.write(sys.stdout)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("map_file", help="The name of the file containing the map to run searches on.")
-    parser.add_argument("-S", "--search", type=str.lower, default="bfs", choices=["bfs",  "dls", "ucs", "astar"], help="The search method to perform on the map.")
+    parser.add_argument("-S", "--search", type=str.lower, default="bfs", choices=list(search_methods), help="The search method to perform on the map.")
+    parser.add_argument("--epsilon", type=float, help="How much wastar and arastar inflate their estimates, so paths cost at most 1 + epsilon times the lowest cost. Defaults to 0.5 for wastar and 2 for the first path of arastar.")
+    parser.add_argument("--deadline", type=float, help="The number of seconds arastar keeps improving its path for. Defaults to 0.1.")
     parser.add_argument("-A", "--start", type=str.lower, help="The start of the search.")
     parser.add_argument("-B", "--target", type=str.lower, help="The target of the search.")
+    parser.add_argument("--start-at", nargs=2, type=float, metavar=("LATITUDE", "LONGITUDE"), help="Start the search at the city nearest to the given coordinates in degrees instead.")
+    parser.add_argument("--target-at", nargs=2, type=float, metavar=("LATITUDE", "LONGITUDE"), help="End the search at the city nearest to the given coordinates in degrees instead.")
+    parser.add_argument("-C", "--compact", action="store_true", help="Run the searches on a compact CSR copy of the map.")
+    parser.add_argument("--compile", metavar="SNAPSHOT", help="Compile the map into a binary snapshot with the given name instead of searching.")
+    parser.add_argument("--batch", metavar="QUERY_FILE", help="Perform every query in the given file, or - for stdin. Each line is '<start> <target> [<method>]'.")
+    parser.add_argument("-j", "--workers", type=int, help="The number of worker processes for batch queries. Defaults to the number of CPUs.")
+    parser.add_argument("--vectorized", action="store_true", help="Perform the bfs and ucs batch queries together with the NumPy batch engine, in a single process.")
+    parser.add_argument("-o", "--output", help="The file to write batch results to. Defaults to stdout.")
+    parser.add_argument("--format", type=str.lower, default="text", choices=FORMATS, help="The format to write batch results in.")
+    parser.add_argument("--stats", action="store_true", help="Print the averages and optimal counts of every search method in a batch to stderr.")
+    parser.add_argument("--cache-size", type=int, default=0, help="The number of batch results each worker caches for repeated queries. 0 disables the cache.")
+    parser.add_argument("--cache-ttl", type=float, help="The number of seconds cached results stay valid for. Defaults to no limit.")
+    parser.add_argument("-T", "--table", metavar="TABLE_FILE", help="Answer queries from a precomputed all-pairs distance table saved in the given file. The table is built and saved first if the file doesn't exist.")
+    parser.add_argument("--table-algorithm", type=str.lower, default="dijkstra", choices=["dijkstra", "floyd-warshall"], help="The algorithm used to build a distance table. floyd-warshall requires NumPy.")
+    parser.add_argument("--landmarks", metavar="LANDMARK_FILE", help="Use the landmarks saved in the given file for the alt search. The landmarks are selected and saved first if the file doesn't exist.")
+    parser.add_argument("--landmark-count", type=int, default=DEFAULT_COUNT, help="The number of landmarks to select when the landmark file doesn't exist yet.")
+    parser.add_argument("--instrument", metavar="JSON_FILE", help="Time every phase of every search and save the timings, expansion counts, and peak frontier sizes as JSON.")
+    parser.add_argument("--profile", metavar="PROFILE_FILE", help="Profile the whole run with cProfile and save the stats to the given file.")
+    parser.add_argument("--hierarchy", metavar="HIERARCHY_FILE", help="Use the contraction hierarchy saved in the given file for the ch search. The hierarchy is built and saved first if the file doesn't exist.")
 
     args = parser.parse_args()
 
-    if args.start and not args.target or args.target and not args.start:
+    if args.start and args.start_at or args.target and args.target_at:
+        parser.error("A start or target can't be given both as a city and as coordinates.")
+    if bool(args.start or args.start_at) != bool(args.target or args.target_at):
         parser.error("Start and target must be specified together.")
-
-    main(args)
+    for coordinates in (args.start_at, args.target_at):
+        if coordinates and not (-90 <= coordinates[0] <= 90 and -180 <= coordinates[1] <= 180):
+            parser.error(f"({coordinates[0]}, {coordinates[1]}) is not a valid latitude and longitude.")
+    if args.epsilon is not None and args.epsilon < 0:
+        parser.error("Epsilon can't be negative.")
+    if args.vectorized and args.table:
+        parser.error("Vectorized batches can't be answered from a distance table.")
+
+    with instrumented(args.instrument) if args.instrument else nullcontext(), profiled(args.profile) if args.profile else nullcontext():
+        main(args)
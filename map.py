@@ -1,9 +1,23 @@
-import re
+import itertools
 from action import Action
 from city import City
 from coordinate import Coordinate
 from pathlib import Path
-from typing import Self
+from typing import Iterator, Self
+
+class MapFormatError(ValueError):
+    """
+    Raised when a line of a map file cannot be parsed.
+    """
+
+    def __init__(self, file_name : str, line_number : int, message : str) -> None:
+        super().__init__(f"Error: {file_name}, line {line_number}: {message}")
+        self.file_name = file_name
+        self.line_number = line_number
+
+# Source of map versions. Versions are unique across all maps, so a version identifies both a map and
+# the state it was in. Anything derived from a map, like cached results, can be keyed by its version.
+versions = itertools.count()
 
 class Map:
     """
@@ -12,72 +26,166 @@ class Map:
 
     def __init__(self, cities : list[City]) -> None:
         self.cities = cities
+        self.city_ids = {}
+        self.version = next(versions)
+
+        # Give every city a dense integer ID matching its index in the list of cities, and
+        # index the cities by name so lookups don't have to scan the whole list.
+        for city_id, city in enumerate(cities):
+            city.id = city_id
+            self.city_ids.setdefault(city.name, city_id)
+
+        # Resolve every action's destination once so searches can follow edges by ID.
+        self.neighbors = [ self.__resolve_actions__(city) for city in cities ]
+        # Built the first time a search follows actions backwards, see get_reverse_neighbors.
+        self.reverse_neighbors = None
+        # The source and destination IDs of every action whose cost has changed or that was closed or
+        # reopened, in the order they changed.
+        self.edge_changes = []
+        # The source and destination IDs of the closed roads, whose actions are left out of the neighbors.
+        self.closed_roads = set()
+
+    def __resolve_actions__(self, city : City) -> list[tuple[int, int]]:
+        """
+        Resolves the actions of a city into the IDs and costs of the cities they lead to.
+
+        Args:
+            city (City): The city to resolve the actions of.
+
+        Returns:
+            list[tuple[int, int]]: The ID and cost of every destination that can be reached from the city.
+        """
+
+        neighbors = []
+
+        for action in city.actions:
+            destination_id = self.city_ids.get(action.destination)
+
+            if destination_id is None:
+                raise ValueError(f"Error: The city '{city.name}' has an action to unknown city '{action.destination}'.")
+
+            neighbors.append((destination_id, action.cost))
+
+        return neighbors
+
+    def __len__(self) -> int:
+        return len(self.cities)
     
     @staticmethod
-    def __parse_actions__(action_line : str) -> list[Action]:
+    def __parse_actions__(action_part : str) -> list[tuple[str, int]]:
         """
-        Parses the actions portion of a map file line into a collection of actions.
+        Parses the actions portion of a map file line into destination and cost pairs.
 
         Args:
-            action_line (str): The string containing the actions that can be taken from a city.
+            action_part (str): The string containing the actions that can be taken from a city.
 
         Returns:
-            list[Action]: The collection of initialized action objects.
+            list[tuple[str, int]]: The name of every destination paired with the cost of moving to it.
         """
 
-        parts = action_line.split()
-        
-        # Pair up every destination with its cost, then create an Action object from
-        # those pairs and add it to the list.
+        parts = action_part.split()
+
+        if len(parts) % 2 != 0:
+            raise ValueError(f"expected destination and cost pairs but found {len(parts)} action fields")
+
+        # Pair up every destination with its cost.
         actions = []
-        for action in zip(parts[::2], parts[1::2]):
-            destination = re.sub("va-", "", action[0])
-            cost = int(action[1])
+        for destination, cost in zip(parts[::2], parts[1::2]):
+            if not cost.isdigit():
+                raise ValueError(f"the cost '{cost}' of the action to '{destination}' is not a whole number")
 
-            actions.append(Action(destination.lower(), cost))
+            actions.append((destination.removeprefix("va-").lower(), int(cost)))
 
         return actions
 
     @staticmethod
-    def __parse_city__(city_line : str) -> City:
+    def __parse_city__(city_part : str) -> tuple[str, float, float]:
         """
-        Parses the city portion of a map file line into a city object.
+        Parses the city portion of a map file line into its name, latitude, and longitude.
 
         Args:
-            city_line (str): The string containing the city name, latitude, and longitude.
+            city_part (str): The string containing the city name, latitude, and longitude.
 
         Returns:
-            City: An initialized city object containing its information.
+            tuple[str, float, float]: The name of the city and its latitude and longitude in degrees.
         """
 
+        fields = city_part.split()
+
+        if len(fields) != 9:
+            raise ValueError(f"expected a city name, latitude, and longitude (9 fields) but found {len(fields)} fields")
+
         # Create variables from the different parts of the string using list unpacking.
-        city_name, lat_degrees, lat_minutes, lat_seconds, lat_heading, long_degrees, long_minutes, long_seconds, long_heading = city_line.split()
+        city_name, lat_degrees, lat_minutes, lat_seconds, lat_heading, long_degrees, long_minutes, long_seconds, long_heading = fields
 
-        latitude = Coordinate.from_dms(lat_degrees, lat_minutes, lat_seconds, lat_heading)
-        longitude = Coordinate.from_dms(long_degrees, long_minutes, long_seconds, long_heading)
+        if lat_heading.lower() not in ("n", "s"):
+            raise ValueError(f"the latitude hemisphere '{lat_heading}' is not N or S")
+        if long_heading.lower() not in ("e", "w"):
+            raise ValueError(f"the longitude hemisphere '{long_heading}' is not E or W")
 
-        return City(city_name.lower(), latitude, longitude)
+        latitude = Coordinate.dms_to_decimal(lat_degrees, lat_minutes, lat_seconds, lat_heading)
+        longitude = Coordinate.dms_to_decimal(long_degrees, long_minutes, long_seconds, long_heading)
+
+        return (city_name.lower(), latitude, longitude)
 
     @staticmethod
-    def __parse_map_line__(line : str) -> City:
+    def read_records(file_name : str) -> Iterator[tuple[int, str, float, float, list[tuple[str, int]]]]:
         """
-        Parses a specific map file line into a city and its actions.
+        Streams the given map file one line at a time and parses every line into a record. Only the
+        current line is held in memory, so arbitrarily large map files can be read. Blank lines are skipped.
 
         Args:
-            line (str): A single line from the map file.
+            file_name (str): The name of the file to read the map from.
 
         Returns:
-            City: A complete city object with its associated actions.
+            Iterator: A record for every city of the form (line number, name, latitude, longitude, actions),
+            where actions is a list of destination name and cost pairs.
+
+        Raises:
+            FileNotFoundError: If the map file does not exist.
+            MapFormatError: If a line is malformed, a city is defined more than once, or an action leads to a city that is never defined.
         """
 
-        city_part, action_part = line.strip().split(" --> ")
+        map_file_path = Path(file_name)
+        if not map_file_path.is_file():
+            raise FileNotFoundError(f"Error: The map file '{file_name}' does not exist.")
 
-        city = Map.__parse_city__(city_part)
-        actions = Map.__parse_actions__(action_part)
+        defined = set()
+        # The line each destination that hasn't been defined yet was first referenced on.
+        undefined = {}
 
-        city.add_actions(actions)
-        
-        return city
+        with open(map_file_path, "r") as file:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+
+                city_part, separator, action_part = line.partition("-->")
+
+                try:
+                    if not separator:
+                        raise ValueError("expected a city and its actions separated by '-->'")
+
+                    name, latitude, longitude = Map.__parse_city__(city_part)
+                    actions = Map.__parse_actions__(action_part)
+                except ValueError as error:
+                    raise MapFormatError(file_name, line_number, str(error)) from None
+
+                if name in defined:
+                    raise MapFormatError(file_name, line_number, f"the city '{name}' is defined more than once")
+
+                defined.add(name)
+                undefined.pop(name, None)
+
+                for destination, _ in actions:
+                    if destination not in defined:
+                        undefined.setdefault(destination, line_number)
+
+                yield (line_number, name, latitude, longitude, actions)
+
+        if undefined:
+            destination, line_number = min(undefined.items(), key=lambda item: item[1])
+
+            raise MapFormatError(file_name, line_number, f"the action to '{destination}' leads to a city that is never defined")
 
     @classmethod
     def from_file(cls, file_name : str) -> Self:
@@ -89,18 +197,19 @@ class Map:
 
         Returns:
             list: A list of cities that represents the map.
+
+        Raises:
+            FileNotFoundError: If the map file does not exist.
+            MapFormatError: If the map file is malformed.
         """
 
         cities = []
 
-        map_file_path = Path(file_name)
-        if not map_file_path.is_file:
-            raise(f"Error: The map file '{file_name}' does not exist.")
+        for _, name, latitude, longitude, actions in Map.read_records(file_name):
+            city = City(name, latitude, longitude)
+            city.add_actions([ Action(destination, cost) for destination, cost in actions ])
 
-        with open(map_file_path, "r") as file:
-            for line in file.readlines():
-                city = Map.__parse_map_line__(line)
-                cities.append(city)
+            cities.append(city)
 
         return cls(cities)
     
@@ -114,8 +223,200 @@ class Map:
         Returns:
             City: The city if it is found, otherwise None.
         """
-        for city in self.cities:
-            if city.name == name:
-                return city
-        
-        return None
+
+        city_id = self.city_ids.get(name)
+
+        return None if city_id is None else self.cities[city_id]
+
+    def get_city_id(self, name : str) -> int:
+        """
+        Finds the ID of the given city in the map.
+
+        Args:
+            name (str): The name of the city to search for.
+
+        Returns:
+            int: The ID of the city if it is found, otherwise None.
+        """
+
+        return self.city_ids.get(name)
+
+    def get_city_by_id(self, city_id : int) -> City:
+        """
+        Gets the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            City: The city with the given ID.
+        """
+
+        return self.cities[city_id]
+
+    def get_coordinates(self, city_id : int) -> tuple[float, float]:
+        """
+        Gets the latitude and longitude of the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            tuple[float, float]: The latitude and longitude of the city in degrees.
+        """
+
+        city = self.cities[city_id]
+
+        return (city.latitude, city.longitude)
+
+    def get_radians(self, city_id : int) -> tuple[float, float]:
+        """
+        Gets the latitude and longitude of the city with the given ID in radians.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            tuple[float, float]: The latitude and longitude of the city in radians.
+        """
+
+        city = self.cities[city_id]
+
+        return (city.latitude_radians, city.longitude_radians)
+
+    def get_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        """
+        Gets the cities that can be reached from the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city to get the neighbors of.
+
+        Returns:
+            list[tuple[int, int]]: The ID of every neighboring city paired with the cost of moving to it.
+        """
+
+        return self.neighbors[city_id]
+
+    def get_reverse_neighbors(self, city_id : int) -> list[tuple[int, int]]:
+        """
+        Gets the cities that have an action leading to the city with the given ID. Actions aren't
+        guaranteed to go both ways, so the reverse actions are built from the map the first time they are needed.
+
+        Args:
+            city_id (int): The ID of the city to get the reverse neighbors of.
+
+        Returns:
+            list[tuple[int, int]]: The ID of every city with an action to the given city paired with the cost of that action.
+        """
+
+        if self.reverse_neighbors is None:
+            self.reverse_neighbors = [ [] for _ in self.cities ]
+
+            for source_id, neighbors in enumerate(self.neighbors):
+                for neighbor, cost in neighbors:
+                    self.reverse_neighbors[neighbor].append((source_id, cost))
+
+        return self.reverse_neighbors[city_id]
+
+    def update_edge_cost(self, source : str, destination : str, cost : int) -> None:
+        """
+        Changes the cost of the actions from one city to another, for example when a road is congested.
+        Every action between the two cities gets the new cost. The map gets a new version, so anything
+        derived from the old costs, like cached results, landmarks, or contraction hierarchies, is
+        rebuilt or ignored, and the change is added to edge_changes for incremental searches to repair.
+        Roads are closed with close_road rather than with an infinite cost, so costs stay integers.
+
+        Args:
+            source (str): The name of the city the actions start at.
+            destination (str): The name of the city the actions lead to.
+            cost (int): The new cost of the actions.
+
+        Raises:
+            ValueError: If either city is not in the map, there is no action between them, or the cost is not a non-negative integer.
+        """
+
+        if not isinstance(cost, int) or isinstance(cost, bool) or cost < 0:
+            raise ValueError(f"Error: The cost of an action must be a non-negative integer, but {cost!r} was given.")
+
+        source_id, destination_id = self.__find_road__(source, destination)
+
+        for action in self.cities[source_id].actions:
+            if action.destination == destination:
+                action.cost = cost
+
+        self.__change_road__(source_id, destination_id)
+
+    def close_road(self, source : str, destination : str) -> None:
+        """
+        Closes the actions from one city to another, so searches can't take them until the road is
+        reopened with reopen_road. The actions keep their cost, and the map changes like it does in
+        update_edge_cost.
+
+        Args:
+            source (str): The name of the city the actions start at.
+            destination (str): The name of the city the actions lead to.
+
+        Raises:
+            ValueError: If either city is not in the map, or there is no action between them.
+        """
+
+        source_id, destination_id = self.__find_road__(source, destination)
+
+        if (source_id, destination_id) not in self.closed_roads:
+            self.closed_roads.add((source_id, destination_id))
+            self.__change_road__(source_id, destination_id)
+
+    def reopen_road(self, source : str, destination : str) -> None:
+        """
+        Reopens the actions from one city to another closed with close_road, with the cost they had when
+        they were closed or were given since. The map changes like it does in update_edge_cost.
+
+        Args:
+            source (str): The name of the city the actions start at.
+            destination (str): The name of the city the actions lead to.
+
+        Raises:
+            ValueError: If either city is not in the map, or there is no action between them.
+        """
+
+        source_id, destination_id = self.__find_road__(source, destination)
+
+        if (source_id, destination_id) in self.closed_roads:
+            self.closed_roads.remove((source_id, destination_id))
+            self.__change_road__(source_id, destination_id)
+
+    def __find_road__(self, source : str, destination : str) -> tuple[int, int]:
+        """
+        Finds the IDs of two cities with at least one action from the first to the second.
+
+        Raises:
+            ValueError: If either city is not in the map, or there is no action between them.
+        """
+
+        source_id = self.city_ids.get(source)
+        destination_id = self.city_ids.get(destination)
+
+        if source_id is None or destination_id is None:
+            raise ValueError(f"Error: The map has no city named '{source if source_id is None else destination}'.")
+        if not any(action.destination == destination for action in self.cities[source_id].actions):
+            raise ValueError(f"Error: The city '{source}' has no action to '{destination}'.")
+
+        return (source_id, destination_id)
+
+    def __change_road__(self, source_id : int, destination_id : int) -> None:
+        """
+        Resolves the actions from one city to another again after they changed, leaving them out if the
+        road is closed, and gives the map a new version.
+        """
+
+        self.neighbors[source_id] = [ (neighbor, cost) for neighbor, cost in self.__resolve_actions__(self.cities[source_id]) if (source_id, neighbor) not in self.closed_roads ]
+
+        if self.reverse_neighbors is not None:
+            # Reverse neighbors are ordered by the ID of the city the actions start at, see get_reverse_neighbors.
+            reverse_neighbors = [ (neighbor, cost) for neighbor, cost in self.reverse_neighbors[destination_id] if neighbor != source_id ]
+            position = next((i for i, (neighbor, _) in enumerate(reverse_neighbors) if neighbor > source_id), len(reverse_neighbors))
+            reverse_neighbors[position:position] = [ (source_id, cost) for neighbor, cost in self.neighbors[source_id] if neighbor == destination_id ]
+            self.reverse_neighbors[destination_id] = reverse_neighbors
+
+        self.edge_changes.append((source_id, destination_id))
+        self.version = next(versions)
@@ -0,0 +1,88 @@
+import weakref
+from typing import Any, Callable
+
+def underlying_map(map : Any) -> Any:
+    """
+    Gets the map a wrapper of a map, like an InstrumentedMap, wraps. Wrappers keep the map they wrap in
+    their underlying_map attribute, and maps themselves are returned as they are.
+
+    Args:
+        map (Any): A map, or a wrapper of one.
+
+    Returns:
+        Map | CsrGraph: The map itself.
+    """
+
+    return getattr(map, "underlying_map", map)
+
+class MapCache:
+    """
+    Represents a structure derived from maps, like a haversine table or a contraction hierarchy, kept
+    for every map it has been built for until the map is garbage collected.
+
+    Structures are kept for the underlying map even when they are requested through a wrapper of it, so
+    every wrapper of a map shares them, and they are built from the underlying map so building them is
+    never reported to the wrapper. A structure is built again once its map gets a new version, unless it
+    only depends on what never changes, like the coordinates of the cities.
+    """
+
+    def __init__(self, follows_changes : bool = True) -> None:
+        """
+        Args:
+            follows_changes (bool): Whether structures are built again when the actions of their map change.
+        """
+
+        self.follows_changes = follows_changes
+        # The map version every structure was kept for, and the structure, keyed by map.
+        self.entries = weakref.WeakKeyDictionary()
+
+    def get(self, map : Any) -> Any:
+        """
+        Gets the structure kept for the given map.
+
+        Args:
+            map (Any): The map, or a wrapper of it.
+
+        Returns:
+            Any: The structure, or None if there is none or the map changed since it was kept.
+        """
+
+        map = underlying_map(map)
+        version, structure = self.entries.get(map, (None, None))
+
+        if self.follows_changes and version != map.version:
+            return None
+
+        return structure
+
+    def get_or_build(self, map : Any, build : Callable[[Any], Any]) -> Any:
+        """
+        Gets the structure kept for the given map, building and keeping it first if there is none.
+
+        Args:
+            map (Any): The map, or a wrapper of it.
+            build (Callable[[Any], Any]): Builds the structure from the underlying map.
+
+        Returns:
+            Any: The structure.
+        """
+
+        structure = self.get(map)
+
+        if structure is None:
+            structure = build(underlying_map(map))
+            self.put(map, structure)
+
+        return structure
+
+    def put(self, map : Any, structure : Any) -> None:
+        """
+        Keeps the given structure for the given map, in place of the one kept before.
+
+        Args:
+            map (Any): The map, or a wrapper of it.
+            structure (Any): The structure.
+        """
+
+        map = underlying_map(map)
+        self.entries[map] = (map.version, structure)
@@ -0,0 +1,95 @@
+import heapq
+from typing import Any
+
+class PriorityQueue:
+    """
+    Represents a frontier of items ordered by priority, backed by a binary heap.
+
+    Priorities can be lowered for items already in the queue. Outdated heap entries are left
+    in place and skipped when popped (lazy deletion). Items with equal priorities are popped
+    in the order they were first added to the queue.
+    """
+
+    def __init__(self) -> None:
+        self.heap = []
+        self.entries = {}
+        self.counter = 0
+
+    def push(self, item : Any, priority : float) -> None:
+        """
+        Adds an item to the queue, or updates its priority if it is already in the queue.
+
+        Args:
+            item (Any): The item to add. Must be hashable.
+            priority (float): The priority of the item. Lower priorities are popped first.
+        """
+
+        entry = self.entries.get(item)
+
+        if entry is None:
+            # New items get the next insertion number so ties are broken first-in, first-out.
+            order = self.counter
+            self.counter += 1
+        else:
+            # Updated items keep their original insertion number, the old heap entry becomes stale.
+            order = entry[1]
+
+        self.entries[item] = (priority, order)
+        heapq.heappush(self.heap, (priority, order, item))
+
+    def pop(self) -> Any:
+        """
+        Removes and returns the item with the lowest priority.
+
+        Returns:
+            Any: The item with the lowest priority.
+        """
+
+        while self.heap:
+            priority, order, item = heapq.heappop(self.heap)
+
+            # Skip entries that were superseded by a priority update or already popped.
+            if self.entries.get(item) == (priority, order):
+                del self.entries[item]
+
+                return item
+
+        raise IndexError("pop from an empty priority queue")
+
+    def peek(self) -> tuple[Any, float]:
+        """
+        Gets the item with the lowest priority without removing it.
+
+        Returns:
+            tuple[Any, float]: The item with the lowest priority and its priority.
+        """
+
+        # Drop stale entries from the top of the heap until a live one is found.
+        while self.heap:
+            priority, order, item = self.heap[0]
+
+            if self.entries.get(item) == (priority, order):
+                return (item, priority)
+
+            heapq.heappop(self.heap)
+
+        raise IndexError("peek at an empty priority queue")
+
+    def remove(self, item : Any) -> None:
+        """
+        Removes an item from the queue if it is in it. Its heap entry becomes stale.
+
+        Args:
+            item (Any): The item to remove.
+        """
+
+        self.entries.pop(item, None)
+
+    def __contains__(self, item : Any) -> bool:
+        return item in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from search_result import SearchResult
+
+class ResultCache:
+    """
+    Represents a bounded cache of search results with least recently used eviction.
+
+    Results are keyed by (map version, method, start, target). Every map gets a new version whenever
+    it changes, so results for an outdated map are never returned and are evicted as the cache fills
+    up. Cached results are shared between callers and shouldn't be modified.
+    """
+
+    def __init__(self, max_size : int = 1024, ttl : float = None) -> None:
+        """
+        Args:
+            max_size (int): The maximum number of results kept in the cache.
+            ttl (float): The number of seconds a result stays valid for, or None to keep results until they are evicted.
+        """
+
+        if max_size < 1:
+            raise ValueError("Error: The cache size must be at least 1.")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        # Maps keys to (result, expiry time), ordered from least to most recently used.
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key : tuple) -> SearchResult:
+        """
+        Looks up a result in the cache and marks it as the most recently used.
+
+        Args:
+            key (tuple): The (map version, method, start, target) of the query.
+
+        Returns:
+            SearchResult: The cached result, or None if there is no valid result for the key.
+        """
+
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[0]
+
+    def put(self, key : tuple, result : SearchResult) -> None:
+        """
+        Adds a result to the cache, evicting the least recently used result if the cache is full.
+
+        Args:
+            key (tuple): The (map version, method, start, target) of the query.
+            result (SearchResult): The result of the query.
+        """
+
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        # Cached results shouldn't keep every city their search reached in memory.
+        result.compact()
+
+        self.entries[key] = (result, expires)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """
+        Removes every result from the cache. Counters are kept.
+        """
+
+        self.entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Gets the counters of the cache.
+
+        Returns:
+            dict[str, int]: The number of cached results, hits, misses, evictions, and expirations.
+        """
+
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
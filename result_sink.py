@@ -0,0 +1,220 @@
+import csv
+import json
+import math
+from search_result import SearchResult
+from typing import Iterable, Self, TextIO
+
+# The formats results can be written in.
+FORMATS = ("text", "jsonl", "csv")
+
+# The columns of results written as CSV.
+CSV_FIELDS = ("method", "start", "target", "success", "path", "cost", "explored", "expanded", "maintained", "bound")
+
+class ResultSink:
+    """
+    Represents a stream that results are written to one at a time as they arrive, in the same text
+    format as solutions.txt, as JSON lines, or as CSV.
+
+    Results are formatted into a buffer and written to the file in large chunks, so writing millions
+    of results doesn't call into the file once per result. Use it as a context manager, or call close,
+    to write whatever is left in the buffer.
+    """
+
+    def __init__(self, file : TextIO, format : str = "text", buffer_size : int = 1024) -> None:
+        """
+        Args:
+            file (TextIO): The file to write results to.
+            format (str): The format to write results in, one of FORMATS.
+            buffer_size (int): The number of results formatted before they are written to the file.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+
+        if format not in FORMATS:
+            raise ValueError(f"Error: Unknown result format '{format}'.")
+
+        self.file = file
+        self.format = format
+        self.buffer_size = max(1, buffer_size)
+        self.buffer = []
+        self.count = 0
+
+        if format == "csv":
+            # The CSV writer formats rows into the buffer, which is written to the file in chunks like the other formats.
+            self.writer = csv.writer(self, lineterminator="\n")
+            self.writer.writerow(CSV_FIELDS)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def write(self, text : str) -> None:
+        """
+        Adds formatted text to the buffer, for the CSV writer.
+        """
+
+        self.buffer.append(text)
+
+    def add(self, result : SearchResult) -> None:
+        """
+        Formats a result and writes it to the file once the buffer is full.
+
+        Args:
+            result (SearchResult): The result to write.
+        """
+
+        if self.format == "text":
+            # Results are separated by blank lines, without one after the last result.
+            self.buffer.append(f"\n{result}\n" if self.count > 0 else f"{result}\n")
+        elif self.format == "jsonl":
+            self.buffer.append(json.dumps(result.to_dict()) + "\n")
+        else:
+            names = result.get_path_names()
+            self.writer.writerow((result.method, result.start, result.target, result.success, " ".join(names) if names is not None else "", result.cost, result.explored, result.expanded, result.maintained, result.bound if result.bound is not None else ""))
+
+        self.count += 1
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def add_all(self, results : Iterable[SearchResult]) -> None:
+        """
+        Writes every result, in order.
+
+        Args:
+            results (Iterable[SearchResult]): The results to write.
+        """
+
+        for result in results:
+            self.add(result)
+
+    def flush(self) -> None:
+        """
+        Writes the buffered results to the file.
+        """
+
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer.clear()
+
+    def close(self) -> None:
+        """
+        Writes the buffered results and flushes the file. The file itself is left open.
+        """
+
+        self.flush()
+        self.file.flush()
+
+class ResultStats:
+    """
+    Represents running totals of results, for the averages of every search method and the number of
+    times each method found the lowest cost of a query, in a single pass over the results.
+
+    Only the totals of every method and the lowest cost of every query are kept, never the results
+    themselves, so results can be counted as they stream past. A failed search counts with its cost
+    of 0.
+    """
+
+    def __init__(self, methods : Iterable[str] = ()) -> None:
+        """
+        Args:
+            methods (Iterable[str]): The methods to report even if they have no results, in the order to report them.
+        """
+
+        # The number of results and the total explored, expanded, and maintained counts of every method.
+        self.totals = { method: [ 0, 0, 0, 0 ] for method in methods }
+        # The lowest cost of every (start, target) query and the number of results of every method with that cost.
+        self.lowest = {}
+
+    def add(self, result : SearchResult) -> None:
+        """
+        Counts a result.
+
+        Args:
+            result (SearchResult): The result to count.
+        """
+
+        totals = self.totals.setdefault(result.method, [ 0, 0, 0, 0 ])
+        totals[0] += 1
+        totals[1] += result.explored
+        totals[2] += result.expanded
+        totals[3] += result.maintained
+
+        query = (result.start, result.target)
+        lowest_cost, counts = self.lowest.get(query, (math.inf, None))
+
+        if result.cost < lowest_cost:
+            self.lowest[query] = (result.cost, { result.method: 1 })
+        elif result.cost == lowest_cost:
+            counts[result.method] = counts.get(result.method, 0) + 1
+
+    def add_all(self, results : Iterable[SearchResult]) -> None:
+        """
+        Counts every result.
+
+        Args:
+            results (Iterable[SearchResult]): The results to count.
+        """
+
+        for result in results:
+            self.add(result)
+
+    def get_averages(self, method : str) -> tuple[float, float, float]:
+        """
+        Gets the average explored, expanded, and maintained values of a search method.
+
+        Args:
+            method (str): The name of the search method.
+
+        Returns:
+            tuple[float, float, float]: The averages in that order, or zeros if the method has no results.
+        """
+
+        count, explored, expanded, maintained = self.totals.get(method, (0, 0, 0, 0))
+
+        if count == 0:
+            return (0.0, 0.0, 0.0)
+
+        return (explored / count, expanded / count, maintained / count)
+
+    def get_optimal_counts(self) -> dict[str, int]:
+        """
+        Gets the number of times each search method found the lowest cost of a query. If several
+        methods found it, they all get counted.
+
+        Returns:
+            dict[str, int]: The counts keyed by method name.
+        """
+
+        optimal_counts = { method: 0 for method in self.totals }
+
+        for _, counts in self.lowest.values():
+            for method, count in counts.items():
+                optimal_counts[method] += count
+
+        return optimal_counts
+
+    def write(self, file : TextIO) -> None:
+        """
+        Writes the averages and optimal counts of every search method.
+
+        Args:
+            file (TextIO): The file to write to.
+        """
+
+        optimal_counts = self.get_optimal_counts()
+        lines = []
+
+        for method in self.totals:
+            average_explored, average_expanded, average_maintained = self.get_averages(method)
+
+            lines.append(f"Method: {method}\n"
+                + f"Average Explored: {average_explored:.1f}\n"
+                + f"Average Expanded: {average_expanded:.1f}\n"
+                + f"Average Maintained: {average_maintained:.1f}\n"
+                + f"Optimal Solutions: {optimal_counts[method]}\n\n")
+
+        file.write("".join(lines))
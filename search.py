@@ -1,53 +1,95 @@
 from city import City
+from collections import deque
 from map import Map
+from priority_queue import PriorityQueue
+from typing import Callable
 
 class Search:
     """
     Represents a search that can be performed on a map of cities.
     """
 
+    # The instrumentation new searches report to, or None to leave them uninstrumented (see instrumentation.py).
+    instrumentation = None
+    # Creates the frontiers of searches that order cities by priority.
+    frontier_type = PriorityQueue
+    # Creates the frontiers of searches that take cities first in, first out.
+    queue_type = deque
+    # Creates the frontiers kept as plain lists, like the stacks of depth-first searches and the layers of
+    # bidirectional breadth-first search.
+    list_type = list
+
     def __init__(self, map : Map) -> None:
         self.map = map
 
-    def __build_path__(self, current : City, parents : dict[City, City]) -> list[City]:
+        if Search.instrumentation is not None:
+            Search.instrumentation.attach(self)
+
+    def __build_path__(self, current : int, parents : dict[int, int]) -> list[City]:
         """
         Builds a path from the start of the search to the specified current city.
 
         Args:
-            current (City): The current city to build a path to.
-            parents (dict[City, City]): The dictionary containing the parents for every city in the search.
+            current (int): The ID of the current city to build a path to.
+            parents (dict[int, int]): The dictionary containing the parent ID for every city ID in the search.
 
         Returns:
             list: The list of cities in the path from the start to the end of the search.
         """
 
-        path = [ current ]
+        path = [ self.map.get_city_by_id(current) ]
 
         # Follow the chain of parents until no other parent is found.
-        while current in parents and (current := parents[current]):
-            # Insert to the front of the list so the last one inserted is the start of the path.
-            path.insert(0, current)
+        while (current := parents[current]) is not None:
+            path.append(self.map.get_city_by_id(current))
+
+        # The chain runs from the end of the path back to the start.
+        path.reverse()
 
         return path
-    
-    def __pop_next_lowest_cost__(self, frontier : list[City], costs : dict[City, int]) -> City:
-        """
-        Pops the next lowest path cost city from the frontier.
 
-        Args:
-            frontier (list[City]): The current frontier to pop a city from.
-            costs (dict[City, int]): A dictionary containing the total path cost to a given city.
+def follow_lowest_costs(map : Map, start_id : int, target_id : int, get_cost : Callable[[int], float]) -> list[int]:
+    """
+    Builds a lowest cost path from the start to the target out of the lowest path cost of every city, for
+    searches that keep costs instead of parents. From the target back, every step takes an action whose
+    source costs as much as the city it leads to minus the cost of the action, preferring the cheapest
+    source. Actions that cost nothing can lead around in circles between cities with the same cost, so
+    every city is tried at most once, and cities that don't lead back to the start are backed out of.
 
-        Returns:
-            City: The next lowest path cost cost city.
-        """
+    Args:
+        map (Map): The map the costs were found on.
+        start_id (int): The ID of the city the path starts at.
+        target_id (int): The ID of the city the path ends at.
+        get_cost (Callable[[int], float]): Gets the lowest path cost of the city with the given ID, math.inf if it wasn't reached.
+
+    Returns:
+        list[int]: The IDs of the cities on the path, or None if the costs don't lead back to the start.
+    """
+
+    def get_sources(city_id : int) -> list[int]:
+        cost = get_cost(city_id)
+
+        return sorted((source for source, action_cost in map.get_reverse_neighbors(city_id) if get_cost(source) + action_cost == cost), key=get_cost)
+
+    path = [ target_id ]
+    tried = { target_id }
+    # The sources left to try for every city on the path.
+    sources = [ iter(get_sources(target_id)) ]
+
+    while path[-1] != start_id:
+        source = next(sources[-1], None)
+
+        if source is None:
+            path.pop()
+            sources.pop()
 
-        min_index = 0
+            if not path:
+                return None
+        elif source not in tried:
+            tried.add(source)
+            path.append(source)
+            sources.append(iter(get_sources(source)))
 
-        for i in range(1, len(frontier)):
-            city = frontier[i]
-            
-            if costs[city] < costs[frontier[min_index]]:
-                min_index = i
+    path.reverse()
 
-        return frontier.pop(min_index)
+    return path
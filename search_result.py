@@ -1,24 +1,231 @@
 from city import City
-from dataclasses import dataclass, field
+from csr_graph import CsrGraph
+from map import Map
+from typing import Self
 
-@dataclass
 class SearchResult:
-    method : str
-    start : str
-    target : str
-    success : bool = field(default=False)
-    path : list[City] = field(default=None)
-    cost : int = field(default=0)
-    explored : int = field(default=0)
-    expanded : int = field(default=0)
-    maintained : int = field(default=0)
+    """
+    Represents the result of a search, with the path it found and how much work it took.
+
+    The path is kept in its most compact form until it is read: either as the parents the search
+    reached every city from and the city the path ends at, or as a list of city IDs in the map. The
+    list of cities is only built the first time the path is read, so results whose path is never
+    looked at never pay for it, and results that share one search share its parents.
+
+    Results are pickled as a plain tuple holding the ID, name, and coordinates of every city on the
+    path instead of the cities themselves, which would carry the rest of the map along with their
+    actions. A result unpickled in another process keeps those tuples, and builds its path from them
+    as cities without actions, like the ones of a CsrGraph.
+    """
+
+    __slots__ = ("method", "start", "target", "success", "cost", "explored", "expanded", "maintained", "map", "parents", "city_ids", "saved_path", "cities", "bound")
+
+    def __init__(self, method : str, start : str, target : str, success : bool = False, path : list[City] = None, cost : int = 0, explored : int = 0, expanded : int = 0, maintained : int = 0, bound : float = None) -> None:
+        self.method = method
+        self.start = start
+        self.target = target
+        self.success = success
+        self.cost = cost
+        self.explored = explored
+        self.expanded = expanded
+        self.maintained = maintained
+        # How many times the lowest cost the path may cost at most, for searches that trade cost for speed.
+        self.bound = bound
+        # The map the city IDs of the path belong to.
+        self.map = None
+        # The parent of every city the search reached, and the ID of the city the path ends at.
+        self.parents = None
+        self.city_ids = None
+        # The ID, name, latitude, and longitude of every city on the path of an unpickled result.
+        self.saved_path = None
+        self.cities = path
+
+    @property
+    def path(self) -> list[City]:
+        """
+        The cities on the path from the start to the target, or None if no path was found.
+        """
+
+        if self.cities is None:
+            if self.saved_path is not None:
+                self.cities = [ self.__create_city__(*city) for city in self.saved_path ]
+            elif self.__resolve_city_ids__() is not None:
+                self.cities = [ self.map.get_city_by_id(city_id) for city_id in self.city_ids ]
+
+        return self.cities
+
+    @path.setter
+    def path(self, path : list[City]) -> None:
+        self.cities = path
+        self.map = None
+        self.parents = None
+        self.city_ids = None
+        self.saved_path = None
+
+    def set_path_ids(self, map : Map | CsrGraph, city_ids : list[int]) -> None:
+        """
+        Sets the path as the IDs of its cities, which are only looked up when the path is read.
+
+        Args:
+            map (Map | CsrGraph): The map the IDs belong to.
+            city_ids (list[int]): The IDs of the cities on the path from the start to the target.
+        """
+
+        self.path = None
+        self.map = map
+        self.city_ids = city_ids
+
+    def set_path_parents(self, map : Map | CsrGraph, parents : dict[int, int], target_id : int) -> None:
+        """
+        Sets the path as the parents found by a search, which are only followed when the path is read.
+        The parents must not change afterwards.
+
+        Args:
+            map (Map | CsrGraph): The map the IDs belong to.
+            parents (dict[int, int]): The parent ID of every city ID reached by the search, None for the start.
+            target_id (int): The ID of the city the path ends at.
+        """
+
+        self.path = None
+        self.map = map
+        self.parents = (parents, target_id)
+
+    def __resolve_city_ids__(self) -> list[int]:
+        """
+        Follows the parents of the search into the list of city IDs on the path, if that hasn't been done yet.
+
+        Returns:
+            list[int]: The IDs of the cities on the path, or None if the path isn't stored as IDs.
+        """
+
+        if self.city_ids is None and self.parents is not None:
+            parents, current = self.parents
+            city_ids = [ current ]
+
+            while (current := parents[current]) is not None:
+                city_ids.append(current)
+
+            city_ids.reverse()
+
+            self.city_ids = city_ids
+            # Let go of the parents, they can be far larger than the path.
+            self.parents = None
+
+        return self.city_ids
+
+    def compact(self) -> None:
+        """
+        Follows the parents of the search into the IDs of the cities on the path, so the result no
+        longer holds on to the parents of every city the search reached.
+        """
+
+        self.__resolve_city_ids__()
+
+    def get_path_names(self) -> list[str]:
+        """
+        Gets the names of the cities on the path without building the path if it hasn't been read yet.
+
+        Returns:
+            list[str]: The names of the cities from the start to the target, or None if no path was found.
+        """
+
+        if self.cities is not None:
+            return [ city.name for city in self.cities ]
+        if self.saved_path is not None:
+            return [ city[1] for city in self.saved_path ]
+        if self.__resolve_city_ids__() is not None:
+            return [ self.map.get_city_by_id(city_id).name for city_id in self.city_ids ]
+
+        return None
+
+    def to_dict(self) -> dict:
+        """
+        Converts the result into a dictionary that can be saved as JSON, with the path as the names of its cities.
+
+        Returns:
+            dict: The fields of the result.
+        """
+
+        return {
+            "method": self.method,
+            "start": self.start,
+            "target": self.target,
+            "success": self.success,
+            "path": self.get_path_names(),
+            "cost": self.cost,
+            "explored": self.explored,
+            "expanded": self.expanded,
+            "maintained": self.maintained,
+            "bound": self.bound
+        }
+
+    def to_tuple(self) -> tuple:
+        """
+        Converts the result into a tuple of plain values, with the path as the ID, name, latitude, and
+        longitude of each of its cities. See from_tuple.
+
+        Returns:
+            tuple: The fields of the result.
+        """
+
+        path = self.saved_path
+
+        if self.cities is not None:
+            path = tuple((city.id, city.name, city.latitude, city.longitude) for city in self.cities)
+        elif path is None and self.__resolve_city_ids__() is not None:
+            cities = (self.map.get_city_by_id(city_id) for city_id in self.city_ids)
+            path = tuple((city_id, city.name, city.latitude, city.longitude) for city_id, city in zip(self.city_ids, cities))
+
+        return (self.method, self.start, self.target, self.success, path, self.cost, self.explored, self.expanded, self.maintained, self.bound)
+
+    @classmethod
+    def from_tuple(cls, values : tuple) -> Self:
+        """
+        Creates a result from the tuple created by to_tuple. Its path is built as cities without actions when it is read.
+
+        Args:
+            values (tuple): The fields of the result.
+
+        Returns:
+            SearchResult: The result.
+        """
+
+        method, start, target, success, path, cost, explored, expanded, maintained, bound = values
+        result = cls(method, start, target, success, None, cost, explored, expanded, maintained, bound)
+        result.saved_path = path
+
+        return result
+
+    @staticmethod
+    def __create_city__(city_id : int, name : str, latitude : float, longitude : float) -> City:
+        """
+        Creates a city without actions from the values saved by to_tuple.
+        """
+
+        city = City(name, latitude, longitude)
+        city.id = city_id
+
+        return city
+
+    def __reduce__(self) -> tuple:
+        return (SearchResult.from_tuple, (self.to_tuple(),))
+
+    def __eq__(self, other : object) -> bool:
+        if not isinstance(other, SearchResult):
+            return NotImplemented
+
+        return (self.method, self.start, self.target, self.success, self.cost, self.explored, self.expanded, self.maintained, self.bound, self.get_path_names()) \
+            == (other.method, other.start, other.target, other.success, other.cost, other.explored, other.expanded, other.maintained, other.bound, other.get_path_names())
+
+    def __repr__(self) -> str:
+        return f"SearchResult(method={self.method!r}, start={self.start!r}, target={self.target!r}, success={self.success}, path={self.get_path_names()}, cost={self.cost}, explored={self.explored}, expanded={self.expanded}, maintained={self.maintained}, bound={self.bound})"
 
     def __str__(self) -> str:
-        return f"{self.start} -> {self.target}\n" \
-        + f"Method: {self.method}\n" \
-        + f"Result: { 'Success' if self.success else 'Failure'}\n" \
-        + f"Path: {', '.join([c.name for c in self.path])}\n" \
-        + f"Cost: {self.cost}\n" \
-        + f"Explored: {self.explored}\n" \
-        + f"Expanded: {self.expanded}\n" \
-        + f"Maintained: {self.maintained}"
+        names = self.get_path_names()
+        # Only searches that may return a costlier path than the lowest cost one report a bound.
+        bound = f"\nBound: {self.bound:.3f}" if self.bound is not None else ""
+
+        # A single format string, since results are formatted millions of times in large batches.
+        return f"{self.start} -> {self.target}\nMethod: {self.method}\nResult: {'Success' if self.success else 'Failure'}\n" \
+            f"Path: {', '.join(names) if names is not None else 'None'}\nCost: {self.cost}\nExplored: {self.explored}\n" \
+            f"Expanded: {self.expanded}\nMaintained: {self.maintained}{bound}"
@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import main as cli
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from landmarks import DEFAULT_COUNT
+from main import init_batch_worker, load_distance_table, load_hierarchy, load_landmarks, load_map, perform_batch_task, search_methods
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8331
+DEFAULT_TIMEOUT = 10.0
+
+# The longest request line accepted, anything longer closes the connection.
+MAX_LINE_LENGTH = 2**16
+
+def answer_query(start : str, target : str, method : str) -> dict:
+    """
+    Performs a single query on the map loaded by the current worker, see init_batch_worker.
+
+    Args:
+        start (str): The name of the city to start at.
+        target (str): The name of the target city.
+        method (str): The name of the search method.
+
+    Returns:
+        dict: The result of the search, converted so only plain values are sent back from worker processes.
+
+    Raises:
+        ValueError: If either city is not in the map.
+    """
+
+    # The searches expect both cities to exist.
+    for name in (start, target):
+        if cli.worker_map.get_city_id(name) is None:
+            raise ValueError(f"Error: The map has no city named '{name}'.")
+
+    return perform_batch_task((start, [ target ], method))[0].to_dict()
+
+class RoutingServer:
+    """
+    Represents a long-running service that answers search queries sent over a socket, so the map is
+    only loaded once instead of for every query.
+
+    Every request is a line holding a JSON object with a "start", a "target", and optionally a "method"
+    and an "id". Every response is a line holding a JSON object with the same "id" and either the
+    "result" of the search or an "error", along with the "seconds" it took. Queries sent on the same
+    connection are performed concurrently, so responses can arrive out of order.
+
+    Searches run on an executor, never on the event loop. At most max_concurrent searches are given to
+    the executor at a time, and a request that isn't answered within the timeout, including time spent
+    waiting for a free slot, gets an error. A search that timed out can't be interrupted, so it keeps
+    its slot until it finishes.
+    """
+
+    def __init__(self, executor : Executor, max_concurrent : int, timeout : float = DEFAULT_TIMEOUT, default_method : str = "astar") -> None:
+        """
+        Args:
+            executor (Executor): The executor searches are performed on. Its workers must have loaded the map with init_batch_worker.
+            max_concurrent (int): The maximum number of searches given to the executor at a time.
+            timeout (float): The number of seconds a request may take.
+            default_method (str): The search method of requests that don't name one.
+        """
+
+        self.executor = executor
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.timeout = timeout
+        self.default_method = default_method
+        self.answered = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    @staticmethod
+    def __decode_request__(line : bytes) -> object:
+        """
+        Decodes the JSON of a request line.
+
+        Raises:
+            ValueError: If the line isn't JSON.
+        """
+
+        try:
+            return json.loads(line)
+        except ValueError as error:
+            raise ValueError(f"Error: A request must be a line of JSON, but it couldn't be decoded: {error}") from error
+
+    def __parse_request__(self, request : object) -> tuple[str, str, str]:
+        """
+        Reads the start, target, and search method of a decoded request.
+
+        Raises:
+            ValueError: If the request isn't valid.
+        """
+
+        if not isinstance(request, dict):
+            raise ValueError("Error: A request must be a JSON object.")
+
+        start = request.get("start")
+        target = request.get("target")
+        method = request.get("method", self.default_method)
+
+        if not isinstance(start, str) or not isinstance(target, str):
+            raise ValueError("Error: A request needs a 'start' and a 'target' city name.")
+        if method not in search_methods:
+            raise ValueError(f"Error: Unknown search method '{method}'.")
+
+        return (start.lower(), target.lower(), method)
+
+    async def perform(self, start : str, target : str, method : str) -> dict:
+        """
+        Performs a query on the executor once a slot is free.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city.
+            method (str): The name of the search method.
+
+        Returns:
+            dict: The result of the search.
+
+        Raises:
+            TimeoutError: If the query wasn't answered within the timeout.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async with asyncio.timeout(self.timeout):
+            await self.slots.acquire()
+
+            future = loop.run_in_executor(self.executor, answer_query, start, target, method)
+            # The slot is released when the search finishes, even if the request timed out before then.
+            future.add_done_callback(lambda _: self.slots.release())
+
+            return await asyncio.shield(future)
+
+    async def respond(self, line : bytes, writer : asyncio.StreamWriter) -> None:
+        """
+        Answers a single request line and writes the response.
+        """
+
+        start_time = time.perf_counter()
+        response = { "id": None }
+
+        try:
+            request = self.__decode_request__(line)
+            # Echo the ID before checking the rest of the request, so clients can tell which request was invalid.
+            response["id"] = request.get("id") if isinstance(request, dict) else None
+            start, target, method = self.__parse_request__(request)
+            response["result"] = await self.perform(start, target, method)
+            self.answered += 1
+        except TimeoutError:
+            response["error"] = f"Error: The query wasn't answered within {self.timeout} seconds."
+            self.timed_out += 1
+        except ValueError as error:
+            response["error"] = str(error)
+            self.failed += 1
+        except Exception as error:
+            # Answer anyway, so a search that breaks never leaves the client waiting.
+            response["error"] = f"Error: The search failed: {error!r}"
+            self.failed += 1
+
+        response["seconds"] = time.perf_counter() - start_time
+
+        try:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            # The client closed the connection before the response was ready.
+            pass
+
+    async def handle_connection(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        """
+        Answers every request sent on a connection until the client closes it.
+        """
+
+        pending = set()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+
+                task = asyncio.create_task(self.respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            await asyncio.gather(*pending)
+        except (ConnectionError, ValueError):
+            # The client went away, or sent a line longer than the limit.
+            for task in pending:
+                task.cancel()
+        finally:
+            writer.close()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Gets the number of requests answered, rejected as invalid, and timed out so far.
+
+        Returns:
+            dict[str, int]: The counts of requests.
+        """
+
+        return { "answered": self.answered, "failed": self.failed, "timed_out": self.timed_out }
+
+def create_executor(args) -> Executor:
+    """
+    Creates the executor searches are performed on, with the map and everything precomputed for it
+    loaded once in every worker. A single worker is a thread in this process.
+    """
+
+    initargs = (args.map_file, args.compact, args.table, args.cache_size, args.cache_ttl, args.landmarks, args.hierarchy, args.epsilon, args.deadline)
+
+    if args.workers == 1:
+        init_batch_worker(*initargs)
+
+        return ThreadPoolExecutor(max_workers=1)
+
+    return ProcessPoolExecutor(max_workers=args.workers, initializer=init_batch_worker, initargs=initargs)
+
+async def serve(args) -> None:
+    """
+    Listens for connections until the server is interrupted, then prints how many requests it handled.
+    """
+
+    with create_executor(args) as executor:
+        server = RoutingServer(executor, args.max_concurrent or 2 * args.workers, args.timeout, args.search)
+
+        if args.unix:
+            listener = await asyncio.start_unix_server(server.handle_connection, args.unix, limit=MAX_LINE_LENGTH)
+            address = args.unix
+        else:
+            listener = await asyncio.start_server(server.handle_connection, args.host, args.port, limit=MAX_LINE_LENGTH)
+            address = f"{args.host}:{args.port}"
+
+        print(f"Listening on {address} with {args.workers} workers.", file=sys.stderr)
+
+        try:
+            async with listener:
+                await listener.serve_forever()
+        finally:
+            print(f"Requests: {server.stats()}", file=sys.stderr)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def main(args):
+    args.workers = args.workers or os.cpu_count() or 1
+
+    if args.table or args.landmarks or args.hierarchy:
+        # Make sure the table, landmarks, and hierarchy have been built and saved before the workers load them.
+        map = load_map(args.map_file, args.compact)
+
+        if args.table:
+            load_distance_table(args.table, map)
+        if args.landmarks:
+            load_landmarks(args.landmarks, map, args.landmark_count)
+        if args.hierarchy:
+            load_hierarchy(args.hierarchy, map)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answers search queries sent as JSON lines over a TCP or Unix socket.")
+    parser.add_argument("map_file", help="The name of the map file or snapshot to search.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="The address to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="The TCP port to listen on.")
+    parser.add_argument("--unix", metavar="SOCKET_PATH", help="Listen on a Unix socket at the given path instead of TCP.")
+    parser.add_argument("-S", "--search", type=str.lower, default="astar", choices=list(search_methods), help="The search method of requests that don't name one.")
+    parser.add_argument("--epsilon", type=float, help="How much wastar and arastar inflate their estimates, so paths cost at most 1 + epsilon times the lowest cost.")
+    parser.add_argument("--deadline", type=float, help="The number of seconds arastar keeps improving its path for.")
+    parser.add_argument("-C", "--compact", action="store_true", help="Run the searches on a compact CSR copy of the map.")
+    parser.add_argument("-j", "--workers", type=int, help="The number of worker processes. Defaults to the number of CPUs, 1 searches on a thread of the server process.")
+    parser.add_argument("--max-concurrent", type=int, help="The maximum number of searches performed at a time. Defaults to twice the number of workers.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="The number of seconds a request may take, including waiting for a free worker.")
+    parser.add_argument("--cache-size", type=int, default=0, help="The number of results each worker caches for repeated queries. 0 disables the cache.")
+    parser.add_argument("--cache-ttl", type=float, help="The number of seconds cached results stay valid for. Defaults to no limit.")
+    parser.add_argument("-T", "--table", metavar="TABLE_FILE", help="Answer queries from a precomputed all-pairs distance table saved in the given file.")
+    parser.add_argument("--landmarks", metavar="LANDMARK_FILE", help="Use the landmarks saved in the given file for the alt search.")
+    parser.add_argument("--landmark-count", type=int, default=DEFAULT_COUNT, help="The number of landmarks to select when the landmark file doesn't exist yet.")
+    parser.add_argument("--hierarchy", metavar="HIERARCHY_FILE", help="Use the contraction hierarchy saved in the given file for the ch search.")
+
+    args = parser.parse_args()
+
+    main(args)
@@ -0,0 +1,289 @@
+import mmap
+import struct
+from array import array
+from csr_graph import CsrGraph
+from pathlib import Path
+from typing import BinaryIO
+
+# Written in native byte order by every binary file, a file read on a machine with the other byte order won't match it.
+BYTE_ORDER_MARK = 0x01020304
+
+class SnapshotError(ValueError):
+    """
+    Raised when a file is not a map snapshot this version can read.
+    """
+
+class FileFormat:
+    """
+    Represents a binary file format, like map snapshots, distance tables, landmarks, and contraction
+    hierarchies. Every file starts with a header of the magic bytes of its format, the version of the
+    format, and a byte order mark, followed by the fields of the format, all in native byte order.
+    """
+
+    def __init__(self, magic : bytes, version : int, fields : str, description : str, error : type[ValueError] = ValueError) -> None:
+        """
+        Args:
+            magic (bytes): The 8 bytes every file of the format starts with.
+            version (int): The version of the format written and read by this code.
+            fields (str): The struct format of the header fields after the byte order mark.
+            description (str): What a file of the format is called in error messages.
+            error (type[ValueError]): The error raised for files that aren't of the format.
+        """
+
+        self.magic = magic
+        self.version = version
+        self.description = description
+        self.error = error
+        self.header = struct.Struct("=8sII" + fields)
+
+    def pack_header(self, *fields) -> bytes:
+        """
+        Packs the header of a file of the format.
+
+        Args:
+            fields: The header fields after the byte order mark.
+
+        Returns:
+            bytes: The header.
+        """
+
+        return self.header.pack(self.magic, self.version, BYTE_ORDER_MARK, *fields)
+
+    def unpack_header(self, data : bytes, file_name : str) -> tuple:
+        """
+        Unpacks the header at the start of the given data and checks that it belongs to a file of the
+        format, of this version, written on a machine with the same byte order.
+
+        Args:
+            data (bytes): The data of the file, at least up to the end of the header if it is long enough.
+            file_name (str): The name of the file, for error messages.
+
+        Returns:
+            tuple: The header fields after the byte order mark.
+
+        Raises:
+            ValueError: Of the error type of the format, if the file is not of the format, version, or byte order.
+        """
+
+        if len(data) < self.header.size:
+            raise self.error(f"Error: The file '{file_name}' is too small to be a {self.description}.")
+
+        magic, version, byte_order_mark, *fields = self.header.unpack_from(data)
+
+        if magic != self.magic:
+            raise self.error(f"Error: The file '{file_name}' is not a {self.description}.")
+        if version != self.version:
+            raise self.error(f"Error: The {self.description} '{file_name}' has version {version}, but only version {self.version} is supported.")
+        if byte_order_mark != BYTE_ORDER_MARK:
+            raise self.error(f"Error: The {self.description} '{file_name}' was written on a machine with a different byte order.")
+
+        return tuple(fields)
+
+    def read_header(self, file : BinaryIO, file_name : str) -> tuple:
+        """
+        Reads the header from the start of the given file and checks it like unpack_header.
+
+        Args:
+            file (BinaryIO): The file to read from, which is left positioned after the header.
+            file_name (str): The name of the file, for error messages.
+
+        Returns:
+            tuple: The header fields after the byte order mark.
+        """
+
+        return self.unpack_header(file.read(self.header.size), file_name)
+
+# City count, unique name count, edge count, and size of the name blob in bytes.
+FORMAT = FileFormat(b"CITYMAP\0", 1, "qqqq", "map snapshot", SnapshotError)
+
+class SnapshotNames:
+    """
+    Represents the city names of a snapshot. Names are decoded from the memory-mapped name blob
+    when they are accessed instead of all at once when the snapshot is loaded.
+    """
+
+    def __init__(self, blob : memoryview, offsets : memoryview) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    def encoded(self, city_id : int) -> bytes:
+        """
+        Gets the UTF-8 encoded name of the city with the given ID.
+
+        Args:
+            city_id (int): The ID of the city.
+
+        Returns:
+            bytes: The encoded name.
+        """
+
+        return bytes(self.blob[self.offsets[city_id]:self.offsets[city_id + 1]])
+
+    def __getitem__(self, city_id : int) -> str:
+        return self.encoded(city_id).decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+class SnapshotNameIndex:
+    """
+    Represents a lookup from city name to city ID over a snapshot. The snapshot stores the city IDs
+    sorted by name, so a name is found with a binary search without building a dictionary at startup.
+    """
+
+    def __init__(self, names : SnapshotNames, sorted_ids : memoryview) -> None:
+        self.names = names
+        self.sorted_ids = sorted_ids
+
+    def get(self, name : str) -> int:
+        """
+        Finds the ID of the city with the given name.
+
+        Args:
+            name (str): The name of the city to search for.
+
+        Returns:
+            int: The ID of the city if it is found, otherwise None.
+        """
+
+        # UTF-8 byte order matches code point order, so encoded names compare like the strings they came from.
+        key = name.encode("utf-8")
+        low = 0
+        high = len(self.sorted_ids)
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self.names.encoded(self.sorted_ids[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < len(self.sorted_ids) and self.names.encoded(self.sorted_ids[low]) == key:
+            return self.sorted_ids[low]
+
+        return None
+
+def padding_for(size : int) -> bytes:
+    """
+    Gets the zero bytes needed to align a section of the given size to 8 bytes.
+
+    Args:
+        size (int): The size of the section in bytes.
+
+    Returns:
+        bytes: Between 0 and 7 zero bytes.
+    """
+
+    return bytes(-size % 8)
+
+def write_snapshot(graph : CsrGraph, file_name : str) -> None:
+    """
+    Writes the given graph to a binary snapshot that can be memory-mapped by load_snapshot.
+
+    The snapshot holds a header followed by the latitudes and longitudes (float64), the edge offsets
+    and name offsets (int64), the city IDs sorted by name, the edge targets and costs (int32), and finally
+    the UTF-8 encoded names. Every section starts on an 8 byte boundary.
+
+    Args:
+        graph (CsrGraph): The graph to write.
+        file_name (str): The name of the file to write the snapshot to.
+    """
+
+    encoded_names = [ name.encode("utf-8") for name in graph.names ]
+
+    name_offsets = array("q", [ 0 ])
+    for encoded_name in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(encoded_name))
+
+    # When a name is defined more than once, keep the first definition like the map does.
+    first_ids = {}
+    for city_id, encoded_name in enumerate(encoded_names):
+        first_ids.setdefault(encoded_name, city_id)
+    sorted_ids = array("i", (first_ids[name] for name in sorted(first_ids)))
+
+    sections = [
+        array("d", graph.latitudes),
+        array("d", graph.longitudes),
+        array("q", graph.offsets),
+        name_offsets,
+        sorted_ids,
+        array("i", graph.targets),
+        array("i", graph.costs)
+    ]
+
+    with open(file_name, "wb") as file:
+        file.write(FORMAT.pack_header(len(graph.names), len(sorted_ids), len(graph.targets), name_offsets[-1]))
+
+        for section in sections:
+            data = section.tobytes()
+            file.write(data)
+            file.write(padding_for(len(data)))
+
+        file.write(b"".join(encoded_names))
+
+def is_snapshot(file_name : str) -> bool:
+    """
+    Checks whether the given file starts like a map snapshot.
+
+    Args:
+        file_name (str): The name of the file to check.
+
+    Returns:
+        bool: True if the file is a snapshot, otherwise False, including when the file does not exist so
+            the loader of map files can report it.
+    """
+
+    snapshot_path = Path(file_name)
+    if not snapshot_path.is_file():
+        return False
+
+    with open(snapshot_path, "rb") as file:
+        return file.read(len(FORMAT.magic)) == FORMAT.magic
+
+def load_snapshot(file_name : str) -> CsrGraph:
+    """
+    Memory-maps the given snapshot and wraps it in a graph without copying or parsing it. The operating
+    system only pages in the parts the searches touch, and processes loading the same snapshot share
+    one copy of it in the page cache.
+
+    Args:
+        file_name (str): The name of the snapshot file.
+
+    Returns:
+        CsrGraph: A read-only graph backed by the snapshot.
+
+    Raises:
+        FileNotFoundError: If the snapshot file does not exist.
+        SnapshotError: If the file is not a snapshot, or was written by another version or on a machine with another byte order.
+    """
+
+    snapshot_path = Path(file_name)
+    if not snapshot_path.is_file():
+        raise FileNotFoundError(f"Error: The snapshot file '{file_name}' does not exist.")
+
+    with open(snapshot_path, "rb") as file:
+        city_count, name_count, edge_count, names_size = FORMAT.read_header(file, file_name)
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    layout = [ ("d", city_count), ("d", city_count), ("q", city_count + 1), ("q", city_count + 1), ("i", name_count), ("i", edge_count), ("i", edge_count) ]
+    sizes = [ count * struct.calcsize(format) for format, count in layout ]
+    expected_size = FORMAT.header.size + sum(size + len(padding_for(size)) for size in sizes) + names_size
+
+    if len(data) != expected_size:
+        raise SnapshotError(f"Error: The snapshot '{file_name}' is {len(data)} bytes but its header describes {expected_size} bytes.")
+
+    view = memoryview(data)
+    sections = []
+    position = FORMAT.header.size
+
+    for (format, _), size in zip(layout, sizes):
+        sections.append(view[position:position + size].cast(format))
+        position += size + len(padding_for(size))
+
+    latitudes, longitudes, offsets, name_offsets, sorted_ids, targets, costs = sections
+
+    names = SnapshotNames(view[position:position + names_size], name_offsets)
+    city_ids = SnapshotNameIndex(names, sorted_ids)
+
+    return CsrGraph(names, latitudes, longitudes, offsets, targets, costs, city_ids)
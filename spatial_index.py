@@ -0,0 +1,312 @@
+import heapq
+import math
+from array import array
+from csr_graph import CsrGraph
+from haversine_table import EARTH_RADIUS
+from map import Map
+from map_cache import MapCache
+from typing import Self
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The most cities kept together in a leaf of the tree, which are compared one by one.
+DEFAULT_LEAF_SIZE = 16
+
+# The spatial indexes of every map they have been created for, see SpatialIndex.for_map.
+registered = MapCache(follows_changes=False)
+
+def to_unit_vector(latitude : float, longitude : float) -> tuple[float, float, float]:
+    """
+    Converts a latitude and longitude in radians into a point on the unit sphere.
+
+    Args:
+        latitude (float): The latitude in radians.
+        longitude (float): The longitude in radians.
+
+    Returns:
+        tuple[float, float, float]: The x, y, and z coordinates of the point.
+    """
+
+    cos_latitude = math.cos(latitude)
+
+    return (cos_latitude * math.cos(longitude), cos_latitude * math.sin(longitude), math.sin(latitude))
+
+class SpatialIndex:
+    """
+    Represents a k-d tree over the coordinates of every city in a map, for finding the cities nearest
+    to a point or within a distance of it without comparing the point to every city.
+
+    Cities are stored as points on the unit sphere rather than as latitudes and longitudes, so the
+    straight line distance between two points always grows with the great-circle distance between
+    them, and the index works the same near the poles and across the antimeridian. Every node of the
+    tree splits its cities in half along the axis they are most spread out on, down to leaves of a
+    few cities each, and keeps the box bounding its cities. Lookups visit the nodes in order of how
+    close their boxes are to the point and skip every box further away than the cities already
+    found, so only a handful of leaves are compared to the point one city at a time.
+
+    Building the index takes a few seconds for a million cities, and uses NumPy to split the cities
+    if it is installed.
+    """
+
+    def __init__(self, map : Map | CsrGraph, leaf_size : int = DEFAULT_LEAF_SIZE) -> None:
+        """
+        Args:
+            map (Map | CsrGraph): The map to index.
+            leaf_size (int): The most cities kept together in a leaf.
+        """
+
+        self.map = map
+        self.leaf_size = max(1, leaf_size)
+
+        self.points = (array("d"), array("d"), array("d"))
+
+        for city_id in range(len(map)):
+            for axis, value in enumerate(to_unit_vector(*map.get_radians(city_id))):
+                self.points[axis].append(value)
+
+        # The city IDs in the order of the tree, every node covers a contiguous range of them.
+        self.order = array("i", range(len(map)))
+        # The range of cities of every node, the corners of the box bounding them, and for inner nodes
+        # the axis they are split along and their two children. Leaves have an axis of -1.
+        self.starts = array("i")
+        self.ends = array("i")
+        self.lows = array("d")
+        self.highs = array("d")
+        self.axes = array("b")
+        self.lefts = array("i")
+        self.rights = array("i")
+
+        self.__build__()
+
+    @classmethod
+    def for_map(cls, map : Map | CsrGraph) -> Self:
+        """
+        Gets the spatial index of the given map, building it first if the map has none yet. The
+        coordinates of a map never change, so the index is kept even when its actions change.
+
+        Args:
+            map (Map | CsrGraph): The map to get the index of.
+
+        Returns:
+            SpatialIndex: The index of the map.
+        """
+
+        return registered.get_or_build(map, cls)
+
+    def __add_node__(self, start : int, end : int) -> int:
+        """
+        Adds a node covering the given range of cities as a leaf, and returns its index.
+        """
+
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lows.extend((0.0, 0.0, 0.0))
+        self.highs.extend((0.0, 0.0, 0.0))
+        self.axes.append(-1)
+        self.lefts.append(-1)
+        self.rights.append(-1)
+
+        return len(self.starts) - 1
+
+    def __build__(self) -> None:
+        """
+        Splits the cities into the nodes of the tree, from the root down.
+        """
+
+        if numpy is not None:
+            points = numpy.array(self.points)
+            order = numpy.arange(len(self.map), dtype=numpy.int32)
+        else:
+            points = self.points
+            order = self.order
+
+        stack = [ self.__add_node__(0, len(self.map)) ]
+
+        while stack:
+            node = stack.pop()
+            start, end = self.starts[node], self.ends[node]
+            city_ids = order[start:end]
+
+            if start == end:
+                continue
+
+            if numpy is not None:
+                coordinates = points[:, city_ids]
+                lows, highs = coordinates.min(axis=1).tolist(), coordinates.max(axis=1).tolist()
+            else:
+                lows = [ min(points[axis][city_id] for city_id in city_ids) for axis in range(3) ]
+                highs = [ max(points[axis][city_id] for city_id in city_ids) for axis in range(3) ]
+
+            self.lows[3 * node:3 * node + 3] = array("d", lows)
+            self.highs[3 * node:3 * node + 3] = array("d", highs)
+
+            if end - start <= self.leaf_size:
+                continue
+
+            middle = (start + end) // 2
+            spreads = [ high - low for low, high in zip(lows, highs) ]
+            axis = spreads.index(max(spreads))
+
+            if numpy is not None:
+                # Only the city in the middle has to end up in its sorted position, with smaller values before it and larger after.
+                order[start:end] = city_ids[numpy.argpartition(coordinates[axis], middle - start)]
+            else:
+                order[start:end] = array("i", sorted(city_ids, key=points[axis].__getitem__))
+
+            self.axes[node] = axis
+            self.lefts[node] = self.__add_node__(start, middle)
+            self.rights[node] = self.__add_node__(middle, end)
+
+            stack.append(self.rights[node])
+            stack.append(self.lefts[node])
+
+        if numpy is not None:
+            self.order = array("i", order.tobytes())
+
+    def __to_point__(self, latitude : float, longitude : float) -> tuple[float, float, float]:
+        """
+        Checks a latitude and longitude in degrees and converts them into a point on the unit sphere.
+
+        Raises:
+            ValueError: If the latitude or longitude is out of range.
+        """
+
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError(f"Error: ({latitude}, {longitude}) is not a valid latitude and longitude.")
+
+        return to_unit_vector(math.radians(latitude), math.radians(longitude))
+
+    def __to_kilometers__(self, squared_chord : float) -> float:
+        """
+        Converts the squared straight line distance between two points on the unit sphere into the great-circle distance in kilometers.
+        """
+
+        return EARTH_RADIUS * 2 * math.asin(min(1.0, math.sqrt(squared_chord) / 2))
+
+    def __squared_distance__(self, point : tuple[float, float, float], city_id : int) -> float:
+        """
+        Calculates the squared straight line distance between a point and a city.
+        """
+
+        xs, ys, zs = self.points
+
+        return (xs[city_id] - point[0])**2 + (ys[city_id] - point[1])**2 + (zs[city_id] - point[2])**2
+
+    def __box_distance__(self, point : tuple[float, float, float], node : int) -> float:
+        """
+        Calculates the squared straight line distance between a point and the box bounding the cities of a node.
+        """
+
+        distance = 0.0
+
+        for axis in range(3):
+            low, high = self.lows[3 * node + axis], self.highs[3 * node + axis]
+
+            if point[axis] < low:
+                distance += (low - point[axis])**2
+            elif point[axis] > high:
+                distance += (point[axis] - high)**2
+
+        return distance
+
+    def nearest(self, latitude : float, longitude : float, k : int = 1) -> list[tuple[int, float]]:
+        """
+        Finds the cities nearest to a point.
+
+        Args:
+            latitude (float): The latitude of the point in degrees.
+            longitude (float): The longitude of the point in degrees.
+            k (int): The number of cities to find.
+
+        Returns:
+            list[tuple[int, float]]: The IDs of the k nearest cities and their distances from the point in kilometers, nearest first.
+
+        Raises:
+            ValueError: If the latitude or longitude is out of range.
+        """
+
+        point = self.__to_point__(latitude, longitude)
+        # The nearest cities found so far as a max heap on their distance, with ties broken towards lower IDs.
+        best = []
+
+        if k < 1 or len(self.map) == 0:
+            return []
+
+        # The nodes left to visit as a min heap on the squared distance from the point to their boxes.
+        nodes = [ (self.__box_distance__(point, 0), 0) ]
+
+        while nodes:
+            box_distance, node = heapq.heappop(nodes)
+
+            if len(best) == k and box_distance > -best[0][0]:
+                # Every node left is further away than the cities found.
+                break
+
+            axis = self.axes[node]
+
+            if axis < 0:
+                for city_id in self.order[self.starts[node]:self.ends[node]]:
+                    entry = (-self.__squared_distance__(point, city_id), -city_id)
+
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+
+                continue
+
+            for child in (self.lefts[node], self.rights[node]):
+                heapq.heappush(nodes, (self.__box_distance__(point, child), child))
+
+        return [ (-city_id, self.__to_kilometers__(-squared)) for squared, city_id in sorted(best, reverse=True) ]
+
+    def within(self, latitude : float, longitude : float, radius : float) -> list[tuple[int, float]]:
+        """
+        Finds every city within a distance of a point.
+
+        Args:
+            latitude (float): The latitude of the point in degrees.
+            longitude (float): The longitude of the point in degrees.
+            radius (float): The greatest great-circle distance from the point in kilometers.
+
+        Returns:
+            list[tuple[int, float]]: The IDs of the cities and their distances from the point in kilometers, nearest first.
+
+        Raises:
+            ValueError: If the latitude or longitude is out of range.
+        """
+
+        point = self.__to_point__(latitude, longitude)
+
+        if radius < 0 or len(self.map) == 0:
+            return []
+
+        # The squared straight line distance matching the radius, anything further away is outside it.
+        limit = (2 * math.sin(min(radius / EARTH_RADIUS, math.pi) / 2))**2
+        found = []
+        stack = [ 0 ]
+
+        while stack:
+            node = stack.pop()
+
+            if self.__box_distance__(point, node) > limit:
+                continue
+
+            axis = self.axes[node]
+
+            if axis < 0:
+                for city_id in self.order[self.starts[node]:self.ends[node]]:
+                    squared = self.__squared_distance__(point, city_id)
+
+                    if squared <= limit:
+                        found.append((squared, city_id))
+
+                continue
+
+            stack.append(self.lefts[node])
+            stack.append(self.rights[node])
+
+        return [ (city_id, self.__to_kilometers__(squared)) for squared, city_id in sorted(found) ]
@@ -0,0 +1,31 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules of the project are imported from the repository root, like main.py does.
+sys.path.insert(0, str(ROOT))
+
+from map import Map
+
+@pytest.fixture
+def france_file(tmp_path : Path) -> str:
+    """
+    Copies the France map into a temporary directory, so tests can write files next to it.
+    """
+
+    file_name = tmp_path / "france.txt"
+    shutil.copy(ROOT / "france.txt", file_name)
+
+    return str(file_name)
+
+@pytest.fixture
+def france(france_file : str) -> Map:
+    """
+    Loads the France map.
+    """
+
+    return Map.from_file(france_file)
@@ -0,0 +1,23 @@
+import io
+import pytest
+from main import perform_batch, perform_search, read_queries
+from map import Map
+
+QUERIES = [ ("brest", "nice", "astar"), ("nice", "brest", "bfs"), ("paris", "lyon", "dls"), ("calais", "calais", "bibfs") ]
+
+def test_queries_are_read_with_a_default_method():
+    file = io.StringIO("# start target method\nBrest Nice\n\nnice paris ucs\n")
+
+    assert read_queries(file, "astar") == [ ("brest", "nice", "astar"), ("nice", "paris", "ucs") ]
+
+@pytest.mark.parametrize("line, message", [ ("brest\n", "line 1 should be"), ("brest nice fastest\n", "unknown search method 'fastest'") ])
+def test_malformed_queries_are_rejected(line, message):
+    with pytest.raises(ValueError, match=message):
+        read_queries(io.StringIO(line), "astar")
+
+@pytest.mark.parametrize("workers", [ 1, 2 ])
+def test_batches_match_single_searches_in_order(france_file, workers):
+    map = Map.from_file(france_file)
+    expected = [ perform_search(method, start, target, map) for start, target, method in QUERIES ]
+
+    assert list(perform_batch(QUERIES, france_file, workers=workers, chunk_size=1)) == expected
@@ -0,0 +1,43 @@
+import itertools
+import subprocess
+import sys
+import pytest
+from batch_engine import BatchEngine
+from bfs import BreadthFirstSearch
+from pathlib import Path
+from ucs import UniformCostSearch
+from zero_cost import zero_cost_map
+
+NAMES = [ "brest", "nice", "paris", "lyon", "toulouse", "calais" ]
+
+@pytest.mark.parametrize("search_type", [ BreadthFirstSearch, UniformCostSearch ])
+def test_batches_match_single_searches(france, search_type):
+    queries = list(itertools.permutations(NAMES, 2))
+    results = BatchEngine(france, max_cells=3 * len(france)).perform(queries, search_type.name)
+
+    search = search_type(france)
+
+    for (start, target), result in zip(queries, results):
+        expected = search.perform(start, target)
+
+        assert (result.start, result.target, result.success, result.cost) == (start, target, expected.success, expected.cost)
+        assert result.get_path_names()[0] == start
+        assert result.get_path_names()[-1] == target
+
+def test_paths_are_followed_through_zero_cost_circles():
+    map = zero_cost_map()
+
+    result, = BatchEngine(map).perform([ ("s", "t") ], UniformCostSearch.name)
+
+    assert result.cost == 2
+    assert result.get_path_names() == [ "s", "a", "b", "c", "t" ]
+
+def test_unknown_methods_are_rejected(france):
+    with pytest.raises(ValueError, match="can't perform 'astar'"):
+        BatchEngine(france).perform([ ("brest", "nice") ], "astar")
+
+def test_the_engine_and_its_users_import_without_numpy():
+    # Blocking NumPy in sys.modules makes every import of it fail, like it isn't installed.
+    code = "import sys; sys.modules['numpy'] = None; import batch_engine, main, server"
+
+    subprocess.run([ sys.executable, "-c", code ], cwd=Path(__file__).resolve().parent.parent, check=True)
@@ -0,0 +1,46 @@
+from astar import AstarSearch
+from benchmarks.generate_map import write_map
+from benchmarks.suite import compare, measure
+from map import Map
+from ucs import UniformCostSearch
+
+def test_generated_maps_are_reproducible_and_connected(tmp_path):
+    write_map(str(tmp_path / "a.txt"), 300, seed=4)
+    write_map(str(tmp_path / "b.txt"), 300, seed=4)
+
+    assert (tmp_path / "a.txt").read_text() == (tmp_path / "b.txt").read_text()
+
+    map = Map.from_file(str(tmp_path / "a.txt"))
+    start = map.get_city_by_id(0).name
+
+    assert len(map) == 300
+    assert all(result.success for result in UniformCostSearch(map).perform_many(start).values())
+
+def test_the_haversine_estimate_stays_admissible_on_generated_maps(tmp_path):
+    write_map(str(tmp_path / "map.txt"), 300, seed=5)
+    map = Map.from_file(str(tmp_path / "map.txt"))
+    astar = AstarSearch(map)
+
+    for start_id in (0, 150, 299):
+        start = map.get_city_by_id(start_id).name
+
+        for target, expected in UniformCostSearch(map).perform_many(start).items():
+            assert astar.perform(start, target).cost == expected.cost
+
+def test_measurements_total_the_counts_of_every_query(france, capsys):
+    queries = [ ("brest", "nice"), ("paris", "paris") ]
+    measurement = measure("ucs", france, queries, trace_memory=True)
+    results = [ UniformCostSearch(france).perform(start, target) for start, target in queries ]
+
+    assert measurement["successes"] == 2
+    assert measurement["cost"] == sum(result.cost for result in results)
+    assert measurement["expanded"] == sum(result.expanded for result in results)
+    assert measurement["peak_memory"] > 0
+
+    baseline = { "sizes": { "100": { "ucs": { **measurement, "seconds_per_query": measurement["seconds_per_query"] / 2, "expanded": 0 } } } }
+    compare({ "sizes": { "100": { "ucs": measurement, "bfs": measurement } } }, baseline)
+
+    lines = capsys.readouterr().out.splitlines()
+
+    assert len(lines) == 1
+    assert "+100.0% time per query, counts changed: expanded" in lines[0]
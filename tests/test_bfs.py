@@ -0,0 +1,53 @@
+from bfs import BreadthFirstSearch
+
+def fewest_actions(map, start_id):
+    """
+    Finds the fewest actions from the start to every city by relaxing every action until nothing changes, as a reference.
+    """
+
+    counts = { start_id: 0 }
+    changed = True
+
+    while changed:
+        changed = False
+
+        for city_id in list(counts):
+            for neighbor, _ in map.get_neighbors(city_id):
+                if counts[city_id] + 1 < counts.get(neighbor, len(map)):
+                    counts[neighbor] = counts[city_id] + 1
+                    changed = True
+
+    return counts
+
+def test_paths_have_the_fewest_actions(france):
+    search = BreadthFirstSearch(france)
+
+    for start_id in range(len(france)):
+        counts = fewest_actions(france, start_id)
+        start = france.get_city_by_id(start_id).name
+
+        for target_id in range(len(france)):
+            target = france.get_city_by_id(target_id).name
+            result = search.perform(start, target)
+
+            assert result.success == (target_id in counts)
+            if result.success:
+                assert len(result.path) - 1 == counts[target_id]
+                assert (result.path[0].name, result.path[-1].name) == (start, target)
+
+def test_paths_by_id_match_paths_by_name(france):
+    search = BreadthFirstSearch(france)
+
+    for start, target in [ ("brest", "nice"), ("nice", "brest"), ("paris", "toulouse") ]:
+        result = search.perform(start, target)
+        path, cost = search.perform_ids(france.get_city_id(start), france.get_city_id(target))
+
+        assert [ france.get_city_by_id(city_id).name for city_id in path ] == [ city.name for city in result.path ]
+        assert cost == result.cost
+
+def test_the_start_is_found_without_searching(france):
+    result = BreadthFirstSearch(france).perform("paris", "paris")
+
+    assert result.success
+    assert [ city.name for city in result.path ] == [ "paris" ]
+    assert (result.cost, result.explored, result.expanded, result.maintained) == (0, 1, 1, 0)
@@ -0,0 +1,53 @@
+import pytest
+from bfs import BreadthFirstSearch
+from bidirectional import BidirectionalAstarSearch, BidirectionalBreadthFirstSearch, BidirectionalUniformCostSearch
+from ucs import UniformCostSearch
+
+STARTS = [ "brest", "nice", "paris", "calais" ]
+
+def path_cost(path):
+    return sum(min(action.cost for action in source.actions if action.destination == destination.name) for source, destination in zip(path, path[1:]))
+
+def queries(map):
+    for start in STARTS:
+        for target_id in range(len(map)):
+            yield (start, map.get_city_by_id(target_id).name)
+
+def test_bidirectional_breadth_first_paths_have_the_fewest_actions(france):
+    bfs = BreadthFirstSearch(france)
+    search = BidirectionalBreadthFirstSearch(france)
+
+    for start, target in queries(france):
+        result = search.perform(start, target)
+        expected = bfs.perform(start, target)
+
+        assert result.success == expected.success
+        if result.success:
+            assert len(result.path) == len(expected.path)
+            assert (result.path[0].name, result.path[-1].name) == (start, target)
+            assert path_cost(result.path) == result.cost
+
+def test_bidirectional_uniform_cost_paths_have_the_lowest_cost(france):
+    ucs = UniformCostSearch(france)
+    search = BidirectionalUniformCostSearch(france)
+
+    for start, target in queries(france):
+        result = search.perform(start, target)
+        expected = ucs.perform(start, target)
+
+        assert (result.success, result.cost) == (expected.success, expected.cost)
+        if result.success:
+            assert (result.path[0].name, result.path[-1].name) == (start, target)
+            assert path_cost(result.path) == result.cost
+
+def test_bidirectional_astar_paths_are_complete(france):
+    search = BidirectionalAstarSearch(france)
+    ucs = UniformCostSearch(france)
+
+    for start, target in queries(france):
+        result = search.perform(start, target)
+
+        assert result.success == ucs.perform(start, target).success
+        if result.success:
+            assert (result.path[0].name, result.path[-1].name) == (start, target)
+            assert path_cost(result.path) == result.cost
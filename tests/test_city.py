@@ -0,0 +1,28 @@
+import math
+import pytest
+from action import Action
+from city import City
+from coordinate import Coordinate
+
+def test_coordinates_are_stored_as_floats_with_radians():
+    city = City("brest", Coordinate.from_dms(48, 23, 59, "N"), Coordinate.from_dms(4, 29, 24, "W"))
+
+    assert type(city.latitude) is float and type(city.longitude) is float
+    assert city.latitude == pytest.approx(48 + 23 / 60 + 59 / 3600)
+    assert city.longitude == pytest.approx(-(4 + 29 / 60 + 24 / 3600))
+    assert city.latitude_radians == math.radians(city.latitude)
+    assert city.longitude_radians == math.radians(city.longitude)
+
+@pytest.mark.parametrize("value", [ City("a", 1.0, 2.0), Action("a", 1), Coordinate(1.0) ])
+def test_values_are_slotted(value):
+    assert not hasattr(value, "__dict__")
+
+    with pytest.raises(AttributeError):
+        value.unknown = 1
+
+def test_actions_are_added_in_order():
+    city = City("a", 1.0, 2.0)
+    city.add_action(Action("b", 1))
+    city.add_actions([ Action("c", 2), Action("d", 3) ])
+
+    assert [ (action.destination, action.cost) for action in city.actions ] == [ ("b", 1), ("c", 2), ("d", 3) ]
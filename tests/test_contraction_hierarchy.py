@@ -0,0 +1,30 @@
+from contraction_hierarchy import ContractionHierarchy, ContractionHierarchySearch
+from ucs import UniformCostSearch
+
+def path_cost(path):
+    return sum(min(action.cost for action in source.actions if action.destination == destination.name) for source, destination in zip(path, path[1:]))
+
+def test_queries_find_the_lowest_costs_along_actions_of_the_map(france):
+    search = ContractionHierarchySearch(france, ContractionHierarchy.build(france))
+    ucs = UniformCostSearch(france)
+
+    for start_id in range(len(france)):
+        start = france.get_city_by_id(start_id).name
+
+        for target, expected in ucs.perform_many(start).items():
+            result = search.perform(start, target)
+
+            assert (result.success, result.cost) == (expected.success, expected.cost)
+            if result.success:
+                assert (result.path[0].name, result.path[-1].name) == (start, target)
+                assert path_cost(result.path) == result.cost
+
+def test_shortcuts_unpack_into_actions_of_the_same_cost(france):
+    hierarchy = ContractionHierarchy.build(france)
+
+    assert sorted(hierarchy.ranks) == list(range(len(france)))
+    for (source, destination), (cost, _) in hierarchy.edges.items():
+        path = [ france.get_city_by_id(city_id) for city_id in hierarchy.unpack([ source, destination ]) ]
+
+        assert (path[0].id, path[-1].id) == (source, destination)
+        assert path_cost(path) == cost
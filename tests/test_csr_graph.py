@@ -0,0 +1,30 @@
+import pytest
+from csr_graph import CsrGraph
+from main import search_methods
+
+QUERIES = [ ("brest", "nice"), ("nice", "brest"), ("paris", "toulouse"), ("calais", "calais") ]
+
+def test_graphs_hold_the_cities_and_actions_of_their_map(france):
+    graph = CsrGraph.from_map(france)
+
+    assert len(graph) == len(france)
+    for city_id in range(len(france)):
+        city = graph.get_city_by_id(city_id)
+
+        assert graph.get_city_id(city.name) == city_id
+        assert (city.latitude, city.longitude) == france.get_coordinates(city_id)
+        assert list(graph.get_neighbors(city_id)) == france.get_neighbors(city_id)
+        assert sorted(graph.get_reverse_neighbors(city_id)) == sorted(france.get_reverse_neighbors(city_id))
+
+    assert graph.get_city("atlantis") is None
+    assert graph.memory_usage() > 0
+
+@pytest.mark.parametrize("method", [ "bfs", "dls", "ucs", "astar", "bibfs", "biucs", "biastar" ])
+def test_searches_on_graphs_match_searches_on_maps(france, method):
+    graph = CsrGraph.from_map(france)
+
+    for start, target in QUERIES:
+        expected = search_methods[method](france).perform(start, target)
+        result = search_methods[method](graph).perform(start, target)
+
+        assert result == expected
@@ -0,0 +1,48 @@
+import pytest
+from distance_table import DistanceTable
+from ucs import UniformCostSearch
+
+def path_cost(map, path):
+    return sum(min(cost for neighbor, cost in map.get_neighbors(source) if neighbor == destination) for source, destination in zip(path, path[1:]))
+
+@pytest.mark.parametrize("algorithm", [ "dijkstra", "floyd-warshall" ])
+def test_tables_hold_the_lowest_costs_and_paths(france, algorithm):
+    table = DistanceTable.build(france, algorithm)
+    search = UniformCostSearch(france)
+
+    for start_id in range(0, len(france), 3):
+        start = france.get_city_by_id(start_id).name
+
+        for target_id, result in search.perform_many(start).items():
+            target_id = france.get_city_id(target_id)
+            path = table.get_path(start_id, target_id)
+
+            assert table.get_cost(start_id, target_id) == (result.cost if result.success else None)
+            if result.success:
+                assert (path[0], path[-1]) == (start_id, target_id)
+                assert path_cost(france, path) == result.cost
+            else:
+                assert path is None
+
+def test_queries_are_answered_from_the_table(france):
+    result = DistanceTable.build(france).perform("brest", "nice")
+    expected = UniformCostSearch(france).perform("brest", "nice")
+
+    assert (result.success, result.cost) == (True, expected.cost)
+    assert result.expanded == len(result.path)
+    assert not DistanceTable.build(france).perform("brest", "atlantis").success
+
+def test_unknown_algorithms_are_rejected(france):
+    with pytest.raises(ValueError, match="Unknown distance table algorithm"):
+        DistanceTable.build(france, "bellman-ford")
+
+def test_tables_are_only_loaded_for_their_map(france, tmp_path):
+    file_name = str(tmp_path / "france.table")
+    DistanceTable.build(france).save(file_name)
+
+    france.update_edge_cost("nice", "marseille", 1)
+
+    with pytest.raises(ValueError, match="was built for a different map"):
+        DistanceTable.load(file_name, france)
+    with pytest.raises(FileNotFoundError):
+        DistanceTable.load(str(tmp_path / "missing.table"), france)
@@ -0,0 +1,60 @@
+import pytest
+from contraction_hierarchy import ContractionHierarchy
+from csr_graph import CsrGraph
+from distance_table import DistanceTable
+from landmarks import Landmarks
+from snapshot import FORMAT, SnapshotError, load_snapshot, write_snapshot
+
+def test_snapshot_round_trip(france, tmp_path):
+    graph = CsrGraph.from_map(france)
+    file_name = str(tmp_path / "france.snapshot")
+    write_snapshot(graph, file_name)
+
+    loaded = load_snapshot(file_name)
+
+    assert len(loaded) == len(graph)
+    for city_id in range(len(graph)):
+        assert loaded.get_city_by_id(city_id).name == graph.get_city_by_id(city_id).name
+        assert loaded.get_neighbors(city_id) == graph.get_neighbors(city_id)
+
+def test_snapshot_rejects_other_files(france_file, tmp_path):
+    with pytest.raises(SnapshotError, match="not a map snapshot"):
+        load_snapshot(france_file)
+
+    empty = tmp_path / "empty.snapshot"
+    empty.write_bytes(b"")
+    with pytest.raises(SnapshotError, match="too small"):
+        load_snapshot(str(empty))
+
+def test_snapshot_rejects_other_versions(france, tmp_path):
+    file_name = tmp_path / "france.snapshot"
+    write_snapshot(CsrGraph.from_map(france), str(file_name))
+
+    data = bytearray(file_name.read_bytes())
+    data[len(FORMAT.magic)] += 1
+    file_name.write_bytes(bytes(data))
+
+    with pytest.raises(SnapshotError, match="only version 1 is supported"):
+        load_snapshot(str(file_name))
+
+@pytest.mark.parametrize("structure", [ DistanceTable, Landmarks, ContractionHierarchy ])
+def test_structure_round_trip(france, tmp_path, structure):
+    built = structure.build(france)
+    file_name = str(tmp_path / "structure.bin")
+    built.save(file_name)
+
+    loaded = structure.load(file_name, france)
+
+    with open(file_name, "rb") as saved:
+        data = saved.read()
+    loaded.save(file_name)
+    with open(file_name, "rb") as resaved:
+        assert resaved.read() == data
+
+@pytest.mark.parametrize("structure", [ DistanceTable, Landmarks, ContractionHierarchy ])
+def test_structure_rejects_other_formats(france, tmp_path, structure):
+    file_name = str(tmp_path / "france.snapshot")
+    write_snapshot(CsrGraph.from_map(france), file_name)
+
+    with pytest.raises(ValueError, match="Error: The file .* is not a"):
+        structure.load(file_name, france)
@@ -0,0 +1,42 @@
+import pytest
+from astar import AstarSearch
+from haversine_table import HaversineTable
+
+def test_distances_match_the_search(france):
+    table = HaversineTable(france)
+    astar = AstarSearch(france)
+    target_id = france.get_city_id("paris")
+
+    distances = table.get(target_id)
+
+    for city_id in range(len(france)):
+        assert distances[city_id] == pytest.approx(astar.__calculate_distance__(city_id, target_id))
+        assert type(distances[city_id]) is float
+
+def test_distances_are_read_only(france):
+    distances = HaversineTable(france).get(0)
+
+    with pytest.raises(TypeError):
+        distances[0] = 0.0
+
+def test_targets_are_evicted_least_recently_used_first(france):
+    table = HaversineTable(france, max_targets=2)
+
+    first = table.get(0)
+    table.get(1)
+    assert table.get(0) is first
+
+    table.get(2)
+    assert list(table.distances) == [ 0, 2 ]
+
+def test_large_maps_keep_fewer_targets(france):
+    assert HaversineTable(france, max_targets=16, max_distances=4 * len(france)).max_targets == 4
+    assert HaversineTable(france, max_targets=16, max_distances=1).max_targets == 1
+
+def test_distances_are_kept_when_actions_change(france):
+    distances = HaversineTable.for_map(france).get(0)
+
+    france.update_edge_cost("nice", "marseille", 250)
+    france.close_road("limoges", "lyon")
+
+    assert HaversineTable.for_map(france).get(0) is distances
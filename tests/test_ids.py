@@ -0,0 +1,85 @@
+import math
+import random
+import sys
+import pytest
+from action import Action
+from astar import AstarSearch
+from bfs import BreadthFirstSearch
+from city import City
+from ids import IdaStarSearch, IterativeDeepeningSearch
+from map import Map
+from ucs import UniformCostSearch
+
+def line_map(length):
+    """
+    Creates a map of cities joined in a line by actions both ways, far longer than the recursion limit.
+    """
+
+    cities = []
+
+    for i in range(length):
+        city = City(f"c{i}", 45 + i / length, 2 + i / length)
+        city.add_actions([ Action(f"c{j}", 1) for j in (i - 1, i + 1) if 0 <= j < length ])
+        cities.append(city)
+
+    return Map(cities)
+
+def grid_map(size, seed):
+    """
+    Creates a grid of cities joined by actions that never cost less than the haversine distance between
+    their cities, so the estimate of IDA* never overestimates.
+    """
+
+    rng = random.Random(seed)
+    cities = [ City(f"c{x}-{y}", 45 + y / 10, 2 + x / 10) for y in range(size) for x in range(size) ]
+    map = Map(cities)
+    astar = AstarSearch(map)
+
+    for city_id, city in enumerate(cities):
+        x, y = city_id % size, city_id // size
+        neighbors = [ (x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)) if 0 <= x + dx < size and 0 <= y + dy < size ]
+        city.add_actions([ Action(f"c{nx}-{ny}", math.ceil(astar.__calculate_distance__(city_id, ny * size + nx)) + rng.randrange(10)) for nx, ny in neighbors ])
+
+    return Map(cities)
+
+def test_deep_maps_are_searched_without_recursion():
+    length = sys.getrecursionlimit() + 100
+    map = line_map(length)
+
+    for search in (IterativeDeepeningSearch(map, transpositions=True), IdaStarSearch(map)):
+        result = search.perform("c0", f"c{length - 1}")
+
+        assert result.success
+        assert result.cost == length - 1
+        assert [ city.name for city in result.path ] == [ f"c{i}" for i in range(length) ]
+
+@pytest.mark.parametrize("transpositions", [ False, True ])
+def test_iterative_deepening_finds_paths_along_actions_of_the_map(france, transpositions):
+    search = IterativeDeepeningSearch(france, transpositions)
+
+    for start, target in [ ("brest", "nice"), ("nice", "brest"), ("calais", "calais") ]:
+        result = search.perform(start, target)
+
+        assert result.success
+        assert (result.path[0].name, result.path[-1].name) == (start, target)
+        for source, destination in zip(result.path, result.path[1:]):
+            assert destination.name in [ action.destination for action in source.actions ]
+
+def test_transpositions_find_paths_with_the_fewest_actions(france):
+    search = IterativeDeepeningSearch(france, transpositions=True)
+    bfs = BreadthFirstSearch(france)
+
+    for start, target in [ ("brest", "nice"), ("nice", "brest"), ("paris", "toulouse") ]:
+        assert len(search.perform(start, target).path) == len(bfs.perform(start, target).path)
+
+def test_ida_star_finds_the_lowest_costs():
+    map = grid_map(6, 1)
+    search = IdaStarSearch(map)
+    ucs = UniformCostSearch(map)
+
+    for start in [ "c0-0", "c5-5", "c2-3" ]:
+        for target, expected in ucs.perform_many(start).items():
+            result = search.perform(start, target)
+
+            assert (result.success, result.cost) == (expected.success, expected.cost)
+            assert (result.path[0].name, result.path[-1].name) == (start, target)
@@ -0,0 +1,102 @@
+import pytest
+from astar import AltSearch, AstarSearch
+from bfs import BreadthFirstSearch
+from contraction_hierarchy import ContractionHierarchy, ContractionHierarchySearch
+from haversine_table import HaversineTable
+from ids import IdaStarSearch, IterativeDeepeningSearch
+from instrumentation import Instrumentation
+from landmarks import Landmarks
+from search import Search
+from weighted_astar import WeightedAstarSearch
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+
+    yield instrumentation
+
+    instrumentation.disable()
+
+def test_searches_report_while_performed(france, instrumentation):
+    result = AstarSearch(france).perform("brest", "nice")
+    stats = instrumentation.to_dict()["astar"]
+
+    assert stats["searches"] == 1
+    assert stats["expanded"] > 0
+    assert stats["peak_frontier"] >= result.maintained
+    assert instrumentation.current_method is None
+
+@pytest.mark.parametrize("search_type", [ AltSearch, WeightedAstarSearch, IdaStarSearch ])
+def test_precomputation_is_not_counted(france, instrumentation, search_type):
+    AstarSearch(france).perform("brest", "nice")
+    before = instrumentation.to_dict()["astar"]["expanded"]
+
+    search = search_type(france)
+
+    assert search.map is france
+    assert instrumentation.to_dict()["astar"]["expanded"] == before
+    assert list(instrumentation.to_dict()) == [ "astar" ]
+
+def test_structures_are_shared_with_the_map(france, instrumentation):
+    AltSearch(france).perform("brest", "nice")
+    landmarks = Landmarks.for_map(france)
+    table = HaversineTable.for_map(france)
+
+    AltSearch(france).perform("paris", "nice")
+    AstarSearch(france).perform("paris", "nice")
+
+    assert Landmarks.for_map(france) is landmarks
+    assert HaversineTable.for_map(france) is table
+    assert landmarks.map is france
+
+def test_failed_searches_stop_reporting(france, instrumentation):
+    search = AstarSearch(france)
+    search.__estimate__ = None
+
+    with pytest.raises(TypeError):
+        search.perform("brest", "nice")
+
+    assert instrumentation.current_method is None
+    assert search.map is france
+
+@pytest.mark.parametrize("search_type", [ BreadthFirstSearch, IterativeDeepeningSearch, IdaStarSearch ])
+def test_frontiers_without_priorities_record_their_peak(france, instrumentation, search_type):
+    search_type(france).perform("brest", "nice")
+
+    assert instrumentation.to_dict()[search_type.name]["peak_frontier"] > 0
+
+def test_disabled_searches_are_left_alone(france):
+    search = BreadthFirstSearch(france)
+
+    assert Search.instrumentation is None
+    assert search.queue_type is Search.queue_type
+
+def test_lazy_paths_are_timed_as_the_path_phase(france, instrumentation):
+    result = AstarSearch(france).perform("brest", "nice")
+    stats = instrumentation.to_dict()["astar"]
+
+    assert result.cities is not None
+    assert stats["calls"]["path"] == 1
+    assert stats["seconds"]["path"] > 0
+
+def test_hierarchy_queries_report_their_expansions(france):
+    expanded = []
+    instrumentation = Instrumentation(on_expand=lambda method, city_id: expanded.append(method))
+    hierarchy = ContractionHierarchy.build(france)
+    instrumentation.enable()
+
+    try:
+        search = ContractionHierarchySearch(france, hierarchy)
+        result = search.perform("brest", "nice")
+    finally:
+        instrumentation.disable()
+
+    assert instrumentation.to_dict()["ch"]["expanded"] == result.expanded
+    assert expanded == [ "ch" ] * result.expanded
+    assert search.hierarchy is hierarchy
+
+def test_ida_star_estimates_are_timed(france, instrumentation):
+    IdaStarSearch(france).perform("brest", "nice")
+
+    assert instrumentation.to_dict()["idastar"]["calls"]["heuristic"] > 0
@@ -0,0 +1,40 @@
+import math
+import pytest
+from astar import AltSearch
+from distance_table import DistanceTable
+from landmarks import Landmarks
+from ucs import UniformCostSearch
+
+@pytest.mark.parametrize("count", [ 1, 4 ])
+def test_lower_bounds_never_overestimate(france, count):
+    landmarks = Landmarks.build(france, count)
+    table = DistanceTable.build(france)
+
+    assert len(landmarks.landmark_ids) == count
+    for current in range(len(france)):
+        for target in range(len(france)):
+            cost = table.get_cost(current, target)
+
+            assert landmarks.lower_bound(current, target) <= (math.inf if cost is None else cost)
+
+def test_alt_finds_the_lowest_costs(france):
+    alt = AltSearch(france, Landmarks.build(france, 4))
+    ucs = UniformCostSearch(france)
+
+    for start in ("brest", "nice", "paris"):
+        for target_id in range(len(france)):
+            target = france.get_city_by_id(target_id).name
+            result = alt.perform(start, target)
+            expected = ucs.perform(start, target)
+
+            assert (result.success, result.cost) == (expected.success, expected.cost)
+
+def test_saved_landmarks_give_the_same_bounds(france, tmp_path):
+    landmarks = Landmarks.build(france, 3)
+    file_name = str(tmp_path / "france.landmarks")
+    landmarks.save(file_name)
+
+    loaded = Landmarks.load(file_name, france)
+
+    assert list(loaded.landmark_ids) == list(landmarks.landmark_ids)
+    assert all(loaded.lower_bound(0, target) == landmarks.lower_bound(0, target) for target in range(len(france)))
@@ -0,0 +1,26 @@
+import pytest
+from csr_graph import CsrGraph
+from main import load_map
+from map import Map
+from snapshot import is_snapshot, write_snapshot
+
+@pytest.mark.parametrize("compact", [ False, True ])
+def test_missing_maps_are_reported(tmp_path, compact):
+    file_name = str(tmp_path / "missing.txt")
+
+    with pytest.raises(FileNotFoundError, match=f"Error: The map file '{file_name}' does not exist."):
+        load_map(file_name, compact)
+
+def test_missing_files_are_not_snapshots(tmp_path):
+    assert not is_snapshot(str(tmp_path / "missing.snapshot"))
+    assert not is_snapshot(str(tmp_path))
+
+def test_maps_and_snapshots_are_told_apart(france_file, tmp_path):
+    assert isinstance(load_map(france_file), Map)
+    assert isinstance(load_map(france_file, compact=True), CsrGraph)
+
+    snapshot_file = str(tmp_path / "france.snapshot")
+    write_snapshot(CsrGraph.from_file(france_file), snapshot_file)
+
+    assert is_snapshot(snapshot_file)
+    assert len(load_map(snapshot_file)) == len(load_map(france_file))
@@ -0,0 +1,96 @@
+import random
+from action import Action
+from city import City
+from lpastar import LpaStarSearch
+from search import follow_lowest_costs
+from map import Map
+from ucs import UniformCostSearch
+from zero_cost import zero_cost_map
+
+def test_paths_are_followed_through_zero_cost_circles():
+    map = zero_cost_map()
+    costs = { "s": 0, "a": 1, "b": 1, "c": 1, "d": 1, "t": 2 }
+
+    path = follow_lowest_costs(map, map.get_city_id("s"), map.get_city_id("t"), lambda city_id: costs[map.get_city_by_id(city_id).name])
+
+    assert [ map.get_city_by_id(city_id).name for city_id in path ] == [ "s", "a", "b", "c", "t" ]
+
+def test_costs_that_lead_nowhere_have_no_path():
+    map = zero_cost_map()
+    costs = { "s": 0, "a": 5, "b": 1, "c": 1, "d": 1, "t": 2 }
+
+    assert follow_lowest_costs(map, map.get_city_id("s"), map.get_city_id("t"), lambda city_id: costs[map.get_city_by_id(city_id).name]) is None
+
+def test_lpastar_finds_paths_through_zero_cost_actions():
+    result = LpaStarSearch(zero_cost_map()).perform("s", "t")
+
+    assert result.success
+    assert result.cost == 2
+    assert [ city.name for city in result.path ] == [ "s", "a", "b", "c", "t" ]
+
+def test_lpastar_repairs_match_new_searches(france):
+    generator = random.Random(331)
+    planner = LpaStarSearch(france)
+    ucs = UniformCostSearch(france)
+
+    for _ in range(20):
+        city = france.get_city_by_id(generator.randrange(len(france)))
+        action = generator.choice(city.actions)
+        france.update_edge_cost(city.name, action.destination, generator.randint(0, 2 * action.cost))
+
+        result = planner.perform("brest", "nice")
+        expected = ucs.perform("brest", "nice")
+
+        assert result.cost == expected.cost
+        assert path_cost(result.path) == result.cost
+
+def test_lpastar_repairs_increases_behind_zero_cost_actions():
+    cities = [ City("c3", 45, 2), City("c2", 45, 2), City("c1", 45, 2) ]
+    cities[0].add_actions([ Action("c2", 2), Action("c1", 3) ])
+    cities[1].add_actions([ Action("c1", 0) ])
+    map = Map(cities)
+    planner = LpaStarSearch(map)
+
+    assert [ city.name for city in planner.perform("c3", "c1").path ] == [ "c3", "c2", "c1" ]
+
+    # c2 now has the same key as c1, so its increase has to be expanded before c1 is done.
+    map.close_road("c3", "c2")
+    result = planner.perform("c3", "c1")
+
+    assert result.cost == LpaStarSearch(map).perform("c3", "c1").cost == 3
+    assert [ city.name for city in result.path ] == [ "c3", "c1" ]
+
+def test_lpastar_repairs_match_new_searches_with_zero_cost_actions():
+    generator = random.Random(242)
+
+    for _ in range(100):
+        cities = [ City(f"c{i}", 45 + generator.random(), 2 + generator.random()) for i in range(6) ]
+        for city in cities:
+            destinations = generator.sample([ other.name for other in cities if other is not city ], 3)
+            city.add_actions([ Action(destination, generator.randint(0, 2)) for destination in destinations ])
+
+        map = Map(cities)
+        planner = LpaStarSearch(map)
+        planner.perform("c0", "c1")
+
+        for _ in range(5):
+            city = generator.choice(cities)
+            destination = generator.choice(city.actions).destination
+
+            if (city.id, map.get_city_id(destination)) in map.closed_roads:
+                map.reopen_road(city.name, destination)
+            elif generator.random() < 0.5:
+                map.close_road(city.name, destination)
+            else:
+                map.update_edge_cost(city.name, destination, generator.randint(0, 3))
+
+            result = planner.perform("c0", "c1")
+            expected = LpaStarSearch(map).perform("c0", "c1")
+
+            assert (result.success, result.cost) == (expected.success, expected.cost)
+            assert (result.path is None) == (not result.success)
+            if result.success:
+                assert path_cost(result.path) == result.cost
+
+def path_cost(path):
+    return sum(min(action.cost for action in source.actions if action.destination == destination.name) for source, destination in zip(path, path[1:]))
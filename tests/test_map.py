@@ -0,0 +1,32 @@
+import pytest
+from action import Action
+from city import City
+from map import Map
+
+def test_cities_are_indexed_by_name_and_id(france):
+    city_id = france.get_city_id("paris")
+    city = france.get_city("paris")
+
+    assert city.id == city_id
+    assert france.get_city_by_id(city_id) is city
+    assert france.get_city("atlantis") is None
+    assert france.get_city_id("atlantis") is None
+
+def test_neighbors_follow_the_actions_of_every_city(france):
+    for city_id in range(len(france)):
+        city = france.get_city_by_id(city_id)
+
+        assert [ (france.get_city_by_id(neighbor).name, cost) for neighbor, cost in france.get_neighbors(city_id) ] \
+            == [ (action.destination, action.cost) for action in city.actions ]
+
+def test_reverse_neighbors_lead_back(france):
+    for city_id in range(len(france)):
+        for neighbor, cost in france.get_neighbors(city_id):
+            assert (city_id, cost) in france.get_reverse_neighbors(neighbor)
+
+def test_actions_to_unknown_cities_are_rejected():
+    city = City("a", 1.0, 2.0)
+    city.add_action(Action("b", 1))
+
+    with pytest.raises(ValueError, match="unknown city 'b'"):
+        Map([ city ])
@@ -0,0 +1,47 @@
+from contraction_hierarchy import ContractionHierarchy
+from haversine_table import HaversineTable
+from instrumentation import Instrumentation, InstrumentedMap
+from landmarks import Landmarks
+from map_cache import MapCache
+from spatial_index import SpatialIndex
+
+def test_structures_are_kept_per_map(france):
+    cache = MapCache()
+    built = []
+
+    def build(map):
+        built.append(map)
+        return object()
+
+    structure = cache.get_or_build(france, build)
+
+    assert cache.get_or_build(france, build) is structure
+    assert built == [ france ]
+
+def test_changed_maps_get_new_structures(france):
+    table = HaversineTable.for_map(france)
+    hierarchy = ContractionHierarchy.for_map(france)
+    index = SpatialIndex.for_map(france)
+
+    france.update_edge_cost("nice", "marseille", 250)
+
+    assert ContractionHierarchy.for_map(france) is not hierarchy
+    # The coordinates of the cities never change, so the table and the index are kept.
+    assert HaversineTable.for_map(france) is table
+    assert SpatialIndex.for_map(france) is index
+
+def test_wrappers_share_the_structures_of_their_map(france):
+    wrapper = InstrumentedMap(france, Instrumentation())
+
+    table = HaversineTable.for_map(wrapper)
+
+    assert table is HaversineTable.for_map(france)
+    assert table.map is france
+    assert wrapper.underlying_map is france
+
+def test_registered_structures_are_used(france):
+    landmarks = Landmarks.build(france, 2)
+    landmarks.register()
+
+    assert Landmarks.for_map(france) is landmarks
+    assert Landmarks.for_map(InstrumentedMap(france, Instrumentation())) is landmarks
@@ -0,0 +1,40 @@
+import pytest
+from csr_graph import CsrGraph
+from map import Map, MapFormatError
+
+LOADERS = [ Map.from_file, CsrGraph.from_file ]
+
+def write_map(tmp_path, text):
+    file_name = tmp_path / "map.txt"
+    file_name.write_text(text)
+
+    return str(file_name)
+
+@pytest.mark.parametrize("load", LOADERS)
+def test_maps_are_loaded_the_same_by_every_loader(france_file, load):
+    map = load(france_file)
+    reference = Map.from_file(france_file)
+
+    assert len(map) == len(reference)
+    for city_id in range(len(map)):
+        assert map.get_city_by_id(city_id).name == reference.get_city_by_id(city_id).name
+        assert list(map.get_neighbors(city_id)) == reference.get_neighbors(city_id)
+
+@pytest.mark.parametrize("load", LOADERS)
+def test_duplicate_cities_are_rejected(tmp_path, load):
+    file_name = write_map(tmp_path, "a 1 0 0 N 1 0 0 E --> va-b 1\nb 2 0 0 N 2 0 0 E --> va-a 1\n\nA 3 0 0 N 3 0 0 E --> va-b 2\n")
+
+    with pytest.raises(MapFormatError, match=r"line 4: the city 'a' is defined more than once") as error:
+        load(file_name)
+
+    assert error.value.line_number == 4
+
+@pytest.mark.parametrize("load", LOADERS)
+@pytest.mark.parametrize("text, message", [
+    ("a 1 0 0 N 1 0 0 E va-b 1\n", "separated by '-->'"),
+    ("a 1 0 0 N 1 0 0 E --> va-b 1\n", "never defined"),
+    ("a 1 0 0 N 1 0 0 E --> va-b x\nb 2 0 0 N 2 0 0 E --> va-a 1\n", "line 1")
+])
+def test_malformed_maps_are_rejected(tmp_path, load, text, message):
+    with pytest.raises(MapFormatError, match=message):
+        load(write_map(tmp_path, text))
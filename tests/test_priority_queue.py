@@ -0,0 +1,45 @@
+import pytest
+from priority_queue import PriorityQueue
+
+def test_items_are_popped_by_priority():
+    queue = PriorityQueue()
+
+    for item, priority in [ ("c", 3), ("a", 1), ("d", 4), ("b", 2) ]:
+        queue.push(item, priority)
+
+    assert [ queue.pop() for _ in range(len(queue)) ] == [ "a", "b", "c", "d" ]
+    assert not queue
+
+def test_ties_are_popped_in_the_order_items_were_first_added():
+    queue = PriorityQueue()
+
+    for item in "xyz":
+        queue.push(item, 1)
+    queue.push("x", 1)
+
+    assert [ queue.pop() for _ in range(3) ] == [ "x", "y", "z" ]
+
+def test_priorities_can_be_updated():
+    queue = PriorityQueue()
+    queue.push("a", 5)
+    queue.push("b", 3)
+    queue.push("a", 1)
+
+    assert len(queue) == 2
+    assert queue.peek() == ("a", 1)
+    assert queue.pop() == "a"
+    assert "a" not in queue
+    assert queue.pop() == "b"
+
+def test_removed_items_are_skipped():
+    queue = PriorityQueue()
+    queue.push("a", 1)
+    queue.push("b", 2)
+    queue.remove("a")
+
+    assert "a" not in queue
+    assert queue.pop() == "b"
+
+def test_empty_queues_raise():
+    with pytest.raises(IndexError):
+        PriorityQueue().pop()
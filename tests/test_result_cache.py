@@ -0,0 +1,45 @@
+import pytest
+from main import perform_search
+from result_cache import ResultCache
+from search_result import SearchResult
+
+def result(target):
+    return SearchResult("ucs", "brest", target)
+
+def test_least_recently_used_results_are_evicted():
+    cache = ResultCache(2)
+    cache.put((0, "ucs", "brest", "nice"), result("nice"))
+    cache.put((0, "ucs", "brest", "paris"), result("paris"))
+    cache.get((0, "ucs", "brest", "nice"))
+    cache.put((0, "ucs", "brest", "lyon"), result("lyon"))
+
+    assert cache.get((0, "ucs", "brest", "paris")) is None
+    assert cache.get((0, "ucs", "brest", "nice")).target == "nice"
+    assert cache.stats() == { "size": 2, "hits": 2, "misses": 1, "evictions": 1, "expirations": 0 }
+
+def test_results_expire(monkeypatch):
+    now = [ 100.0 ]
+    monkeypatch.setattr("result_cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl=5)
+    cache.put((0, "ucs", "brest", "nice"), result("nice"))
+
+    now[0] += 4
+    assert cache.get((0, "ucs", "brest", "nice")) is not None
+
+    now[0] += 2
+    assert cache.get((0, "ucs", "brest", "nice")) is None
+    assert cache.stats()["expirations"] == 1
+
+def test_results_of_changed_maps_are_not_returned(france):
+    cache = ResultCache()
+    first = perform_search("ucs", "brest", "nice", france, cache)
+
+    assert perform_search("ucs", "brest", "nice", france, cache) is first
+
+    france.update_edge_cost(first.path[-2].name, "nice", 1000)
+
+    assert perform_search("ucs", "brest", "nice", france, cache) is not first
+
+def test_sizes_must_be_positive():
+    with pytest.raises(ValueError):
+        ResultCache(0)
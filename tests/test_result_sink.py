@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import pytest
+from result_sink import CSV_FIELDS, ResultSink, ResultStats
+from search_result import SearchResult
+from ucs import UniformCostSearch
+
+def results(france):
+    search = UniformCostSearch(france)
+
+    return [ search.perform("brest", "nice"), search.perform("paris", "paris"), SearchResult("bfs", "nice", "atlantis", explored=1) ]
+
+class CountingFile(io.StringIO):
+    """
+    Represents a text file that counts how many times it is written to.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text : str) -> int:
+        self.writes += 1
+
+        return super().write(text)
+
+def test_text_matches_the_format_of_solutions(france):
+    file = io.StringIO()
+
+    with ResultSink(file) as sink:
+        sink.add_all(results(france))
+
+    assert file.getvalue() == "\n\n".join(str(result) for result in results(france)) + "\n"
+
+def test_json_lines_hold_one_result_each(france):
+    file = io.StringIO()
+
+    with ResultSink(file, "jsonl") as sink:
+        sink.add_all(results(france))
+
+    assert [ json.loads(line) for line in file.getvalue().splitlines() ] == [ result.to_dict() for result in results(france) ]
+
+def test_csv_rows_hold_one_result_each(france):
+    file = io.StringIO()
+
+    with ResultSink(file, "csv") as sink:
+        sink.add_all(results(france))
+
+    rows = list(csv.reader(io.StringIO(file.getvalue())))
+
+    assert rows[0] == list(CSV_FIELDS)
+    assert len(rows) == 4
+    assert rows[1][4] == " ".join(results(france)[0].get_path_names())
+    assert rows[3][3:5] == [ "False", "" ]
+
+def test_results_are_written_in_chunks(france):
+    file = CountingFile()
+    sink = ResultSink(file, "jsonl", buffer_size=10)
+
+    sink.add_all(results(france) * 7)
+
+    assert file.writes == 2
+    assert len(file.getvalue().splitlines()) == 20
+
+    sink.close()
+
+    assert file.writes == 3
+    assert len(file.getvalue().splitlines()) == 21
+
+def test_unknown_formats_are_rejected():
+    with pytest.raises(ValueError):
+        ResultSink(io.StringIO(), "xml")
+
+def test_stats_average_and_count_the_lowest_costs():
+    stats = ResultStats([ "bfs", "ucs", "dls" ])
+    stats.add_all([
+        SearchResult("bfs", "a", "b", True, cost=10, explored=4, expanded=2, maintained=1),
+        SearchResult("ucs", "a", "b", True, cost=8, explored=6, expanded=4, maintained=3),
+        SearchResult("bfs", "a", "c", True, cost=5, explored=2, expanded=2, maintained=0),
+        SearchResult("ucs", "a", "c", True, cost=5, explored=4, expanded=2, maintained=1)
+    ])
+
+    assert stats.get_averages("bfs") == (3.0, 2.0, 0.5)
+    assert stats.get_averages("ucs") == (5.0, 3.0, 2.0)
+    assert stats.get_averages("dls") == (0.0, 0.0, 0.0)
+    assert stats.get_optimal_counts() == { "bfs": 1, "ucs": 2, "dls": 0 }
+
+    file = io.StringIO()
+    stats.write(file)
+
+    assert file.getvalue().startswith("Method: bfs\nAverage Explored: 3.0\nAverage Expanded: 2.0\nAverage Maintained: 0.5\nOptimal Solutions: 1\n\n")
+    assert "Method: dls" in file.getvalue()
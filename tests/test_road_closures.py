@@ -0,0 +1,90 @@
+import math
+import pytest
+from contraction_hierarchy import ContractionHierarchy
+from csr_graph import CsrGraph
+from distance_table import DistanceTable
+from landmarks import Landmarks
+from lpastar import LpaStarSearch
+from snapshot import load_snapshot, write_snapshot
+from ucs import UniformCostSearch
+
+def neighbor_names(map, name):
+    return { map.get_city_by_id(neighbor).name: cost for neighbor, cost in map.get_neighbors(map.get_city_id(name)) }
+
+def test_closed_roads_are_left_out_until_reopened(france):
+    france.get_reverse_neighbors(0)
+    version = france.version
+
+    france.close_road("nice", "marseille")
+
+    assert "marseille" not in neighbor_names(france, "nice")
+    assert france.get_city_id("nice") not in dict(france.get_reverse_neighbors(france.get_city_id("marseille")))
+    assert france.version != version
+
+    france.reopen_road("nice", "marseille")
+
+    assert neighbor_names(france, "nice")["marseille"] == 197
+    assert dict(france.get_reverse_neighbors(france.get_city_id("marseille")))[france.get_city_id("nice")] == 197
+
+def test_reverse_neighbors_match_a_new_map_after_changes(france):
+    france.get_reverse_neighbors(0)
+
+    france.close_road("toulouse", "bordeaux")
+    france.update_edge_cost("toulouse", "montpellier", 300)
+    france.close_road("limoges", "toulouse")
+    france.reopen_road("toulouse", "bordeaux")
+
+    built = france.reverse_neighbors
+    france.reverse_neighbors = None
+
+    assert [ france.get_reverse_neighbors(city_id) for city_id in range(len(france)) ] == built
+
+@pytest.mark.parametrize("cost", [ math.inf, 1.5, -1, True ])
+def test_costs_must_be_non_negative_integers(france, cost):
+    with pytest.raises(ValueError, match="non-negative integer"):
+        france.update_edge_cost("nice", "marseille", cost)
+
+def test_derived_structures_can_be_built_and_saved_with_closed_roads(france, tmp_path):
+    france.close_road("nice", "marseille")
+    france.close_road("marseille", "nice")
+
+    graph = CsrGraph.from_map(france)
+    write_snapshot(graph, str(tmp_path / "france.snapshot"))
+    assert load_snapshot(str(tmp_path / "france.snapshot")).get_neighbors(france.get_city_id("nice")) == france.get_neighbors(france.get_city_id("nice"))
+
+    for structure in (DistanceTable, Landmarks, ContractionHierarchy):
+        file_name = str(tmp_path / f"{structure.__name__}.bin")
+        structure.build(france).save(file_name)
+        structure.load(file_name, france)
+
+    table = DistanceTable.build(france)
+    ucs = UniformCostSearch(france)
+    start_id = france.get_city_id("marseille")
+
+    for target_id in range(len(france)):
+        result = ucs.perform("marseille", france.get_city_by_id(target_id).name)
+        assert table.get_cost(start_id, target_id) == (result.cost if result.success else None)
+
+def test_lpastar_replans_around_closed_roads(france):
+    planner = LpaStarSearch(france)
+    first = planner.perform("nice", "paris")
+    ucs = UniformCostSearch(france)
+
+    # Close the first road of the path that has a way around it.
+    for source, destination in zip(first.path, first.path[1:]):
+        france.close_road(source.name, destination.name)
+
+        if ucs.perform("nice", "paris").success:
+            break
+
+        france.reopen_road(source.name, destination.name)
+
+    closed = planner.perform("nice", "paris")
+
+    assert closed.success
+    assert closed.cost == ucs.perform("nice", "paris").cost
+    assert closed.cost > first.cost
+
+    france.reopen_road(source.name, destination.name)
+
+    assert planner.perform("nice", "paris").cost == first.cost
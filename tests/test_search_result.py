@@ -0,0 +1,63 @@
+import pickle
+from search_result import SearchResult
+from ucs import UniformCostSearch
+
+def test_paths_set_as_parents_are_only_built_when_read(france):
+    parents = { 0: None, 3: 0, 5: 3 }
+    result = SearchResult("ucs", "a", "b", True)
+    result.set_path_parents(france, parents, 5)
+
+    assert result.cities is None
+    assert result.get_path_names() == [ france.get_city_by_id(city_id).name for city_id in (0, 3, 5) ]
+    assert result.cities is None
+    assert [ city.id for city in result.path ] == [ 0, 3, 5 ]
+
+def test_compact_results_let_go_of_the_parents(france):
+    result = SearchResult("ucs", "a", "b", True)
+    result.set_path_parents(france, { 0: None, 3: 0 }, 3)
+    result.compact()
+
+    assert result.parents is None
+    assert result.city_ids == [ 0, 3 ]
+
+def test_results_survive_pickling(france):
+    result = UniformCostSearch(france).perform("brest", "nice")
+    result.bound = 1.5
+    copy = pickle.loads(pickle.dumps(result))
+
+    assert copy == result
+    assert [ (city.id, city.name, city.latitude, city.longitude) for city in copy.path ] \
+        == [ (city.id, city.name, city.latitude, city.longitude) for city in result.path ]
+    assert all(city.actions == [] for city in copy.path)
+    assert SearchResult.from_tuple(result.to_tuple()) == result
+
+def test_failed_results_survive_pickling():
+    result = SearchResult("bfs", "atlantis", "paris", explored=1)
+
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert pickle.loads(pickle.dumps(result)).path is None
+
+def test_results_are_written_like_solutions():
+    result = SearchResult("bfs", "atlantis", "paris", explored=1)
+
+    assert str(result) == "atlantis -> paris\nMethod: bfs\nResult: Failure\nPath: None\nCost: 0\nExplored: 1\nExpanded: 0\nMaintained: 0"
+
+    result.bound = 1.25
+
+    assert str(result).endswith("\nMaintained: 0\nBound: 1.250")
+
+def test_results_convert_to_dictionaries(france):
+    result = UniformCostSearch(france).perform("paris", "paris")
+
+    assert result.to_dict() == {
+        "method": "ucs",
+        "start": "paris",
+        "target": "paris",
+        "success": True,
+        "path": [ "paris" ],
+        "cost": 0,
+        "explored": result.explored,
+        "expanded": result.expanded,
+        "maintained": result.maintained,
+        "bound": None
+    }
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from main import init_batch_worker
+from server import RoutingServer
+
+class Writer:
+    """
+    Collects the responses a server writes.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, data):
+        self.lines.append(json.loads(data))
+
+    async def drain(self):
+        pass
+
+@pytest.fixture
+def respond(france_file):
+    init_batch_worker(france_file, False)
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    def respond(request):
+        server = RoutingServer(executor, 1)
+        writer = Writer()
+        line = request if isinstance(request, bytes) else json.dumps(request).encode()
+        asyncio.run(server.respond(line, writer))
+
+        return writer.lines[0]
+
+    yield respond
+
+    executor.shutdown()
+
+def test_queries_are_answered(respond):
+    response = respond({ "id": 1, "start": "Brest", "target": "nice" })
+
+    assert response["id"] == 1
+    assert response["result"]["success"]
+    assert response["result"]["path"][0] == "brest"
+
+@pytest.mark.parametrize("request_id", [ 7, "query-7", [ 7 ] ])
+@pytest.mark.parametrize("query", [
+    { "target": "nice" },
+    { "start": "brest", "target": "nice", "method": "unknown" },
+    { "start": "brest", "target": "atlantis" }
+])
+def test_errors_echo_the_request_id(respond, query, request_id):
+    response = respond({ **query, "id": request_id })
+
+    assert response["id"] == request_id
+    assert response["error"].startswith("Error:")
+    assert "result" not in response
+
+@pytest.mark.parametrize("line", [ b"not json", b"[1, 2]", b"\xff" ])
+def test_requests_that_are_not_objects_have_no_id(respond, line):
+    response = respond(line)
+
+    assert response["id"] is None
+    assert response["error"].startswith("Error:")
@@ -0,0 +1,84 @@
+import math
+import random
+import pytest
+from city import City
+from haversine_table import EARTH_RADIUS
+from main import snap_to_city
+from map import Map
+from spatial_index import SpatialIndex
+
+def scattered_map(count, seed):
+    """
+    Creates a map of cities without actions scattered over the whole globe, poles and antimeridian included.
+    """
+
+    rng = random.Random(seed)
+    cities = [ City(f"c{i}", math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)) for i in range(count) ]
+    cities += [ City("north", 90, 0), City("south", -90, 45), City("east", 10, 180), City("west", 10, -179.9) ]
+
+    return Map(cities)
+
+def distances_from(map, latitude, longitude):
+    """
+    Calculates the haversine distance from a point to every city one by one, as a reference.
+    """
+
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    distances = []
+
+    for city_id in range(len(map)):
+        city_latitude, city_longitude = map.get_radians(city_id)
+        a = math.sin((city_latitude - latitude) / 2)**2 + math.cos(latitude) * math.cos(city_latitude) * math.sin((city_longitude - longitude) / 2)**2
+        distances.append((EARTH_RADIUS * 2 * math.asin(min(1.0, math.sqrt(a))), city_id))
+
+    return sorted(distances)
+
+POINTS = [ (0, 0), (89.9, 120), (-89.5, -10), (10, 179.95), (45, -180), (48.85, 2.35) ]
+
+@pytest.mark.parametrize("latitude, longitude", POINTS)
+def test_nearest_cities_match_a_linear_scan(latitude, longitude):
+    map = scattered_map(3000, 1)
+    expected = distances_from(map, latitude, longitude)
+
+    for k in (1, 5, 40):
+        found = SpatialIndex(map).nearest(latitude, longitude, k)
+
+        assert [ city_id for city_id, _ in found ] == [ city_id for _, city_id in expected[:k] ]
+        assert [ distance for _, distance in found ] == pytest.approx([ distance for distance, _ in expected[:k] ])
+
+@pytest.mark.parametrize("latitude, longitude", POINTS)
+def test_cities_within_a_radius_match_a_linear_scan(latitude, longitude):
+    map = scattered_map(3000, 2)
+    index = SpatialIndex(map, leaf_size=4)
+
+    distances = distances_from(map, latitude, longitude)
+
+    for radius in (0, 300, 2500):
+        found = index.within(latitude, longitude, radius)
+        # Cities so close to the radius that rounding could put them on either side may or may not be found.
+        expected = [ city_id for distance, city_id in distances if distance <= radius - 1e-6 ]
+        edge = [ city_id for distance, city_id in distances if abs(distance - radius) <= 1e-6 ]
+
+        assert set(expected) <= { city_id for city_id, _ in found } <= set(expected) | set(edge)
+        assert [ distance for _, distance in found ] == sorted(distance for _, distance in found)
+
+def test_lookups_of_empty_requests_find_nothing(france):
+    index = SpatialIndex(france)
+
+    assert index.nearest(45, 2, 0) == []
+    assert index.within(45, 2, -1) == []
+    assert len(index.nearest(45, 2, 100)) == len(france)
+
+    with pytest.raises(ValueError):
+        index.nearest(91, 0)
+
+def test_points_snap_to_the_nearest_city(france):
+    latitude, longitude = france.get_coordinates(france.get_city_id("lyon"))
+
+    assert snap_to_city(france, [ latitude + 0.01, longitude - 0.01 ]) == "lyon"
+
+def test_indexes_are_kept_when_actions_change(france):
+    index = SpatialIndex.for_map(france)
+    france.update_edge_cost("limoges", "lyon", 1)
+
+    assert SpatialIndex.for_map(france) is index
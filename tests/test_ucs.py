@@ -0,0 +1,71 @@
+import math
+import pytest
+from astar import AstarSearch
+from ucs import UniformCostSearch
+
+def lowest_costs(map, start_id):
+    """
+    Finds the lowest cost from the start to every city with the Bellman-Ford algorithm, as a reference.
+    """
+
+    costs = [ math.inf ] * len(map)
+    costs[start_id] = 0
+
+    for _ in range(len(map)):
+        changed = False
+
+        for city_id in range(len(map)):
+            for neighbor, cost in map.get_neighbors(city_id):
+                if costs[city_id] + cost < costs[neighbor]:
+                    costs[neighbor] = costs[city_id] + cost
+                    changed = True
+
+        if not changed:
+            return costs
+
+@pytest.mark.parametrize("start", [ "brest", "nice", "paris" ])
+def test_lowest_costs_are_found(france, start):
+    costs = lowest_costs(france, france.get_city_id(start))
+    search = UniformCostSearch(france)
+
+    for target_id in range(len(france)):
+        result = search.perform(start, france.get_city_by_id(target_id).name)
+
+        assert result.success == (costs[target_id] < math.inf)
+        if result.success:
+            assert result.cost == costs[target_id]
+            assert result.path[0].name == start
+            assert result.path[-1].id == target_id
+
+def test_astar_finds_paths_no_cheaper_than_the_lowest_cost(france):
+    costs = lowest_costs(france, france.get_city_id("brest"))
+    result = AstarSearch(france).perform("brest", "nice")
+
+    assert result.success
+    assert result.cost >= costs[france.get_city_id("nice")]
+
+def test_one_to_many_searches_match_single_searches(france):
+    search = UniformCostSearch(france)
+    targets = [ "nice", "paris", "brest", "atlantis", "calais" ]
+
+    results = search.perform_many("brest", targets)
+
+    assert set(results) == set(targets)
+    for target in targets:
+        assert results[target] == search.perform("brest", target)
+
+def test_one_to_many_searches_default_to_every_city(france):
+    results = UniformCostSearch(france).perform_many("nice")
+
+    assert len(results) == len(france)
+
+@pytest.mark.parametrize("reverse", [ False, True ])
+def test_search_trees_hold_the_lowest_costs(france, reverse):
+    start_id = france.get_city_id("paris")
+    costs, parents = UniformCostSearch(france).search_tree(start_id, reverse)
+
+    for city_id in range(len(france)):
+        expected = lowest_costs(france, city_id)[start_id] if reverse else lowest_costs(france, start_id)[city_id]
+
+        assert costs[city_id] == expected
+        assert (parents[city_id] is None) == (city_id == start_id or expected == math.inf)
@@ -0,0 +1,61 @@
+import pytest
+from main import configure_bounded_searches, search_factory
+from ucs import UniformCostSearch
+from weighted_astar import AraStarSearch, WeightedAstarSearch
+
+STARTS = [ "brest", "nice", "paris", "strasbourg" ]
+
+def lowest_costs(map):
+    ucs = UniformCostSearch(map)
+
+    return { (start, target): result.cost for start in STARTS for target, result in ucs.perform_many(start).items() if result.success }
+
+@pytest.mark.parametrize("epsilon", [ 0, 0.5, 3 ])
+def test_weighted_paths_cost_at_most_the_bound(france, epsilon):
+    search = WeightedAstarSearch(france, epsilon)
+
+    for (start, target), lowest_cost in lowest_costs(france).items():
+        result = search.perform(start, target)
+
+        assert result.success
+        assert result.bound == 1 + epsilon
+        assert lowest_cost <= result.cost <= result.bound * lowest_cost
+
+def test_anytime_paths_cost_at_most_the_bound(france):
+    search = AraStarSearch(france, epsilon=5, deadline=0)
+
+    for (start, target), lowest_cost in lowest_costs(france).items():
+        result = search.perform(start, target)
+
+        assert result.success
+        assert 1 <= result.bound <= 6
+        assert lowest_cost <= result.cost <= result.bound * lowest_cost
+        assert (result.path[0].name, result.path[-1].name) == (start, target)
+
+def test_anytime_searches_reach_the_lowest_cost_given_time(france):
+    search = AraStarSearch(france, epsilon=5, deadline=60)
+
+    for (start, target), lowest_cost in lowest_costs(france).items():
+        result = search.perform(start, target)
+
+        assert result.bound == 1
+        assert result.cost == lowest_cost
+
+def test_unreachable_targets_have_no_bound(france):
+    france.close_road("nice", "marseille")
+
+    for search in (WeightedAstarSearch(france), AraStarSearch(france)):
+        result = search.perform("nice", "paris")
+
+        assert not result.success
+        assert result.bound is None
+
+def test_searches_are_configured_from_the_command_line(france, monkeypatch):
+    monkeypatch.setattr(WeightedAstarSearch, "epsilon", WeightedAstarSearch.epsilon)
+    monkeypatch.setattr(AraStarSearch, "epsilon", AraStarSearch.epsilon)
+    monkeypatch.setattr(AraStarSearch, "deadline", AraStarSearch.deadline)
+
+    configure_bounded_searches(0.25, 2)
+
+    assert search_factory("wastar", france).weight == 1.25
+    assert (search_factory("arastar", france).epsilon, search_factory("arastar", france).deadline) == (0.25, 2)
@@ -0,0 +1,26 @@
+from action import Action
+from city import City
+from map import Map
+
+def zero_cost_map() -> Map:
+    """
+    Creates a map where cities with the same path cost from "s" are joined by actions that cost nothing,
+    in circles that lead nowhere near "s", before reaching "t".
+    """
+
+    actions = {
+        "s": [ ("a", 1) ],
+        "d": [ ("c", 0) ],
+        "c": [ ("d", 0), ("b", 0), ("t", 1) ],
+        "b": [ ("c", 0), ("a", 0) ],
+        "a": [ ("b", 0) ],
+        "t": []
+    }
+    cities = []
+
+    for i, (name, destinations) in enumerate(actions.items()):
+        city = City(name, 45 + i / 10, 2 + i / 10)
+        city.add_actions([ Action(destination, cost) for destination, cost in destinations ])
+        cities.append(city)
+
+    return Map(cities)
@@ -1,6 +1,7 @@
 import math
 from search import Search
 from search_result import SearchResult
+from typing import Iterable
 
 class UniformCostSearch(Search):
     """
@@ -21,36 +22,115 @@ class UniformCostSearch(Search):
             SearchResult: The result of the A* search.
         """
 
-        start_city = self.map.get_city(start)
+        return self.perform_many(start, [ target ])[target]
 
-        frontier = [ start_city]
-        parents = { start_city: None }
-        costs = { start_city: 0 }
+    def perform_many(self, start : str, targets : Iterable[str] = None) -> dict[str, SearchResult]:
+        """
+        Performs a single uniform-cost search from the given start city until every given target city is found.
 
-        result = SearchResult(UniformCostSearch.name, start, target, explored=1)
+        The order cities are expanded in doesn't depend on the target, so the result for each target is
+        exactly what perform would return for it, including the explored, expanded, and maintained counts
+        at the moment the target was found.
 
-        while frontier:
-            current = self.__pop_next_lowest_cost__(frontier, costs)
-            result.expanded += 1
+        Args:
+            start (str): The name of the city to start at.
+            targets (Iterable[str]): The names of the target cities to be found. Defaults to every city in the map.
+
+        Returns:
+            dict[str, SearchResult]: The result of the search for every target, keyed by the target's name.
+        """
+
+        if targets is None:
+            targets = [ self.map.get_city_by_id(city_id).name for city_id in range(len(self.map)) ]
+
+        start_id = self.map.get_city_id(start)
+
+        # The names of the targets that haven't been found yet, keyed by their city IDs. Targets that
+        # aren't in the map can never be found, so they fail once the whole map has been searched.
+        remaining = {}
+        missing = set()
+        for target in targets:
+            target_id = self.map.get_city_id(target)
 
-            if current.name == target:
-                result.success = True
-                result.path = self.__build_path__(current, parents)
-                result.cost = costs[current]
-                result.maintained = len(frontier)
-                
-                break
+            if target_id is None:
+                missing.add(target)
+            else:
+                remaining.setdefault(target_id, []).append(target)
 
-            for action in current.actions:
-                neighbor = self.map.get_city(action.destination)
-                cost = costs[current] + action.cost
+        frontier = self.frontier_type()
+        parents = { start_id: None }
+        costs = { start_id: 0 }
+
+        frontier.push(start_id, 0)
+
+        results = {}
+        explored = 1
+        expanded = 0
+
+        while frontier and (remaining or missing):
+            current = frontier.pop()
+            expanded += 1
+
+            if current in remaining:
+                for target in remaining.pop(current):
+                    results[target] = SearchResult(UniformCostSearch.name, start, target, True, None, costs[current], explored, expanded, len(frontier))
+                    # Every result shares the parents, and only follows them if its path is read.
+                    results[target].set_path_parents(self.map, parents, current)
+
+                if not remaining and not missing:
+                    break
+
+            for neighbor, action_cost in self.map.get_neighbors(current):
+                cost = costs[current] + action_cost
 
                 if cost < costs.get(neighbor, math.inf):
                     parents[neighbor] = current
                     costs[neighbor] = cost
 
                     if neighbor not in frontier:
-                        frontier.append(neighbor)
-                        result.explored += 1
-                
-        return result
+                        explored += 1
+
+                    # Adds the neighbor, or lowers its priority if it is already in the frontier.
+                    frontier.push(neighbor, cost)
+
+        # Whatever is left was never reached.
+        for target in missing.union(*remaining.values()):
+            results[target] = SearchResult(UniformCostSearch.name, start, target, explored=explored, expanded=expanded)
+
+        return results
+
+    def search_tree(self, start_id : int, reverse : bool = False) -> tuple[list[float], list[int]]:
+        """
+        Performs a uniform-cost search from the given start city over the whole map, without a target.
+
+        Args:
+            start_id (int): The ID of the city to start at.
+            reverse (bool): Whether to follow actions backwards, which finds the lowest path cost from every city to the start instead.
+
+        Returns:
+            tuple[list[float], list[int]]: The lowest path cost to every city and the parent of every city on
+            its lowest cost path, indexed by city ID. Unreachable cities have an infinite cost and no parent.
+        """
+
+        get_neighbors = self.map.get_reverse_neighbors if reverse else self.map.get_neighbors
+
+        frontier = self.frontier_type()
+        parents = [ None ] * len(self.map)
+        costs = [ math.inf ] * len(self.map)
+
+        costs[start_id] = 0
+        frontier.push(start_id, 0)
+
+        while frontier:
+            current = frontier.pop()
+
+            for neighbor, action_cost in get_neighbors(current):
+                cost = costs[current] + action_cost
+
+                if cost < costs[neighbor]:
+                    parents[neighbor] = current
+                    costs[neighbor] = cost
+
+                    frontier.push(neighbor, cost)
+
+        return (costs, parents)
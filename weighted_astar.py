@@ -0,0 +1,212 @@
+import math
+import time
+from astar import AstarSearch
+from haversine_table import HaversineTable
+from lpastar import heuristic_scale
+from map import Map
+from search_result import SearchResult
+
+# Inflation factors below this are rounded down to 0, so anytime searches finish with an exact search.
+MIN_EPSILON = 0.01
+
+class WeightedAstarSearch(AstarSearch):
+    """
+    Represents a weighted A* search, which inflates the estimate of every city by a factor of 1 + epsilon.
+    Cities close to the target are expanded much sooner, so far fewer cities are expanded, and the path
+    found costs at most 1 + epsilon times the lowest cost. Every result reports that bound.
+
+    The bound only holds for an estimate that never overestimates, so the haversine distance is scaled
+    down on maps where it overestimates the cost of some action (see lpastar.heuristic_scale).
+    """
+
+    name = "wastar"
+    # The inflation factor of new searches that aren't given one, see main.py.
+    epsilon = 0.5
+
+    def __init__(self, map : Map, epsilon : float = None) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            epsilon (float): How much the estimate is inflated. Defaults to WeightedAstarSearch.epsilon.
+        """
+
+        super().__init__(map)
+        self.epsilon = max(0.0, self.epsilon if epsilon is None else epsilon)
+        self.weight = 1 + self.epsilon
+        self.scale = heuristic_scale(map)
+
+    def __estimate__(self, current : int, target : int) -> float:
+        """
+        Estimates the cost of the cheapest path between two cities, without ever overestimating it.
+
+        Args:
+            current (int): The ID of the current city to estimate the cost from.
+            target (int): The ID of the target city to estimate the cost to.
+
+        Returns:
+            float: The estimated cost.
+        """
+
+        return self.scale * super().__estimate__(current, target)
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs a weighted A* search from the given start city until the given target city is found.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search, with the bound on how much more its path may cost than the lowest cost path.
+        """
+
+        result = super().perform(start, target)
+
+        if result.success:
+            result.bound = self.weight
+
+        return result
+
+class AraStarSearch(WeightedAstarSearch):
+    """
+    Represents an anytime repairing A* search (ARA*), which finds a first path quickly with a heavily
+    inflated estimate, then keeps lowering the inflation and improving the path until the lowest cost
+    path is found or the deadline passes.
+
+    Every improvement reuses the work of the previous ones: only cities whose path cost dropped after
+    they were expanded are expanded again. After every improvement, the bound on how much more the path
+    may cost than the lowest cost path is the smaller of the inflation factor and the cost of the path
+    divided by the lowest estimated total cost of any city still waiting to be expanded. The result holds
+    the best path found when the search stops, and its bound. The first path is always found, even if that
+    takes longer than the deadline.
+    """
+
+    name = "arastar"
+    # The inflation factor of the first path, halved for every improvement, see main.py.
+    epsilon = 2.0
+    # The number of seconds new searches that aren't given a deadline may keep improving their path.
+    deadline = 0.1
+
+    def __init__(self, map : Map, epsilon : float = None, deadline : float = None) -> None:
+        """
+        Args:
+            map (Map): The map to search.
+            epsilon (float): How much the estimate is inflated for the first path. Defaults to AraStarSearch.epsilon.
+            deadline (float): The number of seconds to keep improving the path for. Defaults to AraStarSearch.deadline.
+        """
+
+        super().__init__(map, epsilon)
+        self.deadline = self.deadline if deadline is None else deadline
+        # The path cost, parent, and estimate of every city reached by the current search.
+        self.costs = None
+        self.parents = None
+        self.estimates = None
+        self.frontier = None
+        # The cities expanded in the current round, and those of them whose path cost dropped afterwards.
+        self.closed = None
+        self.inconsistent = None
+
+    def __improve_path__(self, target_id : int, result : SearchResult) -> None:
+        """
+        Expands cities in order of their inflated estimated cost until none of them could lead to a
+        cheaper path to the target. Cities expanded before in this round whose path cost drops are set
+        aside as inconsistent instead of being expanded again.
+
+        Args:
+            target_id (int): The ID of the target city.
+            result (SearchResult): The result to count explored and expanded cities in.
+        """
+
+        while self.frontier and self.costs.get(target_id, math.inf) > self.frontier.peek()[1]:
+            current = self.frontier.pop()
+            self.closed.add(current)
+            result.expanded += 1
+
+            for neighbor, action_cost in self.map.get_neighbors(current):
+                cost = self.costs[current] + action_cost
+
+                if cost < self.costs.get(neighbor, math.inf):
+                    if neighbor not in self.costs:
+                        result.explored += 1
+                        self.estimates[neighbor] = self.__estimate__(neighbor, target_id)
+
+                    self.parents[neighbor] = current
+                    self.costs[neighbor] = cost
+
+                    if neighbor in self.closed:
+                        self.inconsistent.add(neighbor)
+                    else:
+                        self.frontier.push(neighbor, cost + self.weight * self.estimates[neighbor])
+
+    def perform(self, start : str, target : str) -> SearchResult:
+        """
+        Performs an anytime repairing A* search from the given start city to the given target city.
+
+        Args:
+            start (str): The name of the city to start at.
+            target (str): The name of the target city to be found.
+
+        Returns:
+            SearchResult: The result of the search, with the best path found before the deadline and the bound on how much more it may cost than the lowest cost path.
+        """
+
+        deadline = time.perf_counter() + self.deadline
+        start_id = self.map.get_city_id(start)
+        target_id = self.map.get_city_id(target)
+
+        haversine_table = HaversineTable.for_map(self.map)
+        self.target_distances = haversine_table.get(target_id) if haversine_table is not None else None
+
+        self.costs = { start_id: 0 }
+        self.parents = { start_id: None }
+        self.estimates = { start_id: self.__estimate__(start_id, target_id) }
+        self.frontier = self.frontier_type()
+        self.closed = set()
+        self.inconsistent = set()
+
+        epsilon = self.epsilon
+        self.weight = 1 + epsilon
+        self.frontier.push(start_id, self.weight * self.estimates[start_id])
+
+        result = SearchResult(self.name, start, target, explored=1)
+
+        while True:
+            self.__improve_path__(target_id, result)
+
+            # Every city that may still lead to a cheaper path.
+            waiting = list(self.inconsistent)
+
+            while self.frontier:
+                waiting.append(self.frontier.pop())
+
+            result.maintained = len(waiting)
+
+            if target_id not in self.costs:
+                # Nothing is left to expand, so the target can't be reached.
+                break
+
+            result.success = True
+            result.cost = self.costs[target_id]
+            # The parents change as the path is improved, so follow them now.
+            result.set_path_parents(self.map, self.parents, target_id)
+            result.compact()
+
+            # No path can cost less than the lowest total cost estimate, without inflation, of the cities left.
+            lower_bound = min((self.costs[city_id] + self.estimates[city_id] for city_id in waiting), default=math.inf)
+            result.bound = max(1.0, min(self.weight, result.cost / lower_bound if lower_bound > 0 else math.inf))
+
+            if result.bound <= 1 or time.perf_counter() >= deadline:
+                break
+
+            # Lower the inflation and expand the cities left over from this round again with their new priorities.
+            epsilon = epsilon / 2 if epsilon / 2 >= MIN_EPSILON else 0.0
+            self.weight = 1 + epsilon
+
+            for city_id in waiting:
+                self.frontier.push(city_id, self.costs[city_id] + self.weight * self.estimates[city_id])
+
+            self.closed.clear()
+            self.inconsistent.clear()
+
+        return result